@@ -2,22 +2,39 @@
 FastAPI application for RAG-based cultural events search.
 """
 
+import json
+import os
+import threading
+import time
+import uuid
 from contextlib import asynccontextmanager
-from typing import Any, Optional
+from datetime import date
+from typing import Annotated, Any, Optional
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, model_validator
 
+from src.budget import BudgetExceeded, Deadline
+from src.compaction import CompactionInProgress, IndexCompactor
 from src.config import settings
-from src.logger import get_logger
+from src.logger import get_logger, request_id_var
+from src.index_registry import IndexReloader, get_index_registry
+from src.index_stats import process_rss_bytes
+from src.mistral_client import close_mistral_clients, get_retry_stats
+from src.profiling import RequestTimer
 from src.rag import get_rag_system
+from src.search import InvalidCursor, SearchFilters, get_event_search
 from src.indexer import build_index_from_openagenda, FAISSIndexBuilder
 from src.chunking import EventChunker
+from src.dedup import deduplicate_events
 
 logger = get_logger(__name__)
 
+_started_at = time.monotonic()
+
 
 # ===========================
 # Pydantic Models
@@ -31,6 +48,24 @@ class HealthResponse(BaseModel):
     index_loaded: bool
 
 
+class StatsResponse(BaseModel):
+    """Response model pour /stats."""
+    index: dict[str, Any] = Field(..., description="Index FAISS: vecteurs, dimension, type, tailles, contenu")
+    models: dict[str, Any] = Field(..., description="Modèles chargés et durées de chargement (ms)")
+    caches: dict[str, Any] = Field(..., description="Caches et composants: tailles, compteurs, taux de succès")
+    process: dict[str, Any] = Field(..., description="Processus: RSS, threads, uptime")
+
+
+class SearchFiltersModel(BaseModel):
+    """Filtres de /ask et /search (combinés par ET)."""
+    city: Optional[str] = None
+    region: Optional[str] = None
+    department: Optional[str] = None
+    date_from: Optional[date] = Field(default=None, description="Événements se terminant ce jour ou après")
+    date_to: Optional[date] = Field(default=None, description="Événements commençant ce jour ou avant")
+    age: Optional[int] = Field(default=None, ge=0, le=120, description="Âge accepté par l'événement")
+
+
 class AskRequest(BaseModel):
     """Request model pour /ask."""
     question: str = Field(
@@ -39,6 +74,10 @@ class AskRequest(BaseModel):
         min_length=3,
         max_length=500,
     )
+    filters: Optional[SearchFiltersModel] = Field(
+        default=None,
+        description="Restreint la recherche aux événements correspondants (région, dates...)",
+    )
 
 
 class AskResponse(BaseModel):
@@ -46,6 +85,98 @@ class AskResponse(BaseModel):
     question: str
     answer: str
     sources: list[dict[str, Any]]
+    degraded: bool = Field(
+        default=False,
+        description="Vrai si le LLM n'a pas répondu à temps (réponse limitée aux événements trouvés)",
+    )
+    fast_path: bool = Field(
+        default=False,
+        description="Vrai si la réponse a été lue dans les métadonnées de l'événement, sans LLM",
+    )
+    out_of_scope: bool = Field(
+        default=False,
+        description="Vrai si la question a été rejetée comme hors périmètre (réponse type, sans recherche)",
+    )
+    events: Optional[list[dict[str, Any]]] = Field(
+        default=None,
+        description="Événements trouvés (titre, ville, dates), renvoyés en mode dégradé",
+    )
+    timings: Optional[dict[str, float]] = Field(
+        default=None,
+        description="Découpage temporel par étape (ms), uniquement sur demande",
+    )
+
+
+class AskBatchRequest(BaseModel):
+    """Request model pour /ask/batch."""
+    questions: list[Annotated[str, Field(min_length=3, max_length=500)]] = Field(
+        ...,
+        description="Questions sur les événements culturels",
+        min_length=1,
+        max_length=settings.batch_max_questions,
+    )
+
+
+class AskBatchItem(BaseModel):
+    """Résultat d'une question de /ask/batch."""
+    index: int = Field(..., description="Rang de la question dans le lot")
+    question: str
+    answer: Optional[str] = None
+    sources: list[dict[str, Any]] = Field(default_factory=list)
+    degraded: bool = False
+    fast_path: bool = False
+    out_of_scope: bool = False
+    events: Optional[list[dict[str, Any]]] = None
+    timings: Optional[dict[str, float]] = None
+    error: Optional[str] = Field(default=None, description="Erreur propre à cette question")
+
+
+class AskBatchResponse(BaseModel):
+    """Response model pour /ask/batch."""
+    results: list[AskBatchItem]
+    num_errors: int
+
+
+class SearchRequest(BaseModel):
+    """Request model pour /search."""
+    query: Optional[str] = Field(default=None, min_length=3, max_length=500, description="Texte recherché")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Curseur `next_cursor` de la page précédente (remplace query, filters et rerank)",
+    )
+    filters: Optional[SearchFiltersModel] = None
+    rerank: bool = Field(default=False, description="Réordonner les événements avec le cross-encoder")
+    limit: int = Field(default=10, ge=1, le=settings.search_max_page_size)
+
+    @model_validator(mode="after")
+    def _query_or_cursor(self) -> "SearchRequest":
+        if not self.query and not self.cursor:
+            raise ValueError("query ou cursor est requis")
+        return self
+
+
+class SearchHit(BaseModel):
+    """Événement trouvé par /search."""
+    event_id: str
+    title: str
+    city: str
+    region: str
+    date_begin: str
+    date_end: str
+    url: str
+    score: float = Field(..., description="Similarité cosinus du meilleur chunk de l'événement")
+    rerank_score: Optional[float] = Field(default=None, description="Score du cross-encoder (si rerank)")
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    """Response model pour /search."""
+    results: list[SearchHit]
+    total: int = Field(..., description="Nombre d'événements classés (toutes pages)")
+    next_cursor: Optional[str] = None
+    cached: bool = Field(default=False, description="Page lue dans le cache, sans nouvelle recherche")
+    reranked: bool = False
+    timings: Optional[dict[str, float]] = None
 
 
 class RebuildRequest(BaseModel):
@@ -64,6 +195,38 @@ class RebuildResponse(BaseModel):
     chunks_created: int
 
 
+class IndexReloadRequest(BaseModel):
+    """Request model pour /admin/index/reload."""
+    version: Optional[str] = Field(
+        default=None,
+        description="Version à activer puis charger (retour arrière); version courante par défaut",
+    )
+
+
+class IndexStatusResponse(BaseModel):
+    """Response model pour /admin/index."""
+    current_version: Optional[str] = Field(..., description="Version désignée par le pointeur CURRENT")
+    loaded_path: str = Field(..., description="Répertoire de l'index en service")
+    reload: dict[str, Any] = Field(..., description="État du rechargement à chaud")
+    versions: list[dict[str, Any]] = Field(..., description="Manifestes des versions publiées")
+    compaction: Optional[dict[str, Any]] = Field(default=None, description="Compteurs et dernier rapport du compactage")
+
+
+class CompactionResponse(BaseModel):
+    """Response model pour /admin/index/compact."""
+    cutoff: str = Field(..., description="Événements terminés avant cette date retirés de l'index")
+    removed_chunks: int
+    removed_events: int
+    remaining_chunks: int
+    deleted_fraction: float = Field(..., description="Part de l'index supprimée depuis la dernière reconstruction")
+    rebuilt: bool = Field(..., description="Index reconstruit (sinon suppression en place)")
+    reclaimed_bytes: int = Field(..., description="Octets libérés sur disque")
+    reclaimed_memory_bytes: int = Field(..., description="Octets libérés en mémoire (index FAISS)")
+    dry_run: bool
+    version: Optional[str] = Field(default=None, description="Version publiée (registre d'index)")
+    duration_ms: float
+
+
 class EvaluateRequest(BaseModel):
     """Request model pour /evaluate."""
     test_file_path: Optional[str] = Field(
@@ -83,6 +246,28 @@ class EvaluateResponse(BaseModel):
 # Lifespan
 # ===========================
 
+_index_reloader: Optional[IndexReloader] = None
+
+
+def get_index_reloader() -> IndexReloader:
+    """Récupère le rechargeur d'index du système RAG de l'API."""
+    global _index_reloader
+    if _index_reloader is None:
+        _index_reloader = IndexReloader(get_rag_system(), get_index_registry())
+    return _index_reloader
+
+
+_index_compactor: Optional[IndexCompactor] = None
+
+
+def get_index_compactor() -> IndexCompactor:
+    """Récupère le compacteur d'index du système RAG de l'API."""
+    global _index_compactor
+    if _index_compactor is None:
+        _index_compactor = IndexCompactor(get_rag_system())
+    return _index_compactor
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for application startup and shutdown."""
@@ -98,11 +283,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize RAG system: {e}", exc_info=True)
         logger.warning("Application started but RAG system is not available")
+    if settings.index_registry_enabled:
+        get_index_reloader().start_watching()
+    if settings.compaction_interval_s > 0:
+        get_index_compactor().start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    if _index_reloader is not None:
+        _index_reloader.stop_watching()
+    if _index_compactor is not None:
+        _index_compactor.stop()
+    await close_mistral_clients()
 
 
 # ===========================
@@ -129,6 +323,19 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Identifiant de requête (X-Request-ID reçu ou généré), repris dans les journaux et la réponse."""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 # ===========================
 # Exception Handler
 # ===========================
@@ -143,6 +350,29 @@ async def global_exception_handler(request, exc):
     )
 
 
+# ===========================
+# Helpers
+# ===========================
+
+def _timings_requested(
+    debug_header: Optional[str],
+    debug_param: bool,
+    admin_token: Optional[str],
+) -> bool:
+    """
+    Indique si le découpage temporel doit être renvoyé.
+
+    - En-tête `X-Debug-Timings` (opt-in, désactivable via la configuration)
+    - Paramètre `?debug=true`, réservé aux administrateurs (`X-Admin-Token`)
+    """
+    if debug_header and settings.debug_timings_header_enabled:
+        if debug_header.strip().lower() in ("1", "true", "yes", "on"):
+            return True
+    if debug_param:
+        return bool(settings.admin_token) and admin_token == settings.admin_token
+    return False
+
+
 # ===========================
 # Endpoints
 # ===========================
@@ -174,8 +404,74 @@ async def health_check():
         )
 
 
-@app.post("/ask", response_model=AskResponse, tags=["RAG"])
-async def ask_question(request: AskRequest):
+def _hit_rate(hits: int, total: int) -> Optional[float]:
+    return round(hits / total, 4) if total else None
+
+
+@app.get("/stats", response_model=StatsResponse, tags=["Health"])
+async def get_stats():
+    """
+    Statistiques de l'index, des modèles, des caches et du processus.
+
+    - Index: nombre de vecteurs, dimension, type FAISS, taille en mémoire
+      (estimée) et sur disque, événements distincts, répartition des types de
+      chunks, période couverte
+    - Modèles chargés et leur durée de chargement
+    - Caches et composants (recherche, réponse directe, contrôle de
+      périmètre, hedging, retries Mistral) avec leurs taux de succès
+    - Processus: mémoire résidente (RSS), threads, uptime
+
+    Le contenu de l'index est compté au chargement: l'appel ne parcourt pas
+    le docstore et reste peu coûteux.
+    """
+    rag_stats = get_rag_system().stats
+    components = rag_stats["components"]
+
+    search_stats = get_event_search().stats
+    caches: dict[str, Any] = {
+        "search": {
+            **search_stats,
+            "hit_rate": _hit_rate(search_stats["cache_hits"], search_stats["cache_hits"] + search_stats["cache_misses"]),
+        },
+    }
+    if "fast_path" in components:
+        fast_path = components["fast_path"]
+        caches["fast_path"] = {**fast_path, "hit_rate": _hit_rate(fast_path["answered"], fast_path["requests"])}
+    for name in ("scope_guard", "hedger"):
+        if name in components:
+            caches[name] = components[name]
+    retry_stats = get_retry_stats()
+    if retry_stats is not None:
+        caches["mistral_retries"] = retry_stats
+
+    return StatsResponse(
+        index=rag_stats["index"],
+        models=rag_stats["models"],
+        caches=caches,
+        process={
+            "pid": os.getpid(),
+            "rss_bytes": process_rss_bytes(),
+            "threads": threading.active_count(),
+            "uptime_s": round(time.monotonic() - _started_at, 1),
+        },
+    )
+
+
+def _to_search_filters(model: Optional[SearchFiltersModel]) -> SearchFilters:
+    """Filtres de la requête HTTP -> filtres de recherche (dates au format AAAA-MM-JJ)."""
+    return SearchFilters(**{
+        name: value.isoformat() if isinstance(value, date) else value
+        for name, value in (model.model_dump() if model else {}).items()
+    })
+
+
+@app.post("/ask", response_model=AskResponse, response_model_exclude_none=True, tags=["RAG"])
+async def ask_question(
+    request: AskRequest,
+    debug: bool = Query(default=False, description="Découpage temporel (admin uniquement)"),
+    x_debug_timings: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
     """
     Pose une question sur les événements culturels.
     
@@ -183,29 +479,58 @@ async def ask_question(request: AskRequest):
     - Récupération de documents pertinents (FAISS)
     - Génération de réponse (Mistral AI)
     
+    L'en-tête `X-Debug-Timings: 1` (ou `?debug=true` avec `X-Admin-Token`)
+    ajoute le découpage temporel de la requête (embed, search, mmr, rerank,
+    prompt, llm_first_token, llm_total) dans le champ `timings`.
+    
+    Si le LLM ne répond pas avant l'échéance (`ask_deadline_ms`), la réponse
+    est dégradée (`degraded=true`) et liste les événements trouvés.
+    
+    Les questions d'attribut ("Quelle est l'adresse de X ?") dont l'événement
+    est reconnu avec confiance sont répondues depuis les métadonnées, sans
+    appel au LLM (`fast_path=true`). Les questions hors périmètre (autre
+    région, sujet sans rapport) reçoivent une réponse type (`out_of_scope=true`).
+    
+    `filters` (région, ville, dates, âge) restreint les documents recherchés;
+    si l'index est partitionné, seuls les shards concernés sont interrogés.
+    
     Args:
         request: Question à poser
     
     Returns:
         Réponse générée avec sources
     """
-    logger.info(f"Question reçue: {request.question}")
+    with_timings = _timings_requested(x_debug_timings, debug, x_admin_token)
 
     try:
         rag_system = get_rag_system()
-        result = rag_system.query(
+        # Exécution hors de la boucle d'événements: la requête est bloquante
+        result = await run_in_threadpool(
+            rag_system.query,
             question=request.question,
             return_sources=True,
+            timer=RequestTimer(),
+            deadline=Deadline(),
+            filters=_to_search_filters(request.filters),
         )
 
-        logger.info(f"Réponse générée pour: {request.question}")
-        
         return AskResponse(
             question=result["question"],
             answer=result["answer"],
             sources=result.get("sources", []),
+            degraded=result.get("degraded", False),
+            fast_path=result.get("fast_path", False),
+            out_of_scope=result.get("out_of_scope", False),
+            events=result.get("events"),
+            timings=result.get("timings") if with_timings else None,
         )
 
+    except BudgetExceeded as e:
+        logger.error(f"Échéance dépassée: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="La recherche n'a pas abouti dans le délai imparti",
+        )
     except FileNotFoundError as e:
         logger.error(f"Index FAISS introuvable: {e}")
         raise HTTPException(
@@ -220,6 +545,243 @@ async def ask_question(request: AskRequest):
         )
 
 
+def _batch_item(result: dict[str, Any], with_timings: bool) -> AskBatchItem:
+    return AskBatchItem(
+        index=result["index"],
+        question=result["question"],
+        answer=result.get("answer"),
+        sources=result.get("sources", []),
+        degraded=result.get("degraded", False),
+        fast_path=result.get("fast_path", False),
+        out_of_scope=result.get("out_of_scope", False),
+        events=result.get("events"),
+        timings=result.get("timings") if with_timings else None,
+        error=result.get("error"),
+    )
+
+
+@app.post("/ask/batch", response_model=AskBatchResponse, response_model_exclude_none=True, tags=["RAG"])
+async def ask_batch(
+    request: AskBatchRequest,
+    stream: bool = Query(default=False, description="Résultats en NDJSON, au fil de l'eau"),
+    debug: bool = Query(default=False, description="Découpage temporel (admin uniquement)"),
+    x_debug_timings: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Pose plusieurs questions en une seule requête.
+
+    Les questions partagent un seul passage d'embedding, une seule recherche
+    FAISS et un seul passage du reranker; les générations sont lancées en
+    parallèle (au plus `batch_llm_concurrency`), chacune avec son échéance.
+    Une question en échec n'interrompt pas le lot: son résultat porte le
+    champ `error`.
+
+    Avec `?stream=true`, chaque résultat est envoyé dès qu'il est prêt, une
+    ligne JSON par question (`application/x-ndjson`, dans l'ordre
+    d'achèvement); sinon la réponse est renvoyée en une fois, dans l'ordre
+    des questions.
+
+    Args:
+        request: Questions à poser
+
+    Returns:
+        Résultats par question
+    """
+    with_timings = _timings_requested(x_debug_timings, debug, x_admin_token)
+    rag_system = get_rag_system()
+    if not rag_system.qa_chain:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Système RAG non initialisé. Veuillez reconstruire l'index avec /rebuild",
+        )
+    results = rag_system.query_batch(request.questions, return_sources=True)
+
+    if stream:
+        def ndjson_lines():
+            for result in results:
+                item = _batch_item(result, with_timings).model_dump(exclude_none=True)
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+
+        # Générateur bloquant: itéré dans le pool de threads par StreamingResponse
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    try:
+        items = await run_in_threadpool(list, results)
+    except Exception as e:
+        logger.error(f"Erreur lors du traitement du lot: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors du traitement du lot: {str(e)}",
+        )
+    items.sort(key=lambda result: result["index"])
+    return AskBatchResponse(
+        results=[_batch_item(result, with_timings) for result in items],
+        num_errors=sum(1 for result in items if result.get("error")),
+    )
+
+
+@app.post("/search", response_model=SearchResponse, response_model_exclude_none=True, tags=["RAG"])
+async def search_events(
+    request: SearchRequest,
+    debug: bool = Query(default=False, description="Découpage temporel (admin uniquement)"),
+    x_debug_timings: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Recherche d'événements, sans génération de réponse.
+
+    Renvoie les événements les plus proches de `query` (un résultat par
+    événement, avec son score), filtrés sur les métadonnées et, avec
+    `rerank=true`, réordonnés par le cross-encoder.
+
+    Pagination: la réponse contient `next_cursor` tant qu'il reste des
+    résultats; la page suivante s'obtient en envoyant seulement `cursor`
+    (et `limit`). Le classement est conservé en cache: les pages suivantes
+    ne refont ni l'embedding ni la recherche.
+
+    Args:
+        request: Recherche ou curseur de la page suivante
+
+    Returns:
+        Page d'événements classés
+    """
+    with_timings = _timings_requested(x_debug_timings, debug, x_admin_token)
+    rag_system = get_rag_system()
+    if rag_system.vectorstore is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Index FAISS non chargé. Veuillez reconstruire l'index avec /rebuild",
+        )
+    event_search = get_event_search()
+
+    try:
+        if request.cursor:
+            page = await run_in_threadpool(event_search.page, rag_system, request.cursor, request.limit)
+        else:
+            page = await run_in_threadpool(
+                event_search.search,
+                rag_system,
+                request.query,
+                _to_search_filters(request.filters),
+                rerank=request.rerank,
+                limit=request.limit,
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la recherche: {str(e)}",
+        )
+
+    return SearchResponse(
+        results=[SearchHit(**result) for result in page.results],
+        total=page.total,
+        next_cursor=page.next_cursor,
+        cached=page.cached,
+        reranked=page.reranked,
+        timings=page.timings if with_timings else None,
+    )
+
+
+def _require_admin(admin_token: Optional[str]) -> None:
+    if not settings.admin_token or admin_token != settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Jeton administrateur requis")
+
+
+def _index_status(reloader: IndexReloader) -> IndexStatusResponse:
+    registry = reloader.registry
+    return IndexStatusResponse(
+        current_version=registry.current_version(),
+        loaded_path=str(reloader.rag_system.index_path),
+        reload=reloader.status,
+        versions=[
+            {key: value for key, value in manifest.items() if key != "files"}
+            for manifest in registry.list_versions()
+        ],
+        compaction=_index_compactor.status if _index_compactor is not None else None,
+    )
+
+
+@app.get("/admin/index", response_model=IndexStatusResponse, tags=["Index"])
+async def index_status(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Versions d'index publiées, version courante et état du rechargement à chaud.
+
+    Requiert l'en-tête `X-Admin-Token`.
+    """
+    _require_admin(x_admin_token)
+    return _index_status(get_index_reloader())
+
+
+@app.post(
+    "/admin/index/reload",
+    response_model=IndexStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Index"],
+)
+async def reload_index(
+    request: Optional[IndexReloadRequest] = None,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Charge la version courante (ou `version`, qui devient courante) sans redémarrage.
+
+    Le nouvel index est chargé et préchauffé en arrière-plan, puis substitué
+    à l'index en service; les requêtes en cours ne sont pas interrompues. Les
+    anciennes versions sont ensuite supprimées (`index_keep_versions`
+    conservées). Avec plusieurs workers, seuls ceux qui surveillent le
+    registre (`index_watch_interval_s`) suivent le changement de version.
+
+    Requiert l'en-tête `X-Admin-Token`.
+    """
+    _require_admin(x_admin_token)
+    reloader = get_index_reloader()
+    version = request.version if request else None
+    try:
+        accepted = reloader.reload(version, activate=True)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if not accepted:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Un rechargement de l'index est déjà en cours")
+    return _index_status(reloader)
+
+
+@app.post("/admin/index/compact", response_model=CompactionResponse, response_model_exclude_none=True, tags=["Index"])
+async def compact_index(
+    dry_run: bool = Query(default=False, description="Rapport seul, sans modifier l'index"),
+    grace_days: Optional[int] = Query(default=None, ge=0, description="Délai après la fin d'un événement"),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Retire de l'index les chunks des événements terminés.
+
+    Les événements dont la fin est antérieure à aujourd'hui moins
+    `grace_days` (`compaction_grace_days` par défaut) sont retirés d'une copie
+    de l'index, publiée puis substituée à chaud. L'index est reconstruit
+    quand la fraction supprimée dépasse `compaction_rebuild_threshold`.
+    Le compactage périodique s'active avec `compaction_interval_s`.
+
+    Requiert l'en-tête `X-Admin-Token`.
+    """
+    _require_admin(x_admin_token)
+    try:
+        report = await run_in_threadpool(get_index_compactor().compact, grace_days=grace_days, dry_run=dry_run)
+    except CompactionInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors du compactage de l'index: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors du compactage de l'index: {str(e)}",
+        )
+    return CompactionResponse(**report.as_dict())
+
+
 @app.post("/rebuild", response_model=RebuildResponse, tags=["Index"])
 async def rebuild_index(request: RebuildRequest):
     """
@@ -270,7 +832,10 @@ async def rebuild_index(request: RebuildRequest):
             chunk_size=settings.rag_chunk_size,
             overlap=settings.rag_chunk_overlap
         )
-        documents = chunker.create_chunks(request.events)
+        events = request.events
+        if settings.dedup_enabled:
+            events, _ = deduplicate_events(events)
+        documents = chunker.create_chunks(events)
 
         if not documents:
             raise HTTPException(
@@ -281,8 +846,8 @@ async def rebuild_index(request: RebuildRequest):
         logger.info(f"{len(documents)} chunks générés depuis {len(request.events)} événements")
 
         # Charger l'index existant et ajouter les nouveaux documents
-        from pathlib import Path
-        if not Path(settings.faiss_index_path).exists():
+        rag_system = get_rag_system()
+        if not rag_system.index_path.exists():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Index FAISS inexistant. Veuillez d'abord construire l'index avec scripts/build_index.py"
@@ -291,14 +856,13 @@ async def rebuild_index(request: RebuildRequest):
         logger.info("Chargement de l'index existant pour ajout de documents...")
         
         # Récupérer le système RAG actuel pour utiliser les mêmes embeddings
-        rag_system = get_rag_system()
         if not rag_system.embeddings:
             rag_system.load_index()
         
-        # Charger l'index existant
+        # Charger l'index existant (copie: l'index en service n'est pas modifié)
         from langchain_community.vectorstores import FAISS
         vectorstore = FAISS.load_local(
-            str(settings.faiss_index_path),
+            str(rag_system.index_path),
             rag_system.embeddings,
             allow_dangerous_deserialization=True,
         )
@@ -309,13 +873,20 @@ async def rebuild_index(request: RebuildRequest):
         vectorstore.add_texts(texts=texts, metadatas=metadatas)
         logger.info(f"{len(documents)} documents ajoutés à l'index existant")
 
-        # Sauvegarder l'index mis à jour
-        builder = FAISSIndexBuilder()
-        builder.save_index(vectorstore, settings.faiss_index_path)
-        
-        # Recharger le RAG system avec l'index mis à jour
-        rag_system.load_index()
-        rag_system.setup_qa_chain()
+        if settings.index_registry_enabled:
+            # Nouvelle version publiée puis substituée à chaud
+            registry = get_index_registry()
+            version = registry.publish(vectorstore, source="rebuild", events_added=len(request.events))
+            await run_in_threadpool(rag_system.swap_index, registry.version_path(version))
+            registry.gc(protect={version})
+        else:
+            # Sauvegarder l'index mis à jour
+            builder = FAISSIndexBuilder()
+            builder.save_index(vectorstore, settings.faiss_index_path)
+
+            # Recharger le RAG system avec l'index mis à jour
+            rag_system.load_index()
+            rag_system.setup_qa_chain()
         
         logger.info("Index FAISS mis à jour avec succès")
         
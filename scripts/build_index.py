@@ -4,6 +4,7 @@ Script to build FAISS index from OpenAgenda events.
 Run this before starting the API.
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -19,12 +20,21 @@ logger = get_logger(__name__)
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Build FAISS index from OpenAgenda events")
+    parser.add_argument(
+        "--events-file",
+        help="JSON or JSONL events file (e.g. synthetic corpus) instead of data/raw/openagenda.json",
+    )
+    args = parser.parse_args()
+
     try:
         logger.info("=" * 50)
         logger.info("Building FAISS index from OpenAgenda")
         logger.info("=" * 50)
         
-        build_index_from_openagenda()
+        build_index_from_openagenda(
+            events_path=Path(args.events_file) if args.events_file else None
+        )
         
         logger.info("=" * 50)
         logger.info("Index build completed successfully!")
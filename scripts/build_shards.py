@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+(Re)construction des shards région/mois d'un index FAISS existant.
+
+Usage:
+    python scripts/build_shards.py
+    python scripts/build_shards.py --index-path data/index/faiss_index
+    python scripts/build_shards.py --keys ile-de-france/2026-05,ile-de-france/2026-06
+
+Les shards sont construits à partir des vecteurs de l'index principal, sans
+nouvel appel au modèle d'embedding. Avec `--keys`, seuls les shards indiqués
+sont reconstruits; les autres sont conservés tels quels.
+
+Avec le registre, les versions publiées ne sont pas modifiées: la version
+courante est copiée, ses shards construits dans la copie, puis celle-ci est
+publiée et activée (les API qui surveillent le registre la rechargent).
+`--index-path` écrit les shards en place dans un répertoire hors registre.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_community.vectorstores import FAISS
+
+from src.config import settings
+from src.index_registry import get_index_registry
+from src.logger import get_logger
+from src.sharding import ShardCatalog, write_shards
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Construction des shards région/mois d'un index FAISS")
+    parser.add_argument(
+        "--index-path",
+        default=None,
+        help="Répertoire d'index hors registre, modifié en place (nouvelle version du registre par défaut)",
+    )
+    parser.add_argument("--keys", default=None, help="Shards à reconstruire, séparés par des virgules (région/AAAA-MM)")
+    args = parser.parse_args()
+
+    keys = [key.strip() for key in args.keys.split(",") if key.strip()] if args.keys else None
+    registry = get_index_registry()
+    use_registry = not args.index_path and settings.index_registry_enabled and registry.current_version()
+    try:
+        if use_registry:
+            version = registry.publish_shards(keys=keys)
+            catalog = ShardCatalog.load(str(registry.version_path(version)))
+            print(f"Version publiée et activée: {version}")
+        else:
+            index_path = args.index_path or settings.faiss_index_path
+            # Vecteurs relus depuis l'index: aucune fonction d'embedding n'est nécessaire
+            vectorstore = FAISS.load_local(str(index_path), None, allow_dangerous_deserialization=True)
+            catalog = write_shards(vectorstore, str(index_path), keys=keys)
+    except Exception as e:
+        logger.error(f"Échec de la construction des shards: {e}")
+        sys.exit(1)
+
+    for info in sorted(catalog.shards.values(), key=lambda info: info.key):
+        print(f"{info.key}  {info.num_chunks} chunks  {info.num_events} événements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Retrait des événements terminés de l'index courant.
+
+Usage:
+    python scripts/compact_index.py --dry-run
+    python scripts/compact_index.py --grace-days 14
+    python scripts/compact_index.py --rebuild-threshold 0
+
+L'index compacté est publié comme nouvelle version du registre: les API qui
+surveillent le registre (`INDEX_WATCH_INTERVAL_S`) la chargent à chaud;
+sinon, appeler POST /admin/index/reload (ou POST /admin/index/compact, qui
+compacte directement l'index en service).
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.compaction import IndexCompactor
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Compactage de l'index FAISS (événements terminés)")
+    parser.add_argument("--grace-days", type=int, default=None, help="Délai après la fin d'un événement")
+    parser.add_argument(
+        "--rebuild-threshold",
+        type=float,
+        default=None,
+        help="Fraction supprimée déclenchant une reconstruction complète (0 = toujours reconstruire)",
+    )
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="Date de référence (AAAA-MM-JJ)")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher le rapport sans modifier l'index")
+    args = parser.parse_args()
+
+    try:
+        report = IndexCompactor().compact(
+            today=args.today,
+            grace_days=args.grace_days,
+            rebuild_threshold=args.rebuild_threshold,
+            dry_run=args.dry_run,
+        )
+    except Exception as e:
+        logger.error(f"Échec du compactage: {e}")
+        sys.exit(1)
+
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ set -e
 
 echo "Demarrage du systeme RAG Puls Events Culturs..."
 
+# Index à charger: version courante du registre (CURRENT), sinon FAISS_INDEX_PATH
+INDEX_PATH=$(python -c "from src.index_registry import resolve_index_path; print(resolve_index_path())" 2>/dev/null | tail -n 1)
+
 # Vérifier si les données JSON existent
 if [ ! -f "/app/data/raw/openagenda.json" ]; then
     echo "ATTENTION: Donnees JSON OpenAgenda introuvables."
@@ -20,7 +23,7 @@ if [ ! -f "/app/data/raw/openagenda.json" ]; then
         echo "ERREUR: Echec de la recuperation des donnees ou de la construction de l'index."
         exit 1
     fi
-elif [ ! -f "/app/data/index/faiss_index/index.faiss" ]; then
+elif [ -z "$INDEX_PATH" ] || [ ! -f "$INDEX_PATH/index.faiss" ]; then
     echo "Donnees JSON trouvees."
     echo "ATTENTION: Index FAISS introuvable. Construction de l'index a partir des donnees existantes..."
     
@@ -34,7 +37,7 @@ elif [ ! -f "/app/data/index/faiss_index/index.faiss" ]; then
     fi
 else
     echo "Donnees JSON trouvees."
-    echo "Index FAISS trouve. Pas de reconstruction necessaire."
+    echo "Index FAISS trouve ($INDEX_PATH). Pas de reconstruction necessaire."
 fi
 
 echo "Demarrage du serveur API..."
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Génère un corpus synthétique d'événements OpenAgenda (JSONL) pour les tests à l'échelle.
+
+Usage:
+    python scripts/generate_corpus.py --count 100000 --output data/raw/synthetic_100k.jsonl
+    python scripts/generate_corpus.py --count 1000000 --seed 7 --config distribution.json \\
+        --questions 200 --questions-output data/test/synthetic_questions.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.logger import get_logger
+from src.synthetic import CorpusDistribution, SyntheticEventGenerator, write_jsonl
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Génération d'un corpus OpenAgenda synthétique")
+    parser.add_argument("--count", type=int, required=True, help="Nombre d'événements")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de génération")
+    parser.add_argument("--config", help="Fichier JSON de distribution (CorpusDistribution)")
+    parser.add_argument("--output", default="data/raw/synthetic.jsonl", help="Fichier JSONL de sortie")
+    parser.add_argument("--questions", type=int, default=0, help="Nombre de questions de test à générer")
+    parser.add_argument(
+        "--questions-output",
+        default="data/test/synthetic_questions.json",
+        help="Fichier JSON des questions générées",
+    )
+
+    args = parser.parse_args()
+
+    distribution = CorpusDistribution()
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            distribution = CorpusDistribution.model_validate(json.load(f))
+
+    generator = SyntheticEventGenerator(seed=args.seed, distribution=distribution)
+    write_jsonl(generator.generate(args.count), Path(args.output))
+
+    if args.questions:
+        questions = generator.generate_questions(args.questions, corpus_size=args.count)
+        questions_path = Path(args.questions_output)
+        questions_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(questions_path, "w", encoding="utf-8") as f:
+            json.dump(questions, f, ensure_ascii=False, indent=2)
+        logger.info(f"{len(questions)} questions écrites dans {questions_path}")
+
+
+if __name__ == "__main__":
+    main()
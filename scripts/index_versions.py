@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Gestion des versions d'index du registre (publication, bascule, nettoyage).
+
+Usage:
+    python scripts/index_versions.py list
+    python scripts/index_versions.py import data/index/faiss_index
+    python scripts/index_versions.py activate 20260301T020000123456-48210
+    python scripts/index_versions.py gc --keep 2
+
+`activate` ne fait que basculer le pointeur CURRENT: les API qui surveillent
+le registre (`INDEX_WATCH_INTERVAL_S`) chargent la version à chaud; sinon,
+appeler POST /admin/index/reload.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.index_registry import IndexRegistry
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Gestion des versions d'index FAISS")
+    parser.add_argument("--registry", default=None, help="Racine du registre (INDEX_REGISTRY_PATH par défaut)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="Lister les versions publiées")
+    import_parser = subparsers.add_parser("import", help="Publier un répertoire d'index existant")
+    import_parser.add_argument("index_path", help="Répertoire d'index (index.faiss, index.pkl)")
+    import_parser.add_argument("--no-activate", action="store_true", help="Ne pas basculer CURRENT")
+    activate_parser = subparsers.add_parser("activate", help="Basculer CURRENT sur une version (retour arrière)")
+    activate_parser.add_argument("version")
+    gc_parser = subparsers.add_parser("gc", help="Supprimer les anciennes versions")
+    gc_parser.add_argument("--keep", type=int, default=None, help="Versions récentes conservées")
+    args = parser.parse_args()
+
+    registry = IndexRegistry(args.registry)
+    try:
+        if args.command == "list":
+            current = registry.current_version()
+            for manifest in registry.list_versions():
+                marker = "*" if manifest["version"] == current else " "
+                print(
+                    f"{marker} {manifest['version']}  {manifest['created_at']}  "
+                    f"{manifest['num_vectors']} vecteurs  {manifest.get('source', '')}"
+                )
+        elif args.command == "import":
+            version = registry.import_directory(args.index_path, activate=not args.no_activate)
+            print(version)
+        elif args.command == "activate":
+            registry.activate(args.version)
+        elif args.command == "gc":
+            removed = registry.gc(keep=args.keep)
+            print(f"{len(removed)} versions supprimées")
+    except Exception as e:
+        logger.error(f"Échec de la commande {args.command}: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
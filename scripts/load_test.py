@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+"""
+Test de charge hors-ligne de l'API avec LLM et embeddings simulés.
+
+Pilote l'application FastAPI réelle en mémoire (transport ASGI, sans serveur
+HTTP) après avoir remplacé les clients Mistral par des stubs déterministes à
+latence configurable. Produit un rapport JSON (débit, percentiles de latence,
+taux d'erreur par endpoint) comparable d'une version à l'autre.
+
+Deux modes de charge:
+- boucle fermée: `--concurrency` clients envoient une requête dès la précédente terminée
+- boucle ouverte: arrivées de Poisson à `--rate` requêtes/s (latence mesurée
+  depuis l'instant d'arrivée prévu, file d'attente comprise)
+
+Usage:
+    python scripts/load_test.py --events-file data/raw/openagenda.json --concurrency 8 --requests 200
+    python scripts/load_test.py --synthetic-events 5000 --concurrency 16 --duration 60
+    python scripts/load_test.py --rate 20 --duration 30 --llm-latency-ms 1200 --output data/loadtest/run.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.config import settings
+from src.index_registry import resolve_index_path
+from src.logger import get_logger
+from src.profiling import summarize_latencies
+from src.rag import RAGSystem
+from src.stubs import StubChatModel, StubEmbeddings
+from src.synthetic import SyntheticEventGenerator, iter_events
+
+logger = get_logger(__name__)
+
+# Nom court -> (méthode HTTP, chemin)
+ENDPOINTS = {
+    "ask": ("POST", "/ask"),
+    "health": ("GET", "/health"),
+}
+
+
+def parse_mix(spec: str) -> list[tuple[str, float]]:
+    """Parse un mélange d'endpoints du type "ask:0.9,health:0.1"."""
+    mix = []
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition(":")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Endpoint inconnu: {name} (disponibles: {', '.join(ENDPOINTS)})")
+        mix.append((name, float(weight) if weight else 1.0))
+    return mix
+
+
+def load_questions(path: str) -> list[str]:
+    """Charge les questions d'un fichier de test RAGAS."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [item["question"] for item in json.load(f)]
+
+
+def build_stub_rag_system(
+    index_path: Optional[str] = None,
+    events: Optional[list[dict[str, Any]]] = None,
+    embed_latency_ms: float = 0.0,
+    llm_latency_ms: float = 0.0,
+    llm_first_token_ms: float = 0.0,
+    enable_rerank: bool = False,
+) -> RAGSystem:
+    """
+    Construit un RAGSystem dont les appels Mistral sont remplacés par des stubs.
+
+    L'index est soit chargé depuis `index_path`, soit construit en mémoire à
+    partir de `events` avec les embeddings simulés.
+    """
+    embeddings = StubEmbeddings(latency_ms=embed_latency_ms)
+    rag_system = RAGSystem(index_path=index_path)
+    rag_system.embeddings = embeddings
+
+    if events is not None:
+        chunker = EventChunker(chunk_size=settings.rag_chunk_size, overlap=settings.rag_chunk_overlap)
+        documents = chunker.create_chunks(events)
+        rag_system.vectorstore = FAISS.from_documents(documents, embeddings)
+    else:
+        rag_system.vectorstore = FAISS.load_local(
+            str(rag_system.index_path),
+            embeddings,
+            allow_dangerous_deserialization=True,
+        )
+        # Aligner la dimension des embeddings simulés sur celle de l'index
+        embeddings.size = rag_system.vectorstore.index.d
+
+    rag_system.llm = StubChatModel(latency_ms=llm_latency_ms, first_token_ms=llm_first_token_ms)
+    if enable_rerank:
+        rag_system.initialize_reranker()
+    rag_system.setup_qa_chain()
+    return rag_system
+
+
+def install_rag_system(rag_system: RAGSystem) -> None:
+    """Remplace le singleton utilisé par l'API."""
+    import src.rag as rag_module
+
+    rag_module._rag_system = rag_system
+
+
+class LoadTestRecorder:
+    """Collecte les résultats des requêtes et produit le rapport."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.status_codes: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, path: str, latency_ms: float, status_code: int) -> None:
+        self.latencies[path].append(latency_ms)
+        self.status_codes[path][str(status_code)] += 1
+        if status_code == 0 or status_code >= 400:
+            self.errors[path] += 1
+
+    def report(self, duration_s: float) -> dict[str, Any]:
+        total = sum(len(values) for values in self.latencies.values())
+        total_errors = sum(self.errors.values())
+        endpoints = {}
+        for path, values in sorted(self.latencies.items()):
+            endpoints[path] = {
+                "requests": len(values),
+                "errors": self.errors[path],
+                "error_rate": round(self.errors[path] / len(values), 4),
+                "throughput_rps": round(len(values) / duration_s, 2) if duration_s else 0.0,
+                "status_codes": dict(self.status_codes[path]),
+                "latency_ms": summarize_latencies(values),
+            }
+        return {
+            "duration_s": round(duration_s, 3),
+            "total_requests": total,
+            "throughput_rps": round(total / duration_s, 2) if duration_s else 0.0,
+            "error_rate": round(total_errors / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def _timed_request(
+    client: httpx.AsyncClient,
+    name: str,
+    question: str,
+    recorder: LoadTestRecorder,
+    started: float,
+) -> None:
+    method, path = ENDPOINTS[name]
+    try:
+        if method == "POST":
+            response = await client.post(path, json={"question": question})
+        else:
+            response = await client.get(path)
+        status_code = response.status_code
+    except Exception as e:
+        logger.debug(f"Requête {path} en échec: {e}")
+        status_code = 0
+    recorder.record(path, (time.perf_counter() - started) * 1000, status_code)
+
+
+async def run_load_test(
+    app: Any,
+    mix: list[tuple[str, float]],
+    questions: list[str],
+    concurrency: int = 8,
+    total_requests: Optional[int] = None,
+    duration_s: Optional[float] = None,
+    rate: Optional[float] = None,
+    seed: int = 42,
+) -> dict[str, Any]:
+    """
+    Exécute un test de charge contre l'application ASGI.
+
+    Args:
+        app: Application FastAPI
+        mix: Liste (endpoint, poids)
+        questions: Questions envoyées à tour de rôle aux endpoints RAG
+        concurrency: Nombre de requêtes simultanées maximum
+        total_requests: Nombre total de requêtes (100 si ni durée ni total)
+        duration_s: Durée maximale du test
+        rate: Taux d'arrivée (req/s) en boucle ouverte; boucle fermée si None
+        seed: Graine du tirage des endpoints et des arrivées
+
+    Returns:
+        Rapport JSON-sérialisable
+    """
+    if total_requests is None and duration_s is None:
+        total_requests = 100
+
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    recorder = LoadTestRecorder()
+
+    def next_job(i: int) -> tuple[str, str]:
+        return rng.choices(names, weights)[0], questions[i % len(questions)]
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        start = time.perf_counter()
+        deadline = start + duration_s if duration_s else None
+
+        def budget_left(i: int, now: float) -> bool:
+            if total_requests is not None and i >= total_requests:
+                return False
+            return deadline is None or now < deadline
+
+        if rate:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(name: str, question: str, scheduled: float) -> None:
+                async with semaphore:
+                    await _timed_request(client, name, question, recorder, scheduled)
+
+            tasks = []
+            scheduled = start
+            for i in itertools.count():
+                scheduled += rng.expovariate(rate)
+                if not budget_left(i, scheduled):
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                name, question = next_job(i)
+                tasks.append(asyncio.create_task(bounded(name, question, scheduled)))
+            await asyncio.gather(*tasks)
+        else:
+            counter = itertools.count()
+
+            async def worker() -> None:
+                while True:
+                    i = next(counter)
+                    if not budget_left(i, time.perf_counter()):
+                        return
+                    name, question = next_job(i)
+                    await _timed_request(client, name, question, recorder, time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        elapsed = time.perf_counter() - start
+
+    return recorder.report(elapsed)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Test de charge hors-ligne de l'API RAG")
+    parser.add_argument(
+        "--index-path",
+        default=str(resolve_index_path()),
+        help="Index FAISS à charger (version courante du registre par défaut)",
+    )
+    parser.add_argument("--events-file", help="Fichier JSON/JSONL d'événements pour construire un index en mémoire")
+    parser.add_argument("--synthetic-events", type=int, help="Construire un index en mémoire sur N événements synthétiques")
+    parser.add_argument("--questions-file", default="data/test/ragas_questions.json", help="Questions envoyées à /ask")
+    parser.add_argument("--endpoints", default="ask:0.9,health:0.1", help="Mélange endpoint:poids")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requêtes simultanées maximum")
+    parser.add_argument("--requests", type=int, help="Nombre total de requêtes")
+    parser.add_argument("--duration", type=float, help="Durée du test en secondes")
+    parser.add_argument("--rate", type=float, help="Taux d'arrivée (req/s), active la boucle ouverte")
+    parser.add_argument("--embed-latency-ms", type=float, default=30.0, help="Latence simulée des embeddings")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Latence totale simulée du LLM")
+    parser.add_argument("--llm-first-token-ms", type=float, default=250.0, help="Délai simulé du premier token")
+    parser.add_argument("--rerank", action="store_true", help="Activer le cross-encoder local")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    parser.add_argument("--output", help="Fichier JSON de sortie (stdout sinon)")
+    parser.add_argument("--verbose", action="store_true", help="Conserver les logs INFO de l'application")
+
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    events = None
+    if args.events_file:
+        events = list(iter_events(Path(args.events_file)))
+    elif args.synthetic_events:
+        events = list(SyntheticEventGenerator(seed=args.seed).generate(args.synthetic_events))
+
+    rag_system = build_stub_rag_system(
+        index_path=args.index_path,
+        events=events,
+        embed_latency_ms=args.embed_latency_ms,
+        llm_latency_ms=args.llm_latency_ms,
+        llm_first_token_ms=args.llm_first_token_ms,
+        enable_rerank=args.rerank,
+    )
+    install_rag_system(rag_system)
+
+    from api.main import app
+
+    report = asyncio.run(run_load_test(
+        app,
+        mix=parse_mix(args.endpoints),
+        questions=load_questions(args.questions_file),
+        concurrency=args.concurrency,
+        total_requests=args.requests,
+        duration_s=args.duration,
+        rate=args.rate,
+        seed=args.seed,
+    ))
+    report["config"] = {key: value for key, value in vars(args).items() if key != "verbose"}
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(output, encoding="utf-8")
+        logger.warning(f"Rapport de charge sauvegardé: {output_path}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,11 @@ from datetime import datetime
 from typing import Dict, Any, List
 import argparse
 
-from src.ragas_eval import RAGASEvaluator
+from src.eval_cache import EvaluationCache, current_versions
+from src.eval_history import EvaluationHistory
 from src.logger import get_logger
 from src.config import settings
+from src.regression import detect_regressions
 
 logger = get_logger(__name__)
 
@@ -24,21 +26,24 @@ class EvaluationAutomation:
         self,
         output_dir: str = "data/evaluations",
         history_file: str = "evaluation_history.json",
-        thresholds: Dict[str, float] = None
+        thresholds: Dict[str, float] = None,
+        history_db: str = "evaluation_history.db"
     ):
         """
         Initialise l'automatisation.
 
         Args:
             output_dir: Répertoire de sortie pour les rapports
-            history_file: Fichier d'historique des évaluations
+            history_file: Ancien historique JSON, importé dans la base s'il existe
             thresholds: Seuils minimaux pour chaque métrique
+            history_db: Base SQLite de l'historique (ajout seul)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         self.history_file = self.output_dir / history_file
-        self.history = self._load_history()
+        self.history = EvaluationHistory(str(self.output_dir / history_db))
+        self.history.migrate_json(str(self.history_file))
         
         self.thresholds = thresholds or {
             "faithfulness": 0.70,
@@ -46,33 +51,20 @@ class EvaluationAutomation:
             "context_precision": 0.65,
             "context_recall": 0.65
         }
+
+        # Seuils du mode recherche (sans LLM), vérifiés seulement sur ces métriques
+        self.retrieval_thresholds = {
+            "retrieved_recall@10": 0.60,
+            "retrieved_mrr": 0.40,
+        }
         
         self.regression_threshold = 0.05  # 5% de baisse considéré comme régression
 
-    def _load_history(self) -> List[Dict[str, Any]]:
-        """Charge l'historique des évaluations."""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Erreur lors du chargement de l'historique: {e}")
-                return []
-        return []
-
-    def _save_history(self):
-        """Sauvegarde l'historique des évaluations."""
-        try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.history, f, indent=2)
-            logger.info(f"Historique sauvegardé dans {self.history_file}")
-        except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde de l'historique: {e}")
-
     def run_evaluation(
         self,
         test_file_path: str,
-        use_mistral_embeddings: bool = None
+        use_mistral_embeddings: bool = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Exécute une évaluation complète.
@@ -80,6 +72,7 @@ class EvaluationAutomation:
         Args:
             test_file_path: Chemin vers le fichier de questions de test
             use_mistral_embeddings: Utiliser Mistral pour les embeddings
+            use_cache: Réutiliser les réponses et jugements en cache
 
         Returns:
             Résultats de l'évaluation avec métadonnées
@@ -91,9 +84,14 @@ class EvaluationAutomation:
         timestamp = datetime.now()
         
         try:
-            # Initialiser l'évaluateur
+            # Initialiser l'évaluateur (import différé: RAGAS n'est pas requis en mode recherche)
             logger.info("Initialisation de l'évaluateur RAGAS...")
-            evaluator = RAGASEvaluator(use_mistral_embeddings=use_mistral_embeddings)
+            from src.ragas_eval import RAGASEvaluator
+
+            evaluator = RAGASEvaluator(
+                use_mistral_embeddings=use_mistral_embeddings,
+                cache=EvaluationCache(enabled=use_cache),
+            )
 
             # Exécuter l'évaluation
             logger.info(f"Évaluation depuis {test_file_path}...")
@@ -119,8 +117,11 @@ class EvaluationAutomation:
             # Créer le rapport
             evaluation_result = {
                 "timestamp": timestamp.isoformat(),
+                "mode": "ragas",
                 "test_file": test_file_path,
                 "metrics": metrics,
+                "failed_questions": len(evaluator.failed_questions),
+                "cache": evaluator.cache.stats(),
                 "summary": summary,
                 "alerts": alerts,
                 "regressions": regressions,
@@ -130,9 +131,8 @@ class EvaluationAutomation:
             # Sauvegarder le rapport
             self._save_report(evaluation_result, timestamp)
 
-            # Ajouter à l'historique
-            self.history.append(evaluation_result)
-            self._save_history()
+            # Ajouter à l'historique (avec les scores par question)
+            self.history.append({**evaluation_result, "per_question": evaluator.per_question})
 
             # Afficher le résumé
             self._print_summary(evaluation_result)
@@ -147,6 +147,54 @@ class EvaluationAutomation:
             logger.error(f"Erreur lors de l'évaluation: {e}")
             raise
 
+    def run_retrieval_evaluation(
+        self,
+        test_file_path: str,
+        rag_system: Any = None
+    ) -> Dict[str, Any]:
+        """
+        Exécute une évaluation de la recherche seule (sans LLM ni réseau).
+
+        Args:
+            test_file_path: Chemin vers le fichier de questions de test
+            rag_system: Système RAG avec index chargé (chargé depuis la configuration si absent)
+
+        Returns:
+            Résultats de l'évaluation avec métadonnées
+        """
+        from src.retrieval_eval import RetrievalEvaluator
+
+        logger.info("Évaluation de la recherche (sans LLM)...")
+        timestamp = datetime.now()
+
+        evaluator = RetrievalEvaluator(rag_system=rag_system)
+        results = evaluator.evaluate_from_file(test_file_path)
+        metrics = results["metrics"]
+
+        checked = {name: metrics[name] for name in self.retrieval_thresholds if name in metrics}
+        alerts = self._check_thresholds(checked, self.retrieval_thresholds)
+        regressions = self._detect_regressions(metrics, mode="retrieval")
+
+        evaluation_result = {
+            "timestamp": timestamp.isoformat(),
+            "mode": "retrieval",
+            "test_file": test_file_path,
+            "metrics": metrics,
+            "latency_ms": results["latency_ms"],
+            "config": results["config"],
+            "num_questions": results["num_questions"],
+            "summary": self._calculate_summary(metrics),
+            "alerts": alerts,
+            "regressions": regressions,
+            "status": self._determine_status(alerts, regressions)
+        }
+
+        self._save_report(evaluation_result, timestamp)
+        self.history.append({**evaluation_result, "per_question": results["per_question"]})
+        self._print_summary(evaluation_result)
+
+        return evaluation_result
+
     def _calculate_summary(self, metrics: Dict[str, float]) -> Dict[str, float]:
         """Calcule les statistiques de résumé."""
         scores = list(metrics.values())
@@ -157,11 +205,16 @@ class EvaluationAutomation:
             "num_metrics": len(scores)
         }
 
-    def _check_thresholds(self, metrics: Dict[str, float]) -> List[Dict[str, Any]]:
+    def _check_thresholds(
+        self,
+        metrics: Dict[str, float],
+        thresholds: Dict[str, float] = None
+    ) -> List[Dict[str, Any]]:
         """Vérifie si les métriques dépassent les seuils."""
+        thresholds = thresholds if thresholds is not None else self.thresholds
         alerts = []
         for metric_name, score in metrics.items():
-            threshold = self.thresholds.get(metric_name, 0.50)
+            threshold = thresholds.get(metric_name, 0.50)
             if score < threshold:
                 alerts.append({
                     "metric": metric_name,
@@ -171,33 +224,19 @@ class EvaluationAutomation:
                 })
         return alerts
 
-    def _detect_regressions(self, metrics: Dict[str, float]) -> List[Dict[str, Any]]:
-        """Détecte les régressions par rapport à la dernière évaluation."""
-        regressions = []
-        
-        if not self.history:
-            return regressions
+    def _detect_regressions(
+        self,
+        metrics: Dict[str, float],
+        mode: str = "ragas"
+    ) -> List[Dict[str, Any]]:
+        """Détecte les régressions par rapport à la dernière évaluation du même mode."""
+        last_evaluation = self.history.last_run(mode)
+        if last_evaluation is None:
+            return []
 
-        last_evaluation = self.history[-1]
         last_metrics = last_evaluation.get("metrics", {})
 
-        for metric_name, current_score in metrics.items():
-            if metric_name in last_metrics:
-                previous_score = last_metrics[metric_name]
-                change = current_score - previous_score
-                change_percent = (change / previous_score) * 100 if previous_score > 0 else 0
-
-                if change < -self.regression_threshold:
-                    regressions.append({
-                        "metric": metric_name,
-                        "previous": previous_score,
-                        "current": current_score,
-                        "change": change,
-                        "change_percent": change_percent,
-                        "severity": "high" if abs(change_percent) > 10 else "medium"
-                    })
-
-        return regressions
+        return detect_regressions(metrics, last_metrics, self.regression_threshold)
 
     def _determine_status(
         self,
@@ -237,6 +276,11 @@ class EvaluationAutomation:
         print("=" * 80)
 
         metrics = evaluation_result["metrics"]
+        thresholds = (
+            self.retrieval_thresholds
+            if evaluation_result.get("mode") == "retrieval"
+            else self.thresholds
+        )
         summary = evaluation_result["summary"]
         alerts = evaluation_result["alerts"]
         regressions = evaluation_result["regressions"]
@@ -245,7 +289,7 @@ class EvaluationAutomation:
         # Métriques
         print("\nMÉTRIQUES:")
         for metric_name, score in metrics.items():
-            threshold = self.thresholds.get(metric_name, 0.50)
+            threshold = thresholds.get(metric_name, 0.50)
             status_icon = "✓" if score >= threshold else "✗"
             print(f"  {status_icon} {metric_name:20s}: {score:.4f} (seuil: {threshold:.2f})")
 
@@ -297,7 +341,7 @@ class EvaluationAutomation:
             logger.warning("Aucun historique disponible")
             return {}
 
-        recent_history = self.history[-num_evaluations:]
+        recent_history = self.history.recent_runs("ragas", limit=num_evaluations)
         
         # Calculer les tendances pour chaque métrique
         trends = {}
@@ -348,35 +392,8 @@ class EvaluationAutomation:
         output_path = Path(output_file) if output_file else self.output_dir / "metrics_history.csv"
 
         try:
-            import csv
-            
-            # Obtenir toutes les métriques uniques
-            all_metrics = set()
-            for eval_result in self.history:
-                if "metrics" in eval_result:
-                    all_metrics.update(eval_result["metrics"].keys())
-            
-            metric_names = sorted(all_metrics)
-
-            with open(output_path, 'w', newline='') as csvfile:
-                fieldnames = ['timestamp'] + metric_names + ['average', 'status']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for eval_result in self.history:
-                    row = {'timestamp': eval_result.get('timestamp', '')}
-                    
-                    if "metrics" in eval_result:
-                        row.update(eval_result["metrics"])
-                    
-                    if "summary" in eval_result:
-                        row['average'] = eval_result["summary"].get('average', '')
-                    
-                    row['status'] = eval_result.get('status', '')
-                    
-                    writer.writerow(row)
-
-            logger.info(f"Métriques exportées en CSV: {output_path}")
+            count = self.history.export_csv(str(output_path))
+            logger.info(f"Métriques exportées en CSV ({count} évaluations): {output_path}")
 
         except Exception as e:
             logger.error(f"Erreur lors de l'export CSV: {e}")
@@ -418,18 +435,50 @@ def main():
         default=10,
         help="Nombre d'évaluations pour le rapport de tendance"
     )
+    parser.add_argument(
+        "--retrieval-only",
+        action="store_true",
+        help="Évaluer uniquement la recherche (recall@k, MRR, nDCG, latence), sans LLM"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignorer le cache des réponses RAG et des jugements"
+    )
+    parser.add_argument(
+        "--cache-report",
+        action="store_true",
+        help="Afficher le rapport d'invalidation du cache puis quitter"
+    )
+    parser.add_argument(
+        "--prune-cache",
+        action="store_true",
+        help="Supprimer les entrées de cache obsolètes puis quitter"
+    )
 
     args = parser.parse_args()
 
+    if args.cache_report or args.prune_cache:
+        cache = EvaluationCache()
+        versions = current_versions()
+        if args.prune_cache:
+            cache.prune(versions)
+        print(json.dumps(cache.invalidation_report(versions), indent=2, ensure_ascii=False))
+        sys.exit(0)
+
     # Initialiser l'automatisation
     automation = EvaluationAutomation(output_dir=args.output_dir)
 
     try:
         # Exécuter l'évaluation
-        result = automation.run_evaluation(
-            test_file_path=args.test_file,
-            use_mistral_embeddings=args.use_mistral_embeddings
-        )
+        if args.retrieval_only:
+            result = automation.run_retrieval_evaluation(test_file_path=args.test_file)
+        else:
+            result = automation.run_evaluation(
+                test_file_path=args.test_file,
+                use_mistral_embeddings=args.use_mistral_embeddings,
+                use_cache=not args.no_cache
+            )
 
         # Générer le rapport de tendance si demandé
         if args.trend_report:
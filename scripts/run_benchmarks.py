@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Lance les micro-benchmarks et les compare à la baseline enregistrée.
+
+Usage:
+    python scripts/run_benchmarks.py                       # 1k et 10k événements
+    python scripts/run_benchmarks.py --sizes 1000,10000,100000
+    python scripts/run_benchmarks.py --update-baseline     # enregistre la nouvelle référence
+
+Code de sortie 1 si un débit régresse au-delà de la tolérance.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmark import BenchmarkSuite, compare_to_baseline, load_baseline, save_baseline
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des chemins critiques")
+    parser.add_argument("--sizes", default="1000,10000", help="Tailles de corpus (événements)")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions (meilleur temps retenu)")
+    parser.add_argument("--num-queries", type=int, default=50, help="Requêtes pour la recherche")
+    parser.add_argument("--embedding-size", type=int, default=256, help="Dimension des embeddings simulés")
+    parser.add_argument("--with-reranker", action="store_true", help="Inclure le cross-encoder local")
+    parser.add_argument("--baseline", default="data/benchmarks/baseline.json", help="Fichier de baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Baisse de débit tolérée (0.15 = 15%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistrer les résultats comme baseline")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        repeat=args.repeat,
+        num_queries=args.num_queries,
+        embedding_size=args.embedding_size,
+        with_reranker=args.with_reranker,
+    )
+    results = suite.run()
+
+    print("\nRÉSULTATS:")
+    for name, values in results.items():
+        print(f"  {name:35s}: {values['ops_per_s']:>12.2f} ops/s ({values['seconds']:.4f}s)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        sys.exit(0)
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        logger.warning(f"Aucune baseline trouvée ({args.baseline}), utilisez --update-baseline")
+        sys.exit(0)
+
+    regressions = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+    if regressions:
+        print(f"\n⚠ RÉGRESSIONS ({len(regressions)}):")
+        for reg in regressions:
+            print(f"  - {reg['metric']}: {reg['previous']:.2f} → {reg['current']:.2f} ops/s "
+                  f"({reg['change_percent']:+.1f}%) [{reg['severity']}]")
+        sys.exit(1)
+
+    print("\n✓ Aucune régression de performance")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
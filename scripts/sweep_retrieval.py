@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Balayage des paramètres de recherche et rapport qualité/latence (frontière de Pareto).
+
+Usage:
+    python scripts/sweep_retrieval.py --questions-file data/test/ragas_questions.json
+    python scripts/sweep_retrieval.py --top-k 5,10,20 --fetch-k 20,40 --index-types Flat,IVF,HNSW --nprobe 1,8,32
+    python scripts/sweep_retrieval.py --synthetic-events 5000 --random 20 --output data/sweeps/run.json
+
+Avec `--synthetic-events`, l'index est construit en mémoire avec des embeddings
+simulés et les questions sont générées à partir du corpus (aucun réseau).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.config import settings
+from src.index_registry import resolve_index_path
+from src.logger import get_logger
+from src.rag import RAGSystem
+from src.stubs import StubEmbeddings
+from src.sweep import RetrievalSweep, format_table, grid_points, random_points
+from src.synthetic import SyntheticEventGenerator
+
+logger = get_logger(__name__)
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def _bool_list(value: str) -> list[bool]:
+    return [item.strip().lower() in ("on", "true", "1", "yes") for item in value.split(",") if item]
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Balayage des paramètres de recherche")
+    parser.add_argument("--questions-file", default="data/test/ragas_questions.json", help="Questions de test")
+    parser.add_argument(
+        "--index-path",
+        default=str(resolve_index_path()),
+        help="Index FAISS à évaluer (version courante du registre par défaut)",
+    )
+    parser.add_argument("--synthetic-events", type=int, help="Index et questions synthétiques sur N événements")
+    parser.add_argument("--synthetic-questions", type=int, default=100, help="Questions générées en mode synthétique")
+    parser.add_argument("--top-k", default="5,10,20", help="Valeurs de rag_top_k")
+    parser.add_argument("--fetch-k", default="20,40", help="Valeurs de rag_fetch_k")
+    parser.add_argument("--rerank", default="off,on", help="Reranking (off,on)")
+    parser.add_argument("--rerank-top-n", default=str(settings.rag_rerank_top_n), help="Valeurs de rag_rerank_top_n")
+    parser.add_argument("--index-types", default="Flat,IVF,HNSW", help="Types d'index FAISS")
+    parser.add_argument("--nprobe", default="1,4,16", help="Valeurs de faiss_nprobe (IVF)")
+    parser.add_argument("--random", type=int, help="Nombre de points tirés au hasard (grille complète sinon)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Perte de qualité acceptée pour la recommandation")
+    parser.add_argument("--output", help="Fichier JSON du rapport complet")
+
+    args = parser.parse_args()
+
+    if args.synthetic_events:
+        generator = SyntheticEventGenerator(seed=args.seed)
+        events = list(generator.generate(args.synthetic_events))
+        questions = generator.generate_questions(args.synthetic_questions, corpus_size=args.synthetic_events)
+        embeddings = StubEmbeddings(size=256)
+        rag_system = RAGSystem(index_path="unused")
+        rag_system.embeddings = embeddings
+        chunker = EventChunker(chunk_size=settings.rag_chunk_size, overlap=settings.rag_chunk_overlap)
+        rag_system.vectorstore = FAISS.from_documents(chunker.create_chunks(events), embeddings)
+    else:
+        with open(args.questions_file, "r", encoding="utf-8") as f:
+            questions = json.load(f)
+        rag_system = RAGSystem(index_path=args.index_path)
+        rag_system.load_index()
+
+    space = {
+        "top_k": _int_list(args.top_k),
+        "fetch_k": _int_list(args.fetch_k),
+        "rerank": _bool_list(args.rerank),
+        "rerank_top_n": _int_list(args.rerank_top_n),
+        "faiss_index_type": [item for item in args.index_types.split(",") if item],
+        "faiss_nprobe": _int_list(args.nprobe),
+    }
+    points = random_points(space, args.random, args.seed) if args.random else grid_points(space)
+    logger.info(f"{len(points)} configurations à évaluer sur {len(questions)} questions")
+
+    report = RetrievalSweep(rag_system, questions).run(points, tolerance=args.tolerance)
+
+    print("\nFRONTIÈRE DE PARETO (qualité = recall@rerank_top_n, coût = p95):")
+    print(format_table(report["frontier"]))
+    recommended = report["recommended"]
+    if recommended:
+        print("\nCONFIGURATION RECOMMANDÉE:")
+        print(format_table([recommended]))
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        report["space"] = space
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Rapport de balayage sauvegardé: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
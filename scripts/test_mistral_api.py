@@ -9,7 +9,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.config import settings
-from langchain_mistralai import ChatMistralAI, MistralAIEmbeddings
+from src.mistral_client import create_chat_model, create_embeddings
 
 
 def test_chat_api():
@@ -24,12 +24,7 @@ def test_chat_api():
         print(f"API Key : {settings.mistral_api_key[:10]}...")
         print()
         
-        llm = ChatMistralAI(
-            model=settings.mistral_model_name,
-            api_key=settings.mistral_api_key,
-            temperature=0.3,
-            timeout=30,
-        )
+        llm = create_chat_model(temperature=0.3)
         
         print("Envoi d'une requête test...")
         response = llm.invoke("Dis bonjour en une phrase")
@@ -57,10 +52,7 @@ def test_embeddings_api():
         print(f"API Key : {settings.mistral_api_key[:10]}...")
         print()
         
-        embeddings = MistralAIEmbeddings(
-            model=settings.embedding_model_name,
-            api_key=settings.mistral_api_key,
-        )
+        embeddings = create_embeddings(settings.embedding_model_name)
         
         print("Génération d'embeddings pour un texte test...")
         result = embeddings.embed_query("Ceci est un test")
@@ -85,12 +77,7 @@ def test_multiple_requests():
     print()
     
     try:
-        llm = ChatMistralAI(
-            model=settings.mistral_model_name,
-            api_key=settings.mistral_api_key,
-            temperature=0.3,
-            timeout=30,
-        )
+        llm = create_chat_model(temperature=0.3)
         
         questions = [
             "Question 1: Bonjour",
@@ -0,0 +1,161 @@
+"""
+Micro-benchmarks des chemins critiques (chunking, indexation, recherche, reranking).
+
+Les mesures sont faites sur des corpus synthétiques de taille croissante avec
+des embeddings simulés, puis comparées à une baseline JSON: une baisse de débit
+au-delà de la tolérance est signalée comme régression.
+"""
+
+import json
+import platform
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.chunking import EventChunker
+from src.config import settings
+from src.indexer import FAISSIndexBuilder
+from src.logger import get_logger
+from src.rag import RAGSystem
+from src.regression import detect_regressions
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+logger = get_logger(__name__)
+
+_QUERY_WORDS = (
+    "concert exposition atelier spectacle théâtre danse jazz musique famille enfants "
+    "visite conférence festival cinéma lecture patrimoine jardin musée balade gratuit"
+).split()
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Exécute `func` plusieurs fois et retourne la meilleure durée (secondes)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class BenchmarkSuite:
+    """Suite de micro-benchmarks paramétrée par la taille des corpus."""
+
+    def __init__(
+        self,
+        sizes: List[int],
+        repeat: int = 3,
+        num_queries: int = 50,
+        embedding_size: int = 256,
+        with_reranker: bool = False,
+        seed: int = 0,
+    ):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.num_queries = num_queries
+        self.embeddings = StubEmbeddings(size=embedding_size)
+        self.with_reranker = with_reranker
+        self.seed = seed
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        """
+        Exécute tous les benchmarks.
+
+        Returns:
+            Dictionnaire "benchmark@taille" -> {"ops", "seconds", "ops_per_s"}
+        """
+        results = {}
+        for size in self.sizes:
+            logger.info(f"Benchmarks sur {size} événements...")
+            results.update(self._run_size(size))
+        return results
+
+    def _record(self, results: dict, name: str, size: int, ops: int, seconds: float) -> None:
+        results[f"{name}@{size}"] = {
+            "ops": ops,
+            "seconds": round(seconds, 6),
+            "ops_per_s": round(ops / seconds, 2) if seconds > 0 else 0.0,
+        }
+
+    def _run_size(self, size: int) -> Dict[str, Dict[str, float]]:
+        results: Dict[str, Dict[str, float]] = {}
+        events = list(SyntheticEventGenerator(seed=self.seed).generate(size))
+        chunker = EventChunker(chunk_size=settings.rag_chunk_size, overlap=settings.rag_chunk_overlap)
+
+        # Chunking complet (événements/s)
+        seconds = _best_of(lambda: chunker.create_chunks(events), self.repeat)
+        self._record(results, "chunking.create_chunks", size, len(events), seconds)
+
+        # Découpage des descriptions (descriptions/s)
+        descriptions = [event["description_fr"] for event in events]
+        seconds = _best_of(
+            lambda: [chunker._split_text(text, chunker.chunk_size, chunker.overlap) for text in descriptions],
+            self.repeat,
+        )
+        self._record(results, "chunking.split_text", size, len(descriptions), seconds)
+
+        # Construction de l'index (chunks/s), une seule fois: c'est l'étape la plus coûteuse
+        documents = chunker.create_chunks(events)
+        builder = FAISSIndexBuilder(embeddings=self.embeddings)
+        start = time.perf_counter()
+        vectorstore = builder.build_index(documents)
+        self._record(results, "indexer.build_index", size, len(documents), time.perf_counter() - start)
+
+        # Recherche (requêtes/s)
+        rag_system = RAGSystem(index_path="unused")
+        rag_system.embeddings = self.embeddings
+        rag_system.vectorstore = vectorstore
+        rng = random.Random(self.seed)
+        queries = [" ".join(rng.choices(_QUERY_WORDS, k=5)) for _ in range(self.num_queries)]
+        seconds = _best_of(lambda: [rag_system.retrieve(q) for q in queries], self.repeat)
+        self._record(results, "rag.retrieve", size, len(queries), seconds)
+
+        # Reranking (requêtes/s), nécessite le cross-encoder local
+        if self.with_reranker:
+            rag_system.initialize_reranker()
+            retrieved = [(q, rag_system.retrieve(q)) for q in queries]
+            seconds = _best_of(
+                lambda: [rag_system.rerank_documents(q, docs) for q, docs in retrieved],
+                self.repeat,
+            )
+            self._record(results, "rag.rerank_documents", size, len(queries), seconds)
+
+        return results
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """Charge une baseline de benchmarks (None si absente)."""
+    baseline_path = Path(path)
+    if not baseline_path.exists():
+        return None
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: str) -> None:
+    """Sauvegarde les résultats comme nouvelle baseline."""
+    baseline_path = Path(path)
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    logger.info(f"Baseline sauvegardée: {baseline_path}")
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.15,
+) -> List[Dict[str, Any]]:
+    """Retourne les benchmarks dont le débit a baissé de plus de `tolerance`."""
+    current = {name: values["ops_per_s"] for name, values in results.items()}
+    previous = {name: values["ops_per_s"] for name, values in baseline.get("results", {}).items()}
+    return detect_regressions(current, previous, tolerance, relative=True)
@@ -0,0 +1,94 @@
+"""
+Budgets de latence par requête: échéance globale et sous-budgets par étape.
+
+Les étapes soumises à un budget s'exécutent dans un pool de threads dédié et
+sont abandonnées (côté appelant) lorsque le budget est dépassé; le thread
+poursuit en arrière-plan jusqu'à son terme ou jusqu'à l'annulation coopérative.
+
+La génération LLM dispose de son propre pool: des appels Mistral lents ou
+abandonnés occupent ses threads sans priver la recherche et le reranking.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional, TypeVar
+
+from src.config import settings
+from src.profiling import profile_worker
+
+T = TypeVar("T")
+
+
+class BudgetExceeded(Exception):
+    """Une étape n'a pas terminé dans son budget."""
+
+    def __init__(self, stage: str, budget_ms: float):
+        self.stage = stage
+        self.budget_ms = budget_ms
+        super().__init__(f"Budget dépassé pour l'étape {stage} ({budget_ms:.0f} ms)")
+
+
+class Deadline:
+    """Échéance de bout en bout d'une requête (0 = pas d'échéance)."""
+
+    def __init__(self, total_ms: Optional[float] = None):
+        self.total_ms = total_ms if total_ms is not None else settings.ask_deadline_ms
+        self._start = time.perf_counter()
+
+    def remaining_ms(self) -> Optional[float]:
+        """Temps restant avant l'échéance (None si illimité)."""
+        if self.total_ms <= 0:
+            return None
+        return max(0.0, self.total_ms - (time.perf_counter() - self._start) * 1000)
+
+    def budget_ms(self, stage_budget_ms: float = 0) -> Optional[float]:
+        """Budget d'une étape: son sous-budget, borné par le temps restant (None si illimité)."""
+        remaining = self.remaining_ms()
+        stage = stage_budget_ms if stage_budget_ms > 0 else None
+        if remaining is None:
+            return stage
+        return min(remaining, stage) if stage is not None else remaining
+
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(pool: str) -> ThreadPoolExecutor:
+    with _executor_lock:
+        if pool not in _executors:
+            workers = settings.llm_executor_workers if pool == "llm" else settings.budget_executor_workers
+            _executors[pool] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"rag-budget-{pool}")
+        return _executors[pool]
+
+
+def run_with_budget(
+    func: Callable[[], T], budget_ms: Optional[float], stage: str, pool: str = "retrieval"
+) -> T:
+    """
+    Exécute `func` en l'abandonnant si elle dépasse `budget_ms`.
+
+    Args:
+        func: Fonction sans argument à exécuter
+        budget_ms: Budget en millisecondes (exécution directe si None)
+        stage: Nom de l'étape, repris dans l'exception
+        pool: Pool de threads de l'étape ("retrieval" ou "llm")
+
+    Raises:
+        BudgetExceeded: Si le budget est dépassé
+    """
+    if budget_ms is None:
+        return func()
+
+    # Copie du contexte: les variables de contexte (ex. identifiant de requête, profil échantillonné)
+    # suivent l'étape dans le thread du pool
+    context = contextvars.copy_context()
+    future = _get_executor(pool).submit(context.run, profile_worker(func))
+    try:
+        return future.result(timeout=budget_ms / 1000)
+    except FutureTimeoutError:
+        future.cancel()
+        raise BudgetExceeded(stage, budget_ms)
@@ -50,12 +50,21 @@ class EventChunker:
                 "title": title,
                 "location_city": city,
                 "location_region": region,
+                "location_address": address,
+                "location_postalcode": event.get("location_postalcode", ""),
+                "location_department": event.get("location_department", ""),
+                "age_min": age_min,
+                "age_max": age_max,
                 "firstdate_begin": date_begin,
                 "lastdate_end": date_end,
                 "url": event.get("canonicalurl", ""),
                 "latitude": event.get("location_lat", ""),
                 "longitude": event.get("location_lon", ""),
             }
+            # Événement récurrent (doublons fusionnés à l'indexation, voir src/dedup.py)
+            occurrences = event.get("occurrences") or []
+            if len(occurrences) > 1:
+                base_metadata["num_occurrences"] = len(occurrences)
             
             # Chunk 1: Titre + Description courte
             desc_short = description[:400] if description else "Pas de description"
@@ -73,6 +82,11 @@ Description: {desc_short}"""
             info_pratiques = f"""Événement: {title} à {city}
 Dates: du {date_begin_fmt} au {date_end_fmt}
 Adresse: {address if address else city}"""
+
+            if len(occurrences) > 1:
+                dates = [self.normalize_date(o["firstdate_begin"]) for o in occurrences[:10] if o.get("firstdate_begin")]
+                more = f" (+{len(occurrences) - 10})" if len(occurrences) > 10 else ""
+                info_pratiques += f"\nReprésentations ({len(occurrences)}): {', '.join(dates)}{more}"
             
             if age_min or age_max:
                 info_pratiques += f"\nÂge: {age_min or '?'}-{age_max or '?'} ans"
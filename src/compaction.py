@@ -0,0 +1,317 @@
+"""
+Compactage de l'index: retrait des chunks d'événements terminés.
+
+Un événement est expiré quand sa date de fin (`lastdate_end`, à défaut
+`firstdate_begin`) est antérieure à aujourd'hui moins `compaction_grace_days`.
+Ses chunks sont retirés d'une copie de l'index, publiée comme nouvelle
+version puis substituée à chaud à l'index en service.
+
+Deux modes de retrait:
+- suppression en place (`remove_ids`), possible pour les index Flat;
+- reconstruction complète à partir des vecteurs restants (sans ré-embedding),
+  quand la fraction supprimée depuis la dernière reconstruction dépasse
+  `compaction_rebuild_threshold` ou que l'index ne permet pas la suppression
+  (IVF: centroïdes ré-entraînés, HNSW: graphe reconstruit).
+"""
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from src.config import settings
+from src.docstore import new_docstore
+from src.faiss_index import build_faiss_index
+from src.index_registry import MANIFEST_FILE, IndexRegistry, get_index_registry, resolve_index_path
+from src.index_stats import directory_size, index_memory_bytes
+from src.indexer import FAISSIndexBuilder
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# État du compactage d'un index hors registre (sinon conservé dans le manifeste de la version)
+COMPACTION_FILE = "compaction.json"
+
+
+class CompactionInProgress(RuntimeError):
+    """Un compactage est déjà en cours."""
+
+
+def expiry_cutoff(today: Optional[date] = None, grace_days: Optional[int] = None) -> str:
+    """Date (AAAA-MM-JJ) avant laquelle un événement terminé est retiré de l'index."""
+    today = today or datetime.now(timezone.utc).date()
+    grace_days = grace_days if grace_days is not None else settings.compaction_grace_days
+    return (today - timedelta(days=grace_days)).isoformat()
+
+
+def is_expired(metadata: Dict[str, Any], cutoff: str) -> bool:
+    """Vrai si le chunk appartient à un événement terminé avant `cutoff` (sans date: conservé)."""
+    end = str(metadata.get("lastdate_end") or metadata.get("firstdate_begin") or "")[:10]
+    return bool(end) and end < cutoff
+
+
+def expired_ids(vectorstore: Any, cutoff: str) -> List[str]:
+    """Identifiants (docstore) des chunks expirés."""
+    return [
+        docstore_id
+        for docstore_id in vectorstore.index_to_docstore_id.values()
+        if is_expired(vectorstore.docstore.search(docstore_id).metadata, cutoff)
+    ]
+
+
+def _supports_removal(index: faiss.Index) -> bool:
+    return isinstance(index, faiss.IndexFlat)
+
+
+def rebuild_without(vectorstore: Any, removed_ids: List[str], index_type: Optional[str] = None) -> FAISS:
+    """Nouveau vectorstore sans les chunks `removed_ids`, index reconstruit à partir des vecteurs restants."""
+    removed = set(removed_ids)
+    kept = [
+        (position, docstore_id)
+        for position, docstore_id in sorted(vectorstore.index_to_docstore_id.items())
+        if docstore_id not in removed
+    ]
+    if not kept:
+        raise ValueError("Tous les chunks de l'index sont expirés: compactage annulé")
+    vectors = np.stack([vectorstore.index.reconstruct(position) for position, _ in kept])
+    return FAISS(
+        embedding_function=vectorstore.embedding_function,
+        index=build_faiss_index(vectors, index_type),
+        docstore=new_docstore({docstore_id: vectorstore.docstore.search(docstore_id) for _, docstore_id in kept}),
+        index_to_docstore_id={i: docstore_id for i, (_, docstore_id) in enumerate(kept)},
+    )
+
+
+@dataclass
+class CompactionReport:
+    """Résultat d'un compactage."""
+
+    cutoff: str
+    removed_chunks: int
+    removed_events: int
+    remaining_chunks: int
+    deleted_fraction: float  # part de l'index supprimée depuis la dernière reconstruction
+    rebuilt: bool
+    memory_bytes_before: int
+    memory_bytes_after: int
+    disk_bytes_before: int
+    disk_bytes_after: int
+    dry_run: bool = False
+    version: Optional[str] = None
+    index_path: Optional[str] = None
+    duration_ms: float = 0.0
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return max(0, self.disk_bytes_before - self.disk_bytes_after)
+
+    @property
+    def reclaimed_memory_bytes(self) -> int:
+        return max(0, self.memory_bytes_before - self.memory_bytes_after)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "reclaimed_memory_bytes": self.reclaimed_memory_bytes,
+        }
+
+
+class IndexCompactor:
+    """Compactage de l'index courant, à la demande ou périodique."""
+
+    def __init__(self, rag_system: Any = None, registry: Optional[IndexRegistry] = None):
+        """
+        Args:
+            rag_system: Système RAG en service, qui reçoit l'index compacté (aucun si None)
+            registry: Registre des versions (settings.index_registry_enabled par défaut)
+        """
+        self.rag_system = rag_system
+        if registry is None and settings.index_registry_enabled:
+            registry = get_index_registry()
+        self.registry = registry
+        self._run_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {"runs": 0, "failures": 0, "last_report": None, "last_error": None}
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Copie des compteurs et du dernier rapport."""
+        with self._lock:
+            return dict(self._status)
+
+    def _source_path(self) -> Path:
+        if self.rag_system is not None and self.rag_system.vectorstore is not None:
+            return Path(self.rag_system.index_path)
+        if self.registry is not None:
+            current = self.registry.current_path()
+            if current is not None and current.exists():
+                return current
+        return resolve_index_path()
+
+    def compact(
+        self,
+        today: Optional[date] = None,
+        grace_days: Optional[int] = None,
+        rebuild_threshold: Optional[float] = None,
+        dry_run: bool = False,
+    ) -> CompactionReport:
+        """
+        Retire les chunks des événements expirés de l'index courant.
+
+        Args:
+            today: Date de référence (aujourd'hui par défaut)
+            grace_days: Délai après la fin d'un événement (settings.compaction_grace_days)
+            rebuild_threshold: Fraction supprimée déclenchant une reconstruction complète
+            dry_run: Calculer le rapport sans publier ni substituer l'index
+
+        Returns:
+            Rapport du compactage
+
+        Raises:
+            CompactionInProgress: Si un compactage est déjà en cours
+            FileNotFoundError: Si l'index est introuvable
+        """
+        if not self._run_lock.acquire(blocking=False):
+            raise CompactionInProgress("Un compactage de l'index est déjà en cours")
+        try:
+            report = self._compact(today, grace_days, rebuild_threshold, dry_run)
+        except Exception as e:
+            with self._lock:
+                self._status["failures"] += 1
+                self._status["last_error"] = str(e)
+            raise
+        finally:
+            self._run_lock.release()
+
+        with self._lock:
+            self._status["runs"] += 1
+            self._status.update(last_report=report.as_dict(), last_error=None)
+        return report
+
+    def _compact(
+        self, today: Optional[date], grace_days: Optional[int], rebuild_threshold: Optional[float], dry_run: bool
+    ) -> CompactionReport:
+        start = time.perf_counter()
+        rebuild_threshold = rebuild_threshold if rebuild_threshold is not None else settings.compaction_rebuild_threshold
+        cutoff = expiry_cutoff(today, grace_days)
+        source = self._source_path()
+        if not source.exists():
+            raise FileNotFoundError(f"Index FAISS introuvable: {source}")
+
+        # Copie de l'index: celui en service n'est pas modifié
+        embeddings = self.rag_system.embeddings if self.rag_system is not None else None
+        vectorstore = FAISS.load_local(str(source), embeddings, allow_dangerous_deserialization=True)
+        total = vectorstore.index.ntotal
+        memory_before = index_memory_bytes(vectorstore.index)
+        disk_before = directory_size(source)
+
+        removed_ids = expired_ids(vectorstore, cutoff)
+        removed_events = {
+            vectorstore.docstore.search(docstore_id).metadata.get("event_id") for docstore_id in removed_ids
+        }
+        # Suppressions cumulées depuis la dernière reconstruction (manifeste de la version source)
+        previously_deleted = int(_compaction_state(source).get("deleted_since_rebuild", 0))
+        deleted = previously_deleted + len(removed_ids)
+        deleted_fraction = deleted / (total + previously_deleted) if total + previously_deleted else 0.0
+        rebuilt = bool(removed_ids) and (
+            deleted_fraction >= rebuild_threshold or not _supports_removal(vectorstore.index)
+        )
+
+        report = CompactionReport(
+            cutoff=cutoff,
+            removed_chunks=len(removed_ids),
+            removed_events=len(removed_events),
+            remaining_chunks=total - len(removed_ids),
+            deleted_fraction=round(deleted_fraction, 4),
+            rebuilt=rebuilt,
+            memory_bytes_before=memory_before,
+            memory_bytes_after=memory_before,
+            disk_bytes_before=disk_before,
+            disk_bytes_after=disk_before,
+            dry_run=dry_run,
+            index_path=str(source),
+        )
+        if not removed_ids or dry_run:
+            report.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            logger.info(f"Compactage ({'simulation' if dry_run else 'rien à faire'}): {len(removed_ids)} chunks expirés")
+            return report
+
+        if rebuilt:
+            vectorstore = rebuild_without(vectorstore, removed_ids)
+        else:
+            vectorstore.delete(removed_ids)
+        report.memory_bytes_after = index_memory_bytes(vectorstore.index)
+
+        metadata = {
+            "source": "compaction",
+            "expired_before": cutoff,
+            "removed_chunks": len(removed_ids),
+            "deleted_since_rebuild": 0 if rebuilt else deleted,
+        }
+        if self.registry is not None:
+            version = self.registry.publish(vectorstore, **metadata)
+            target = self.registry.version_path(version)
+            report.version = version
+        else:
+            target = Path(settings.faiss_index_path)
+            FAISSIndexBuilder().save_index(vectorstore, str(target))
+            with open(target / COMPACTION_FILE, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+        report.index_path = str(target)
+        report.disk_bytes_after = directory_size(target)
+
+        if self.rag_system is not None and self.rag_system.vectorstore is not None:
+            self.rag_system.swap_index(target, settings.warmup_queries)
+            if self.registry is not None:
+                self.registry.gc(protect={report.version})
+
+        report.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(
+            f"Index compacté: {report.removed_chunks} chunks ({report.removed_events} événements) retirés, "
+            f"{'reconstruction' if rebuilt else 'suppression en place'}, "
+            f"{report.reclaimed_bytes} octets récupérés sur disque"
+        )
+        return report
+
+    def start(self, interval_s: Optional[float] = None) -> None:
+        """Compacte l'index périodiquement dans un thread dédié."""
+        interval_s = interval_s if interval_s is not None else settings.compaction_interval_s
+        if interval_s <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval_s):
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Échec du compactage de l'index: {e}")
+
+        self._thread = threading.Thread(target=run, name="index-compaction", daemon=True)
+        self._thread.start()
+        logger.info(f"Compactage de l'index toutes les {interval_s:.0f} s")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def _compaction_state(index_path: Path) -> Dict[str, Any]:
+    for name in (MANIFEST_FILE, COMPACTION_FILE):
+        path = Path(index_path) / name
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    return {}
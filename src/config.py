@@ -27,8 +27,22 @@ class Settings(BaseSettings):
     mistral_api_key: str = ""
     mistral_model_name: str = "ministral-14b-2512"
     mistral_evaluator_model: str = "ministral-14b-2512"
+    mistral_fallback_models: str = ""  # modèles de repli, séparés par des virgules, par ordre de préférence
+    llm_hedge_after_ms: float = 0  # délai sans premier token avant de couvrir la requête (0 = repli sur erreur seulement)
+    llm_hedge_max_in_flight: int = 8  # couvertures simultanées maximum (la moitié du pool LLM)
     mistral_temperature: float = 0.3
     mistral_max_tokens: int = 1024
+    mistral_base_url: str = "https://api.mistral.ai/v1"
+    mistral_requests_per_second: float = 5.0  # quota partagé par le processus (0 = illimité)
+    mistral_rate_limit_burst: int = 5
+    mistral_timeout_s: float = 60.0
+    mistral_connect_timeout_s: float = 5.0
+    mistral_max_retries: int = 3  # sur 429/5xx et erreurs réseau
+    mistral_retry_backoff_s: float = 0.5
+    mistral_retry_max_backoff_s: float = 8.0
+    mistral_pool_max_connections: int = 20
+    mistral_pool_max_keepalive: int = 10
+    mistral_keepalive_expiry_s: float = 60.0
 
     # Embeddings Configuration
     use_mistral_embeddings: bool = True
@@ -37,20 +51,98 @@ class Settings(BaseSettings):
 
     # FAISS Configuration
     faiss_index_path: str = "data/index/faiss_index"
-    faiss_index_type: str = "Flat"
-    faiss_nprobe: int = 10
+    faiss_index_type: str = "Flat"  # Flat, IVF[nlist] ou HNSW[M]
+    faiss_nprobe: int = 10  # listes visitées par requête (IVF)
+
+    # Index Registry (versions d'index, pointeur "current", rechargement à chaud)
+    index_registry_enabled: bool = True
+    index_registry_path: str = "data/index/registry"
+    index_keep_versions: int = 3  # versions conservées en plus de la version courante
+    index_watch_interval_s: float = 0  # surveillance du pointeur "current" (0 = endpoint admin uniquement)
+    index_sharding_enabled: bool = False  # shards par région et mois, recherche parallèle sur les shards retenus
+    shard_search_workers: int = 8
+    shard_preload: bool = False  # charger tous les shards au démarrage (double la mémoire des vecteurs)
+    compaction_interval_s: float = 0  # compactage périodique des événements expirés (0 = désactivé)
+    compaction_grace_days: int = 7  # délai après la fin d'un événement avant son retrait de l'index
+    compaction_rebuild_threshold: float = 0.3  # fraction supprimée au-delà de laquelle l'index est reconstruit
+    dedup_enabled: bool = True  # fusion des événements quasi dupliqués avant l'indexation (MinHash + LSH)
+    dedup_threshold: float = 0.9  # similarité de Jaccard minimale (titre + description)
+    dedup_num_perm: int = 128
+    dedup_bands: int = 32
+    docstore_normalized: bool = True  # métadonnées d'événement stockées une fois, jointes aux chunks à la lecture
+    index_warmup_queries: str = "concert ce week-end,exposition à Paris,spectacle pour enfants"
 
     # RAG Configuration
     rag_top_k: int = 10  
+    rag_fetch_k: int = 20  # candidats FAISS avant MMR (au moins rag_top_k)
     rag_chunk_size: int = 300
     rag_chunk_overlap: int = 50
     rag_enable_reranking: bool = True
-    rag_rerank_top_n: int = 4  
+    rag_rerank_top_n: int = 4
+    rag_two_stage_retrieval: bool = False  # événements d'abord, puis chunks de ces événements
+    rag_event_top_k: int = 20
+    rag_event_vector: str = "main"  # main ou centroid
+    rag_context_packing: bool = True  # un bloc par événement, sans en-têtes répétés
+    rag_context_max_tokens: int = 1500  # 0 = illimité
+
+    # Fast Path Configuration (réponses directes depuis les métadonnées, sans LLM)
+    fast_path_enabled: bool = True
+    fast_path_min_score: float = 0.9  # similarité minimale du titre reconnu
+    fast_path_min_margin: float = 0.05  # écart minimal avec le deuxième titre
+
+    # Scope Guard Configuration (rejet des questions hors périmètre avant la recherche)
+    scope_guard_enabled: bool = False
+    scope_min_similarity: float = 0.0  # similarité cosinus minimale avec l'index (0 = désactivé)
+
+    # Latency Budget Configuration (0 = pas de limite)
+    ask_deadline_ms: float = 8000
+    retrieval_budget_ms: float = 1500
+    rerank_budget_ms: float = 800
+    degraded_max_events: int = 5
+    batch_max_questions: int = 50  # questions par requête /ask/batch
+    batch_llm_concurrency: int = 8  # générations simultanées d'un lot
+    budget_executor_workers: int = 32  # threads des étapes recherche/reranking
+    llm_executor_workers: int = 16  # threads de génération (pool séparé)
+
+    # Search Configuration (/search, sans génération)
+    search_max_results: int = 100  # événements classés par recherche (paginés)
+    search_fetch_k: int = 200  # chunks examinés au départ (élargi si les filtres en écartent trop)
+    search_max_page_size: int = 50
+    search_cache_ttl_s: float = 300
+    search_cache_max_entries: int = 1000
+
+    # Evaluation Configuration
+    ragas_max_workers: int = 4
+    eval_cache_enabled: bool = True
+    eval_cache_dir: str = "data/evaluations/cache"
+
+    # Profiling Configuration
+    admin_token: str = ""
+    debug_timings_header_enabled: bool = True
+    profiling_sample_rate: int = 0  # 1 requête profilée sur N (0 = désactivé)
+    profiling_output_dir: str = "logs/profiles"
+    profiling_max_files: int = 50
 
     # Logging Configuration
     log_level: str = "INFO"
     log_file: Optional[str] = "logs/app.log"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    log_async: bool = True  # écriture par un thread dédié (QueueListener), jamais sur le thread de la requête
+    log_json: bool = False  # une ligne JSON par message, avec l'identifiant de requête
+    log_max_bytes: int = 10_000_000  # rotation par taille (0 = désactivée)
+    log_backup_count: int = 5
+    log_rotate_when: str = ""  # rotation temporelle (ex. "midnight", "H"), prioritaire sur la taille
+    log_info_sample_rate: int = 1  # messages INFO conservés pour 1 requête sur N (1 = toutes)
+
+    @property
+    def fallback_model_names(self) -> list[str]:
+        """Retourne la liste des modèles de repli configurés."""
+        return [name.strip() for name in self.mistral_fallback_models.split(",") if name.strip()]
+
+    @property
+    def warmup_queries(self) -> list[str]:
+        """Retourne les requêtes de préchauffage d'un nouvel index."""
+        return [query.strip() for query in self.index_warmup_queries.split(",") if query.strip()]
 
     @property
     def embedding_model_name(self) -> str:
@@ -0,0 +1,169 @@
+"""
+Construction compacte du contexte du prompt sous budget de tokens.
+
+Les chunks retournés par la recherche sont regroupés par `event_id`: les
+chunks "main", "practical" et "description" d'un même événement sont fusionnés
+en un seul bloc, sans les lignes d'en-tête répétées (titre, lieu, date).
+Les blocs sont ajoutés dans l'ordre du classement (score de reranking) tant
+que le budget de tokens le permet.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import settings
+from src.logger import get_logger
+
+# Import optionnel de tiktoken pour le comptage des tokens
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# Lignes d'en-tête répétées dans chaque chunk d'un événement
+HEADER_KEYS = ("Événement", "Lieu", "Date")
+CHUNK_TYPE_ORDER = {"main": 0, "practical": 1, "description": 2}
+BLOCK_SEPARATOR = "\n\n"
+_DESCRIPTION_PART = re.compile(r"^Description complète \(partie \d+\):\s*")
+
+
+@lru_cache(maxsize=1)
+def _get_token_counter() -> Callable[[str], int]:
+    """Compteur de tokens tiktoken, ou approximation (4 caractères par token) à défaut."""
+    if TIKTOKEN_AVAILABLE:
+        try:
+            encoding = tiktoken.get_encoding("cl100k_base")
+            return lambda text: len(encoding.encode(text))
+        except Exception as e:
+            logger.warning(f"Encodage tiktoken indisponible ({e}), approximation utilisée")
+    return lambda text: max(1, len(text) // 4) if text else 0
+
+
+def count_tokens(text: str) -> int:
+    """Nombre (approximatif selon le tokenizer disponible) de tokens d'un texte."""
+    return _get_token_counter()(text)
+
+
+def _split_header(line: str) -> Optional[str]:
+    key, separator, _ = line.partition(":")
+    if separator and key.strip() in HEADER_KEYS:
+        return key.strip()
+    return None
+
+
+def _merge_parts(parts: List[str]) -> str:
+    """Recolle les parties d'une description en supprimant leur chevauchement."""
+    merged = ""
+    for part in parts:
+        overlap = min(len(merged), len(part))
+        while overlap and not merged.endswith(part[:overlap]):
+            overlap -= 1
+        if merged and not overlap:
+            # Parties non contiguës (une partie intermédiaire n'a pas été retrouvée)
+            merged += " [...] "
+        merged += part[overlap:]
+    return merged.strip()
+
+
+def build_event_block(chunks: List[Any], include_descriptions: bool = True) -> str:
+    """
+    Fusionne les chunks d'un événement en un bloc unique.
+
+    Les en-têtes (Événement, Lieu, Date) ne sont conservés qu'une fois, en
+    privilégiant le chunk "main"; les parties de description sont recollées
+    et remplacent la description courte lorsqu'elles en couvrent le début
+    (partie 1), sinon elles la complètent; les lignes identiques sont dédupliquées.
+    """
+    ordered = sorted(
+        chunks,
+        key=lambda doc: (
+            CHUNK_TYPE_ORDER.get(doc.metadata.get("chunk_type"), len(CHUNK_TYPE_ORDER)),
+            doc.metadata.get("part", 0),
+        ),
+    )
+    headers: Dict[str, str] = {}
+    body: List[str] = []
+    description_parts: List[str] = []
+    has_first_part = False
+    seen = set()
+    for doc in ordered:
+        is_description = doc.metadata.get("chunk_type") == "description"
+        if is_description and not include_descriptions:
+            continue
+        content_lines = []
+        for line in doc.page_content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            key = _split_header(line)
+            if key is not None:
+                headers.setdefault(key, line)
+            else:
+                content_lines.append(line)
+        if is_description:
+            has_first_part = has_first_part or doc.metadata.get("part", 0) == 0
+            description_parts.append(_DESCRIPTION_PART.sub("", " ".join(content_lines)))
+            continue
+        for line in content_lines:
+            if line not in seen:
+                seen.add(line)
+                body.append(line)
+
+    if description_parts and has_first_part:
+        # La description complète englobe la description courte du chunk "main"
+        body = [line for line in body if not line.startswith("Description:")]
+        body.append(f"Description: {_merge_parts(description_parts)}")
+    elif description_parts:
+        # Début de la description absent: la description courte reste, suivie des extraits
+        body.append(f"Suite de la description: {_merge_parts(description_parts)}")
+    if any(line.startswith("Dates:") for line in body):
+        headers.pop("Date", None)
+
+    header_lines = [headers[key] for key in HEADER_KEYS if key in headers]
+    return "\n".join(header_lines + body)
+
+
+def pack_context(documents: List[Any], max_tokens: Optional[int] = None) -> str:
+    """
+    Construit le contexte du prompt à partir des documents classés.
+
+    Args:
+        documents: Documents triés par pertinence décroissante
+        max_tokens: Budget de tokens du contexte (settings.rag_context_max_tokens par défaut, 0 = illimité)
+
+    Returns:
+        Blocs d'événements séparés par une ligne vide
+    """
+    budget = max_tokens if max_tokens is not None else settings.rag_context_max_tokens
+
+    # Regroupement par événement, dans l'ordre du premier chunk classé
+    groups: Dict[str, List[Any]] = {}
+    for position, doc in enumerate(documents):
+        event_id = doc.metadata.get("event_id") or f"__doc_{position}"
+        groups.setdefault(event_id, []).append(doc)
+
+    blocks: List[str] = []
+    used = 0
+    separator_tokens = count_tokens(BLOCK_SEPARATOR)
+    for chunks in groups.values():
+        cost_before = used + (separator_tokens if blocks else 0)
+        block = build_event_block(chunks)
+        tokens = count_tokens(block)
+        if budget > 0 and cost_before + tokens > budget:
+            # Repli: en-têtes et informations pratiques seulement
+            block = build_event_block(chunks, include_descriptions=False)
+            tokens = count_tokens(block)
+            if not block or cost_before + tokens > budget:
+                continue
+        blocks.append(block)
+        used = cost_before + tokens
+
+    logger.debug(
+        f"Contexte: {len(blocks)}/{len(groups)} événements, {used} tokens "
+        f"({len(documents)} chunks)"
+    )
+    return BLOCK_SEPARATOR.join(blocks)
@@ -0,0 +1,198 @@
+"""
+Détection des événements quasi dupliqués à l'indexation (MinHash + LSH).
+
+Les exports OpenAgenda contiennent de nombreux événements récurrents ou
+republiés: même titre et même description sous des uids différents. Chaque
+copie produirait ses propres chunks et vecteurs, qui occupent l'index et les
+premières places des résultats.
+
+Chaque événement reçoit une signature MinHash calculée sur les shingles
+(n-grammes de mots) de son titre et de sa description. Le LSH (signature
+découpée en bandes) propose des paires candidates, retenues si leur
+similarité de Jaccard estimée atteint `dedup_threshold`. Seuls les
+événements d'une même ville sont regroupés (une tournée dans plusieurs
+villes reste distincte). Chaque groupe est indexé comme un seul événement,
+avec ses dates de représentation fusionnées dans `occurrences`.
+"""
+
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.config import settings
+from src.fast_path import normalize_text
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Nombre premier de Mersenne: produits a * h < 2^62, sans dépassement en int64
+_PRIME = (1 << 31) - 1
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """N-grammes de mots du texte normalisé (le texte entier s'il est plus court)."""
+    words = normalize_text(text).split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Signatures MinHash (familles de hachage universelles a * h + b mod p)."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.int64)
+
+    def signature(self, tokens: Set[str]) -> np.ndarray:
+        if not tokens:
+            return np.full(self.num_perm, _PRIME, dtype=np.int64)
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little") % _PRIME
+             for token in tokens],
+            dtype=np.int64,
+        )
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+
+def estimated_jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    """Similarité de Jaccard estimée par deux signatures MinHash."""
+    return float(np.mean(first == second))
+
+
+@dataclass
+class DedupReport:
+    """Bilan de la déduplication d'un lot d'événements."""
+
+    input_events: int
+    output_events: int
+    clusters: int  # groupes d'au moins deux événements fusionnés
+
+    @property
+    def duplicates_removed(self) -> int:
+        return self.input_events - self.output_events
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Part des événements retirés comme doublons."""
+        return round(self.duplicates_removed / self.input_events, 4) if self.input_events else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "duplicates_removed": self.duplicates_removed, "dedup_ratio": self.dedup_ratio}
+
+
+def _event_text(event: Dict[str, Any]) -> str:
+    return f"{event.get('title_fr') or ''} {event.get('description_fr') or ''}"
+
+
+def find_clusters(
+    events: List[Dict[str, Any]],
+    threshold: Optional[float] = None,
+    num_perm: Optional[int] = None,
+    bands: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    Groupes d'événements quasi dupliqués (positions dans `events`).
+
+    Args:
+        events: Événements OpenAgenda
+        threshold: Similarité de Jaccard minimale (settings.dedup_threshold)
+        num_perm: Taille des signatures MinHash (settings.dedup_num_perm)
+        bands: Bandes LSH (settings.dedup_bands); num_perm doit en être un multiple
+
+    Returns:
+        Groupes d'au moins deux positions, dans l'ordre des événements
+    """
+    threshold = threshold if threshold is not None else settings.dedup_threshold
+    num_perm = num_perm or settings.dedup_num_perm
+    bands = bands or settings.dedup_bands
+    if num_perm % bands:
+        raise ValueError(f"dedup_num_perm ({num_perm}) doit être un multiple de dedup_bands ({bands})")
+    rows = num_perm // bands
+
+    hasher = MinHasher(num_perm)
+    signatures: Dict[int, np.ndarray] = {}
+    buckets: Dict[Tuple[str, int, bytes], List[int]] = {}
+    for position, event in enumerate(events):
+        tokens = shingles(_event_text(event))
+        if not tokens:
+            continue
+        signature = hasher.signature(tokens)
+        signatures[position] = signature
+        city = normalize_text(str(event.get("location_city") or ""))
+        for band in range(bands):
+            key = (city, band, signature[band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(position)
+
+    parent = list(range(len(events)))
+
+    def find(position: int) -> int:
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    checked: Set[Tuple[int, int]] = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                if (first, second) in checked:
+                    continue
+                checked.add((first, second))
+                if estimated_jaccard(signatures[first], signatures[second]) >= threshold:
+                    parent[find(second)] = find(first)
+
+    groups: Dict[int, List[int]] = {}
+    for position in signatures:
+        groups.setdefault(find(position), []).append(position)
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda group: group[0])
+
+
+def merge_events(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Événement canonique d'un groupe: description la plus complète, dates de toutes les occurrences."""
+    canonical = max(group, key=lambda event: len(event.get("description_fr") or ""))
+    occurrences = sorted(
+        (
+            {"uid": event.get("uid", ""), "firstdate_begin": event.get("firstdate_begin", ""),
+             "lastdate_end": event.get("lastdate_end", "")}
+            for event in group
+        ),
+        key=lambda occurrence: occurrence["firstdate_begin"] or "",
+    )
+    begins = [o["firstdate_begin"] for o in occurrences if o["firstdate_begin"]]
+    ends = [o["lastdate_end"] or o["firstdate_begin"] for o in occurrences if o["lastdate_end"] or o["firstdate_begin"]]
+    return {
+        **canonical,
+        "firstdate_begin": min(begins, default=canonical.get("firstdate_begin", "")),
+        "lastdate_end": max(ends, default=canonical.get("lastdate_end", "")),
+        "occurrences": occurrences,
+    }
+
+
+def deduplicate_events(
+    events: List[Dict[str, Any]], threshold: Optional[float] = None
+) -> Tuple[List[Dict[str, Any]], DedupReport]:
+    """
+    Remplace chaque groupe de quasi-doublons par un événement canonique.
+
+    Returns:
+        (événements dédupliqués, dans l'ordre de leur première occurrence; bilan)
+    """
+    clusters = find_clusters(events, threshold)
+    merged: Dict[int, Dict[str, Any]] = {}
+    dropped: Set[int] = set()
+    for group in clusters:
+        merged[group[0]] = merge_events([events[position] for position in group])
+        dropped.update(group[1:])
+
+    result = [merged.get(position, event) for position, event in enumerate(events) if position not in dropped]
+    report = DedupReport(input_events=len(events), output_events=len(result), clusters=len(clusters))
+    logger.info(
+        f"Déduplication: {report.input_events} -> {report.output_events} événements "
+        f"({report.clusters} groupes, ratio {report.dedup_ratio:.1%})"
+    )
+    return result, report
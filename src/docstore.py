@@ -0,0 +1,128 @@
+"""
+Docstore normalisé: métadonnées d'événement stockées une seule fois.
+
+Le chunker copie les métadonnées de l'événement (titre, adresse, URL,
+coordonnées...) dans chacun de ses 3 à 10 chunks; avec `InMemoryDocstore`,
+chaque copie est sérialisée dans `index.pkl`. `EventDocstore` sépare:
+- une table d'événements indexée par `event_id` (champs de `EVENT_FIELDS`);
+- des chunks légers (texte et métadonnées propres au chunk) qui la référencent.
+
+Le document complet est reconstitué à la lecture (`search`): les
+consommateurs de `doc.metadata` sont inchangés.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from src.config import settings
+
+# Métadonnées communes à tous les chunks d'un événement (voir EventChunker)
+EVENT_FIELDS = (
+    "title",
+    "location_city",
+    "location_region",
+    "location_address",
+    "location_postalcode",
+    "location_department",
+    "age_min",
+    "age_max",
+    "firstdate_begin",
+    "lastdate_end",
+    "url",
+    "latitude",
+    "longitude",
+    "num_occurrences",
+)
+
+_MISSING = object()
+
+
+class EventDocstore(Docstore, AddableMixin):
+    """Docstore en deux tables (événements, chunks), compatible avec le vectorstore FAISS de LangChain."""
+
+    def __init__(self, documents: Optional[Dict[str, Document]] = None):
+        self.events: Dict[str, Dict[str, Any]] = {}
+        # Chunks: identifiant -> (texte, métadonnées propres au chunk, dont event_id)
+        self.chunks: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._refs: Dict[str, int] = {}
+        if documents:
+            self.add(documents)
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Ajoute des documents (métadonnées d'événement versées dans la table des événements)."""
+        overlapping = set(texts).intersection(self.chunks)
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        for docstore_id, doc in texts.items():
+            event_id = str(doc.metadata.get("event_id", ""))
+            event = self.events.setdefault(
+                event_id, {key: doc.metadata[key] for key in EVENT_FIELDS if key in doc.metadata}
+            )
+            # Champs propres au chunk, et champs d'événement différents de la table (événement modifié)
+            own = {
+                key: value
+                for key, value in doc.metadata.items()
+                if key not in EVENT_FIELDS or event.get(key, _MISSING) != value
+            }
+            self.chunks[docstore_id] = (doc.page_content, own)
+            self._refs[event_id] = self._refs.get(event_id, 0) + 1
+
+    def delete(self, ids: List) -> None:
+        """Supprime des chunks (et les événements qui n'en ont plus)."""
+        missing = set(ids).difference(self.chunks)
+        if missing:
+            raise ValueError(f"Tried to delete ids that does not exist: {missing}")
+        for docstore_id in ids:
+            _, own = self.chunks.pop(docstore_id)
+            event_id = str(own.get("event_id", ""))
+            self._refs[event_id] -= 1
+            if self._refs[event_id] == 0:
+                del self._refs[event_id]
+                del self.events[event_id]
+
+    def search(self, search: str) -> Any:
+        """Document complet d'un chunk (métadonnées de l'événement jointes)."""
+        chunk = self.chunks.get(search)
+        if chunk is None:
+            return f"ID {search} not found."
+        page_content, own = chunk
+        event = self.events.get(str(own.get("event_id", "")), {})
+        return Document(id=search, page_content=page_content, metadata={**event, **own})
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"events": len(self.events), "chunks": len(self.chunks)}
+
+
+def new_docstore(documents: Optional[Dict[str, Document]] = None) -> Docstore:
+    """Docstore des nouveaux index (normalisé si `docstore_normalized`)."""
+    if settings.docstore_normalized:
+        return EventDocstore(documents)
+    return InMemoryDocstore(dict(documents or {}))
+
+
+def normalize_vectorstore(vectorstore: Any) -> Any:
+    """
+    Vectorstore équivalent avec un docstore normalisé (l'index FAISS est partagé).
+
+    Sans effet si le docstore est déjà normalisé ou si `docstore_normalized` est désactivé.
+    """
+    if not settings.docstore_normalized or isinstance(vectorstore.docstore, EventDocstore):
+        return vectorstore
+    docstore = EventDocstore({
+        docstore_id: vectorstore.docstore.search(docstore_id)
+        for docstore_id in vectorstore.index_to_docstore_id.values()
+    })
+    return FAISS(
+        embedding_function=vectorstore.embedding_function,
+        index=vectorstore.index,
+        docstore=docstore,
+        index_to_docstore_id=vectorstore.index_to_docstore_id,
+    )
@@ -0,0 +1,202 @@
+"""
+Cache disque versionné pour l'évaluation: sorties RAG et jugements RAGAS.
+
+- Sorties RAG: clé (question, empreinte de l'index, hash du prompt, modèle, paramètres de recherche)
+- Jugements: clé (métrique, entrées évaluées, modèle évaluateur)
+
+Chaque entrée conserve les composantes de sa clé, ce qui permet de produire un
+rapport d'invalidation (entrées devenues obsolètes et pourquoi) et de les purger.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.config import settings
+from src.index_registry import resolve_index_path
+from src.logger import get_logger
+from src.prompts import ANTI_HALLUCINATION_PROMPT
+
+logger = get_logger(__name__)
+
+RAG_NAMESPACE = "rag"
+JUDGE_NAMESPACE = "judge"
+
+# Composantes de clé comparées aux versions courantes dans le rapport d'invalidation
+_VERSIONED_PARTS = {
+    RAG_NAMESPACE: ("index", "prompt", "model", "retrieval"),
+    JUDGE_NAMESPACE: ("evaluator_model",),
+}
+
+_fingerprint_cache: Dict[Tuple[str, float, int], str] = {}
+
+
+def _hash(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def index_fingerprint(index_path: str) -> str:
+    """Empreinte du contenu de l'index FAISS (mémorisée tant que les fichiers ne changent pas)."""
+    path = Path(index_path)
+    files = sorted(p for p in path.glob("*") if p.is_file()) if path.is_dir() else [path]
+    if not files or not files[0].exists():
+        return "missing"
+
+    signature = (
+        str(path.resolve()),
+        max(f.stat().st_mtime for f in files),
+        sum(f.stat().st_size for f in files),
+    )
+    if signature not in _fingerprint_cache:
+        digest = hashlib.sha256()
+        for file in files:
+            digest.update(file.name.encode("utf-8"))
+            with open(file, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        _fingerprint_cache[signature] = digest.hexdigest()[:16]
+    return _fingerprint_cache[signature]
+
+
+def prompt_hash() -> str:
+    """Hash du prompt de génération."""
+    return hashlib.sha256(ANTI_HALLUCINATION_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+
+def retrieval_config() -> Dict[str, Any]:
+    """Paramètres de recherche qui influencent les sorties RAG."""
+    return {
+        "top_k": settings.rag_top_k,
+        "fetch_k": settings.rag_fetch_k,
+        "faiss_index_type": settings.faiss_index_type,
+        "faiss_nprobe": settings.faiss_nprobe,
+        "two_stage": settings.rag_two_stage_retrieval,
+        "event_top_k": settings.rag_event_top_k,
+        "event_vector": settings.rag_event_vector,
+        "rerank": settings.rag_enable_reranking,
+        "rerank_top_n": settings.rag_rerank_top_n,
+        "context_packing": settings.rag_context_packing,
+        "context_max_tokens": settings.rag_context_max_tokens,
+        "fast_path": settings.fast_path_enabled,
+        "scope_guard": settings.scope_guard_enabled,
+        "scope_min_similarity": settings.scope_min_similarity,
+    }
+
+
+def current_versions(index_path: Optional[str] = None, model_name: Optional[str] = None) -> Dict[str, Any]:
+    """Versions courantes des composantes de clé (index servi par défaut: version courante du registre)."""
+    return {
+        "index": index_fingerprint(index_path or str(resolve_index_path())),
+        "prompt": prompt_hash(),
+        "model": model_name or settings.mistral_model_name,
+        "retrieval": retrieval_config(),
+        "evaluator_model": settings.mistral_evaluator_model,
+    }
+
+
+class EvaluationCache:
+    """Cache clé/valeur sur disque, un fichier JSON par entrée."""
+
+    def __init__(self, cache_dir: Optional[str] = None, enabled: Optional[bool] = None):
+        self.cache_dir = Path(cache_dir or settings.eval_cache_dir)
+        self.enabled = enabled if enabled is not None else settings.eval_cache_enabled
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.cache_dir / namespace / key[:2] / f"{key}.json"
+
+    def get(self, namespace: str, parts: Dict[str, Any]) -> Optional[Any]:
+        """Retourne la valeur en cache pour ces composantes de clé, ou None."""
+        if not self.enabled:
+            return None
+        path = self._path(namespace, _hash(parts))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            self.misses[namespace] += 1
+            return None
+        self.hits[namespace] += 1
+        return value
+
+    def set(self, namespace: str, parts: Dict[str, Any], value: Any) -> None:
+        """Enregistre une valeur (écriture atomique, sûre entre threads)."""
+        if not self.enabled:
+            return
+        path = self._path(namespace, _hash(parts))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"key": parts, "value": value, "created_at": datetime.now().isoformat()}
+        tmp_path = path.with_suffix(f".{os.getpid()}.{id(entry)}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Succès/échecs de lecture par espace de noms depuis le démarrage."""
+        result = {}
+        for namespace in (RAG_NAMESPACE, JUDGE_NAMESPACE):
+            total = self.hits[namespace] + self.misses[namespace]
+            result[namespace] = {
+                "hits": self.hits[namespace],
+                "misses": self.misses[namespace],
+                "hit_rate": round(self.hits[namespace] / total, 4) if total else 0.0,
+            }
+        return result
+
+    def _entries(self, namespace: str) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        for path in (self.cache_dir / namespace).glob("*/*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def _stale_parts(self, namespace: str, key: Dict[str, Any], versions: Dict[str, Any]) -> list:
+        return [part for part in _VERSIONED_PARTS[namespace] if key.get(part) != versions.get(part)]
+
+    def invalidation_report(self, versions: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compte les entrées valides et obsolètes par rapport aux versions courantes.
+
+        Args:
+            versions: Résultat de `current_versions()`
+
+        Returns:
+            Rapport par espace de noms avec le détail des causes d'invalidation
+        """
+        report: Dict[str, Any] = {"versions": versions, "size_bytes": 0}
+        for namespace in (RAG_NAMESPACE, JUDGE_NAMESPACE):
+            reasons: Dict[str, int] = defaultdict(int)
+            total = stale = 0
+            for path, entry in self._entries(namespace):
+                total += 1
+                report["size_bytes"] += path.stat().st_size
+                stale_parts = self._stale_parts(namespace, entry.get("key", {}), versions)
+                if stale_parts:
+                    stale += 1
+                    for part in stale_parts:
+                        reasons[part] += 1
+            report[namespace] = {
+                "total": total,
+                "valid": total - stale,
+                "stale": stale,
+                "stale_reasons": dict(reasons),
+            }
+        return report
+
+    def prune(self, versions: Dict[str, Any]) -> int:
+        """Supprime les entrées obsolètes, retourne le nombre d'entrées supprimées."""
+        removed = 0
+        for namespace in (RAG_NAMESPACE, JUDGE_NAMESPACE):
+            for path, entry in list(self._entries(namespace)):
+                if self._stale_parts(namespace, entry.get("key", {}), versions):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        logger.info(f"{removed} entrées obsolètes supprimées du cache d'évaluation")
+        return removed
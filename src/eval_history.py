@@ -0,0 +1,262 @@
+"""
+Historique des évaluations en ajout seul (SQLite).
+
+Chaque évaluation ajoute une ligne de run, ses métriques, ses statistiques
+de latence et de tokens, et les scores par question. Les tendances, la
+détection de régression et l'export CSV sont des requêtes indexées: rien
+n'est réécrit ni rechargé en entier à chaque évaluation.
+"""
+
+import csv
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    test_file TEXT,
+    status TEXT,
+    average REAL,
+    num_questions INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_mode ON runs (mode, id);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics (name, run_id);
+
+CREATE TABLE IF NOT EXISTS run_stats (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS question_metrics (
+    run_id INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, question, name)
+);
+CREATE INDEX IF NOT EXISTS idx_question_metrics ON question_metrics (question, name, run_id);
+"""
+
+# Champs du résultat stockés dans des tables dédiées plutôt que dans le payload
+_SEPARATE_FIELDS = ("metrics", "latency_ms", "per_question")
+
+
+def _run_stats(evaluation_result: Dict[str, Any]) -> Dict[str, float]:
+    """Statistiques de latence ("latency_ms.<étape>.<stat>") et sommes de tokens du run."""
+    stats: Dict[str, float] = {}
+    for stage, summary in (evaluation_result.get("latency_ms") or {}).items():
+        for stat, value in summary.items():
+            stats[f"latency_ms.{stage}.{stat}"] = value
+    for row in evaluation_result.get("per_question") or []:
+        for name, value in row.items():
+            if name.endswith("_tokens") and isinstance(value, (int, float)):
+                stats[f"{name}.sum"] = stats.get(f"{name}.sum", 0) + value
+    return stats
+
+
+class EvaluationHistory:
+    """Historique des évaluations, en ajout seul."""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Fichier SQLite (créé au besoin)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def append(self, evaluation_result: Dict[str, Any]) -> int:
+        """
+        Ajoute un run et ses lignes de métriques.
+
+        Args:
+            evaluation_result: Résultat d'évaluation (metrics, mode, status, summary,
+                latency_ms et per_question optionnels)
+
+        Returns:
+            Identifiant du run
+        """
+        payload = {key: value for key, value in evaluation_result.items() if key not in _SEPARATE_FIELDS}
+        per_question = evaluation_result.get("per_question") or []
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (timestamp, mode, test_file, status, average, num_questions, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    evaluation_result.get("timestamp") or datetime.now().isoformat(),
+                    evaluation_result.get("mode", "ragas"),
+                    evaluation_result.get("test_file"),
+                    evaluation_result.get("status"),
+                    (evaluation_result.get("summary") or {}).get("average"),
+                    evaluation_result.get("num_questions", len(per_question) or None),
+                    json.dumps(payload, ensure_ascii=False),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, value) for name, value in (evaluation_result.get("metrics") or {}).items()],
+            )
+            conn.executemany(
+                "INSERT INTO run_stats (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, value) for name, value in _run_stats(evaluation_result).items()],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO question_metrics (run_id, question, name, value) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, row["question"], name, value)
+                    for row in per_question
+                    for name, value in row.items()
+                    if name != "question" and isinstance(value, (int, float))
+                ],
+            )
+        return run_id
+
+    def _load_runs(self, conn: sqlite3.Connection, rows: Iterable[sqlite3.Row]) -> List[Dict[str, Any]]:
+        runs = []
+        for row in rows:
+            run = json.loads(row["payload"])
+            run["id"] = row["id"]
+            run["metrics"] = {
+                metric["name"]: metric["value"]
+                for metric in conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (row["id"],))
+            }
+            stats = conn.execute("SELECT name, value FROM run_stats WHERE run_id = ?", (row["id"],)).fetchall()
+            if stats:
+                run["stats"] = {stat["name"]: stat["value"] for stat in stats}
+            runs.append(run)
+        return runs
+
+    def last_run(self, mode: str = "ragas") -> Optional[Dict[str, Any]]:
+        """Dernier run d'un mode (avec ses métriques), ou None."""
+        runs = self.recent_runs(mode, limit=1)
+        return runs[0] if runs else None
+
+    def recent_runs(self, mode: str = "ragas", limit: int = 10) -> List[Dict[str, Any]]:
+        """Les `limit` derniers runs d'un mode, du plus ancien au plus récent."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM runs WHERE mode = ? ORDER BY id DESC LIMIT ?", (mode, limit)
+            ).fetchall()
+            return self._load_runs(conn, reversed(rows))
+
+    def metric_series(self, name: str, mode: str = "ragas", limit: int = 10) -> List[Dict[str, Any]]:
+        """Valeurs d'une métrique sur les derniers runs (timestamp, value), du plus ancien au plus récent."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT r.id, r.timestamp, m.value FROM metrics m JOIN runs r ON r.id = m.run_id "
+                "WHERE m.name = ? AND r.mode = ? ORDER BY r.id DESC LIMIT ?",
+                (name, mode, limit),
+            ).fetchall()
+        return [{"run_id": row["id"], "timestamp": row["timestamp"], "value": row["value"]} for row in reversed(rows)]
+
+    def question_history(self, question: str, name: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Scores d'une question au fil des runs (toutes métriques ou une seule)."""
+        query = (
+            "SELECT q.run_id, r.timestamp, q.name, q.value FROM question_metrics q "
+            "JOIN runs r ON r.id = q.run_id WHERE q.question = ?"
+        )
+        params: List[Any] = [question]
+        if name is not None:
+            query += " AND q.name = ?"
+            params.append(name)
+        query += " ORDER BY q.run_id DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def export_csv(self, output_path: str) -> int:
+        """
+        Exporte une ligne par run (métriques en colonnes) en CSV.
+
+        Returns:
+            Nombre de runs exportés
+        """
+        with closing(self._connect()) as conn:
+            metric_names = [row[0] for row in conn.execute("SELECT DISTINCT name FROM metrics ORDER BY name")]
+            rows = conn.execute(
+                "SELECT r.id, r.timestamp, r.mode, r.average, r.status, m.name, m.value "
+                "FROM runs r LEFT JOIN metrics m ON m.run_id = r.id ORDER BY r.id"
+            )
+            count = 0
+            with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+                fieldnames = ["timestamp", "mode"] + metric_names + ["average", "status"]
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer.writeheader()
+                current: Optional[Dict[str, Any]] = None
+                current_id = None
+                for row in rows:
+                    if row["id"] != current_id:
+                        if current is not None:
+                            writer.writerow(current)
+                            count += 1
+                        current_id = row["id"]
+                        current = {
+                            "timestamp": row["timestamp"],
+                            "mode": row["mode"],
+                            "average": row["average"] if row["average"] is not None else "",
+                            "status": row["status"] or "",
+                        }
+                    if row["name"] is not None:
+                        current[row["name"]] = row["value"]
+                if current is not None:
+                    writer.writerow(current)
+                    count += 1
+        return count
+
+    def migrate_json(self, json_path: str) -> int:
+        """
+        Importe un ancien historique JSON si la base est vide.
+
+        Le fichier JSON est laissé en place; il n'est plus écrit.
+
+        Returns:
+            Nombre de runs importés
+        """
+        path = Path(json_path)
+        if not path.exists() or len(self) > 0:
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Historique JSON illisible, migration ignorée: {e}")
+            return 0
+
+        for entry in entries:
+            self.append(entry)
+        logger.info(f"{len(entries)} évaluations importées depuis {path} dans {self.db_path}")
+        return len(entries)
@@ -0,0 +1,117 @@
+"""
+Index FAISS au niveau événement pour la recherche en deux étapes.
+
+Un vecteur par `event_id` (celui du chunk "main", ou le centroïde des chunks
+de l'événement) permet de sélectionner d'abord les événements pertinents,
+puis de ne comparer la requête qu'aux chunks de ces événements. L'espace de
+recherche de la seconde étape ne dépend plus de la taille du corpus.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from src.config import settings
+from src.faiss_index import build_faiss_index, set_nprobe
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+EVENT_INDEX_FILE = "events.faiss"
+EVENT_MAPPING_FILE = "events.json"
+
+
+class EventIndex:
+    """Vecteurs d'événements et correspondance événement -> positions des chunks."""
+
+    def __init__(self, index: faiss.Index, event_ids: List[str], chunk_positions: Dict[str, List[int]], num_chunks: int):
+        self.index = index
+        self.event_ids = event_ids
+        self.chunk_positions = chunk_positions
+        self.num_chunks = num_chunks
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: Any, vector: Optional[str] = None) -> "EventIndex":
+        """
+        Construit l'index d'événements à partir de l'index des chunks (sans ré-embedding).
+
+        Args:
+            vectorstore: Vectorstore FAISS des chunks
+            vector: "main" (vecteur du chunk principal) ou "centroid" (moyenne des chunks);
+                settings.rag_event_vector par défaut
+        """
+        vector = vector or settings.rag_event_vector
+        chunk_positions: Dict[str, List[int]] = {}
+        main_positions: Dict[str, int] = {}
+        for position, docstore_id in vectorstore.index_to_docstore_id.items():
+            doc = vectorstore.docstore.search(docstore_id)
+            metadata = getattr(doc, "metadata", {}) or {}
+            event_id = metadata.get("event_id") or f"__chunk_{position}"
+            chunk_positions.setdefault(event_id, []).append(position)
+            if metadata.get("chunk_type") == "main":
+                main_positions.setdefault(event_id, position)
+
+        event_ids = list(chunk_positions)
+        all_vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        if vector == "centroid":
+            vectors = np.stack([all_vectors[chunk_positions[event_id]].mean(axis=0) for event_id in event_ids])
+        else:
+            vectors = np.stack([
+                all_vectors[main_positions.get(event_id, chunk_positions[event_id][0])]
+                for event_id in event_ids
+            ])
+
+        logger.info(f"Index d'événements construit: {len(event_ids)} événements, {vectorstore.index.ntotal} chunks")
+        return cls(build_faiss_index(vectors), event_ids, chunk_positions, vectorstore.index.ntotal)
+
+    def search(self, query_vector: np.ndarray, k: int) -> List[str]:
+        """Identifiants des `k` événements les plus proches de la requête."""
+        return self.search_batch(query_vector, k)[0]
+
+    def search_batch(self, query_vectors: np.ndarray, k: int) -> List[List[str]]:
+        """Identifiants des `k` événements les plus proches de chaque requête (une recherche FAISS)."""
+        _, indices = self.index.search(query_vectors, min(k, len(self.event_ids)))
+        return [[self.event_ids[i] for i in row if i != -1] for row in indices]
+
+    def candidate_positions(self, event_ids: List[str]) -> List[int]:
+        """Positions (dans l'index des chunks) des chunks des événements donnés."""
+        positions: List[int] = []
+        for event_id in event_ids:
+            positions.extend(self.chunk_positions.get(event_id, []))
+        return positions
+
+    def is_stale(self, vectorstore: Any) -> bool:
+        """Vrai si l'index des chunks a changé depuis la construction."""
+        return self.num_chunks != vectorstore.index.ntotal
+
+    def save(self, path: str) -> None:
+        """Sauvegarde à côté de l'index des chunks."""
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        faiss.write_index(self.index, str(directory / EVENT_INDEX_FILE))
+        with open(directory / EVENT_MAPPING_FILE, "w", encoding="utf-8") as f:
+            json.dump(
+                {"event_ids": self.event_ids, "chunk_positions": self.chunk_positions, "num_chunks": self.num_chunks},
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["EventIndex"]:
+        """Charge l'index d'événements (None s'il n'existe pas)."""
+        directory = Path(path)
+        if not (directory / EVENT_INDEX_FILE).exists() or not (directory / EVENT_MAPPING_FILE).exists():
+            return None
+        with open(directory / EVENT_MAPPING_FILE, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+        index = faiss.read_index(str(directory / EVENT_INDEX_FILE))
+        set_nprobe(index, settings.faiss_nprobe)
+        return cls(
+            index,
+            mapping["event_ids"],
+            mapping["chunk_positions"],
+            mapping["num_chunks"],
+        )
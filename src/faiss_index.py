@@ -0,0 +1,90 @@
+"""
+Construction des index FAISS selon `faiss_index_type` (Flat, IVF, HNSW).
+
+Les types acceptés suivent la notation de `faiss.index_factory`:
+- "Flat": recherche exacte
+- "IVF" ou "IVF<nlist>": partitionnement inversé (nlist ≈ √n par défaut), `faiss_nprobe` listes visitées
+- "HNSW" ou "HNSW<M>": graphe HNSW (M=32 par défaut)
+"""
+
+import math
+import re
+from typing import Optional
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from src.config import settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+_INDEX_TYPE_PATTERN = re.compile(r"^(Flat|IVF|HNSW)(\d*)$", re.IGNORECASE)
+
+
+def parse_index_type(index_type: str) -> tuple[str, Optional[int]]:
+    """Décompose un type d'index ("IVF256" -> ("IVF", 256))."""
+    match = _INDEX_TYPE_PATTERN.match(index_type.strip())
+    if not match:
+        raise ValueError(f"Type d'index FAISS non supporté: {index_type} (Flat, IVF[n], HNSW[M])")
+    kind = match.group(1).upper() if match.group(1).lower() != "flat" else "Flat"
+    return kind, int(match.group(2)) if match.group(2) else None
+
+
+def set_nprobe(index: faiss.Index, nprobe: int) -> None:
+    """Applique `nprobe` si l'index est de type IVF (sans effet sinon)."""
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return
+    ivf.nprobe = max(1, min(nprobe, ivf.nlist))
+    # La reconstruction des vecteurs (MMR) nécessite la table d'adressage directe
+    ivf.make_direct_map()
+
+
+def build_faiss_index(vectors: np.ndarray, index_type: Optional[str] = None, nprobe: Optional[int] = None) -> faiss.Index:
+    """
+    Construit (et entraîne si nécessaire) un index FAISS L2 sur des vecteurs.
+
+    Args:
+        vectors: Matrice (n, d) de vecteurs float32
+        index_type: Type d'index (défaut: `faiss_index_type`)
+        nprobe: Listes visitées pour IVF (défaut: `faiss_nprobe`)
+
+    Returns:
+        Index FAISS contenant les vecteurs dans le même ordre
+    """
+    kind, param = parse_index_type(index_type or settings.faiss_index_type)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dimension = vectors.shape
+
+    if kind == "Flat":
+        index = faiss.IndexFlatL2(dimension)
+    elif kind == "IVF":
+        nlist = min(param or max(1, int(math.sqrt(count))), count)
+        index = faiss.index_factory(dimension, f"IVF{nlist},Flat")
+        index.train(vectors)
+    else:
+        index = faiss.IndexHNSWFlat(dimension, param or 32)
+
+    index.add(vectors)
+    set_nprobe(index, nprobe if nprobe is not None else settings.faiss_nprobe)
+    logger.info(f"Index FAISS {kind} construit: {index.ntotal} vecteurs de dimension {dimension}")
+    return index
+
+
+def convert_vectorstore(vectorstore: FAISS, index_type: str, nprobe: Optional[int] = None) -> FAISS:
+    """
+    Retourne un vectorstore équivalent avec un autre type d'index.
+
+    Les vecteurs sont reconstruits depuis l'index existant (sans ré-embedding);
+    le docstore et le mapping des identifiants sont partagés.
+    """
+    vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+    return FAISS(
+        embedding_function=vectorstore.embedding_function,
+        index=build_faiss_index(vectors, index_type, nprobe),
+        docstore=vectorstore.docstore,
+        index_to_docstore_id=vectorstore.index_to_docstore_id,
+    )
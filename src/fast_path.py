@@ -0,0 +1,319 @@
+"""
+Réponse directe aux questions d'attribut à partir des métadonnées, sans LLM.
+
+Les questions du type "Quelle est l'adresse de X ?" ou "Dans quelle ville se
+trouve Y ?" sont reconnues par des motifs, l'entité est retrouvée dans un
+index des titres, et la valeur est lue dans les métadonnées des chunks (ou,
+pour les index plus anciens, dans le texte du chunk "practical"). Si la
+correspondance du titre n'est pas assez sûre, ou si la valeur est absente,
+la question suit le pipeline RAG complet.
+"""
+
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+
+from src.config import settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Mots ignorés en tête des titres et des entités ("de la", "au", "l'"...)
+_LEADING_WORDS = frozenset({"de", "du", "des", "d", "au", "aux", "a", "pour", "le", "la", "les", "l"})
+
+# Motifs appliqués à la question normalisée (sans accents ni ponctuation)
+_ENTITY = r"(?P<entity>.+)"
+ATTRIBUTE_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    (attribute, re.compile(pattern))
+    for attribute, pattern in [
+        ("address", rf"^(?:quelle est l adresse|a quelle adresse se (?:situe|trouve)) {_ENTITY}$"),
+        ("city", rf"^(?:dans quelle ville|dans quelle commune) (?:se (?:trouve|situe|deroule)|a lieu) {_ENTITY}$"),
+        ("department", rf"^(?:quel est le departement|dans quel departement se (?:trouve|situe)) {_ENTITY}$"),
+        ("postalcode", rf"^quel est le code postal {_ENTITY}$"),
+        ("age_min", rf"^quel est l age minimum(?: (?:requis|accepte|autorise))? {_ENTITY}$"),
+        ("age_max", rf"^quel est l age maximum(?: (?:requis|accepte|autorise))? {_ENTITY}$"),
+        ("url", rf"^quel est le site(?: web| internet)?(?: officiel)? {_ENTITY}$"),
+        ("dates", rf"^quand (?:a lieu|se deroule|commence) {_ENTITY}$"),
+    ]
+]
+
+# Clés de métadonnées de chaque attribut
+METADATA_KEYS = {
+    "address": "location_address",
+    "city": "location_city",
+    "department": "location_department",
+    "postalcode": "location_postalcode",
+    "age_min": "age_min",
+    "age_max": "age_max",
+    "url": "url",
+}
+
+ANSWER_TEMPLATES = {
+    "address": "L'adresse de {title} est : {value}.",
+    "city": "{title} se trouve à {value}.",
+    "department": "{title} se trouve dans le département : {value}.",
+    "postalcode": "Le code postal de {title} est {value}.",
+    "age_min": "L'âge minimum pour {title} est de {value} ans.",
+    "age_max": "L'âge maximum pour {title} est de {value} ans.",
+    "url": "Le site web de {title} est : {value}",
+    "dates": "{title} a lieu {value}.",
+}
+
+_ADDRESS_LINE = re.compile(r"^Adresse:\s*(.+)$", re.MULTILINE)
+_AGE_LINE = re.compile(r"^Âge:\s*(\S+)-(\S+) ans$", re.MULTILINE)
+_POSTAL_CODE = re.compile(r"\b(\d{5})\b")
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation, espaces normalisés."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", without_accents).split())
+
+
+def title_key(text: str) -> str:
+    """Clé de comparaison d'un titre: texte normalisé sans articles ni prépositions de tête."""
+    words = normalize_text(text).split()
+    while words and words[0] in _LEADING_WORDS:
+        words.pop(0)
+    return " ".join(words)
+
+
+def classify_question(question: str) -> Optional[Tuple[str, str]]:
+    """Attribut demandé et entité (clé de titre), ou None si ce n'est pas une question d'attribut."""
+    normalized = normalize_text(question)
+    for attribute, pattern in ATTRIBUTE_PATTERNS:
+        match = pattern.match(normalized)
+        if match:
+            entity = title_key(match.group("entity"))
+            if entity.startswith("evenement "):
+                entity = title_key(entity[len("evenement "):])
+            return attribute, entity
+    return None
+
+
+def _format_date(value: str) -> str:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime("%d/%m/%Y")
+    except ValueError:
+        return value
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def extract_attribute(attribute: str, documents: List[Any]) -> Optional[str]:
+    """
+    Valeur d'un attribut pour un événement.
+
+    Lue dans les métadonnées; à défaut (index construit avant l'ajout de ces
+    métadonnées), extraite du texte du chunk "practical".
+    """
+    metadata: Dict[str, Any] = {}
+    for doc in documents:
+        for key, value in doc.metadata.items():
+            if _is_missing(metadata.get(key)):
+                metadata[key] = value
+
+    if attribute == "dates":
+        begin, end = metadata.get("firstdate_begin"), metadata.get("lastdate_end")
+        if _is_missing(begin):
+            return None
+        if _is_missing(end) or _format_date(end) == _format_date(begin):
+            return f"le {_format_date(begin)}"
+        return f"du {_format_date(begin)} au {_format_date(end)}"
+
+    value = metadata.get(METADATA_KEYS[attribute])
+    if not _is_missing(value):
+        return str(value).strip()
+
+    practical = "\n".join(doc.page_content for doc in documents if doc.metadata.get("chunk_type") == "practical")
+    if attribute in ("address", "postalcode"):
+        match = _ADDRESS_LINE.search(practical)
+        # Sans adresse, le chunk reprend la ville: ce n'est pas une adresse
+        if not match or match.group(1).strip() == metadata.get("location_city"):
+            return None
+        if attribute == "address":
+            return match.group(1).strip()
+        postal = _POSTAL_CODE.search(match.group(1))
+        return postal.group(1) if postal else None
+    if attribute in ("age_min", "age_max"):
+        match = _AGE_LINE.search(practical)
+        if not match:
+            return None
+        age = match.group(1 if attribute == "age_min" else 2)
+        return None if age == "?" else age
+    return None
+
+
+@dataclass
+class TitleEntry:
+    """Événements partageant un même titre normalisé."""
+
+    title: str
+    chunk_ids: Dict[str, List[str]] = field(default_factory=dict)  # event_id -> identifiants docstore des chunks
+
+
+class TitleIndex:
+    """
+    Index des titres d'événements: correspondance exacte, puis approchée sur les titres partageant des mots.
+
+    Seuls les identifiants des chunks sont conservés; les documents sont relus
+    dans le docstore (`EventDocstore` joint les métadonnées à la lecture) pour
+    le titre reconnu.
+    """
+
+    def __init__(self, docstore: Any):
+        self.docstore = docstore
+        self.entries: Dict[str, TitleEntry] = {}
+        self._by_token: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_docstore(cls, docstore: Any, ids: Iterable[str]) -> "TitleIndex":
+        index = cls(docstore)
+        for docstore_id in ids:
+            doc = docstore.search(docstore_id)
+            title = doc.metadata.get("title") if isinstance(doc, Document) else None
+            if not title:
+                continue
+            key = title_key(title)
+            entry = index.entries.get(key)
+            if entry is None:
+                entry = index.entries[key] = TitleEntry(title=title)
+                for token in set(key.split()) - _LEADING_WORDS:
+                    index._by_token.setdefault(token, []).append(key)
+            entry.chunk_ids.setdefault(doc.metadata.get("event_id", ""), []).append(docstore_id)
+        logger.info(f"Index des titres construit: {len(index.entries)} titres")
+        return index
+
+    @classmethod
+    def from_documents(cls, documents: List[Document]) -> "TitleIndex":
+        docstore = InMemoryDocstore({str(i): doc for i, doc in enumerate(documents)})
+        return cls.from_docstore(docstore, [str(i) for i in range(len(documents))])
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: Any) -> "TitleIndex":
+        return cls.from_docstore(vectorstore.docstore, vectorstore.index_to_docstore_id.values())
+
+    def documents(self, entry: TitleEntry) -> Dict[str, List[Document]]:
+        """Chunks de chaque événement d'une entrée, relus dans le docstore."""
+        resolved = {}
+        for event_id, ids in entry.chunk_ids.items():
+            docs = [self.docstore.search(docstore_id) for docstore_id in ids]
+            resolved[event_id] = [doc for doc in docs if isinstance(doc, Document)]
+        return resolved
+
+    def match(self, entity: str, limit: int = 2, max_candidates: int = 50) -> List[Tuple[float, TitleEntry]]:
+        """Meilleurs titres pour une entité (clé de titre), avec leur score de similarité (1.0 = exact)."""
+        exact = self.entries.get(entity)
+        if exact is not None:
+            candidates = [key for key in self._candidates(entity, max_candidates) if key != entity]
+            scored = [(1.0, exact)] + [
+                (SequenceMatcher(None, entity, key).ratio(), self.entries[key]) for key in candidates
+            ]
+        else:
+            scored = [
+                (SequenceMatcher(None, entity, key).ratio(), self.entries[key])
+                for key in self._candidates(entity, max_candidates)
+            ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:limit]
+
+    def _candidates(self, entity: str, max_candidates: int) -> List[str]:
+        # Titres partageant le plus de mots avec l'entité (évite une comparaison avec tout le corpus)
+        shared: Dict[str, int] = {}
+        for token in set(entity.split()) - _LEADING_WORDS:
+            for key in self._by_token.get(token, ()):
+                shared[key] = shared.get(key, 0) + 1
+        return sorted(shared, key=shared.get, reverse=True)[:max_candidates]
+
+
+class FastPath:
+    """Répond aux questions d'attribut depuis les métadonnées quand le titre est reconnu avec confiance."""
+
+    def __init__(self, title_index: TitleIndex, min_score: Optional[float] = None, min_margin: Optional[float] = None):
+        """
+        Args:
+            title_index: Index des titres
+            min_score: Similarité minimale du titre (settings.fast_path_min_score par défaut)
+            min_margin: Écart minimal avec le deuxième titre (settings.fast_path_min_margin par défaut)
+        """
+        self.title_index = title_index
+        self.min_score = min_score if min_score is not None else settings.fast_path_min_score
+        self.min_margin = min_margin if min_margin is not None else settings.fast_path_min_margin
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "requests": 0,
+            "answered": 0,
+            "not_attribute": 0,
+            "low_confidence": 0,
+            "ambiguous": 0,
+            "missing_value": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Copie des compteurs (réponses directes et motifs de repli sur le RAG)."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def answer(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Réponse directe, ou None si la question doit suivre le pipeline RAG.
+
+        Returns:
+            answer, attribute, value, event_id, title, score et documents (chunks de l'événement)
+        """
+        self._count("requests")
+        classified = classify_question(question)
+        if classified is None:
+            self._count("not_attribute")
+            return None
+        attribute, entity = classified
+
+        matches = self.title_index.match(entity)
+        if not matches or matches[0][0] < self.min_score:
+            self._count("low_confidence")
+            return None
+        score, entry = matches[0]
+        if len(matches) > 1 and score - matches[1][0] < self.min_margin:
+            self._count("ambiguous")
+            logger.debug(f"Titre ambigu pour '{entity}': {entry.title} / {matches[1][1].title}")
+            return None
+
+        # Événements homonymes: la réponse n'est directe que si tous donnent la même valeur
+        documents_by_event = self.title_index.documents(entry)
+        values = {event_id: extract_attribute(attribute, docs) for event_id, docs in documents_by_event.items()}
+        distinct = set(values.values())
+        if None in distinct:
+            self._count("missing_value")
+            return None
+        if len(distinct) > 1:
+            self._count("ambiguous")
+            return None
+
+        event_id, documents = next(iter(documents_by_event.items()))
+        value = values[event_id]
+        self._count("answered")
+        logger.info(f"Réponse directe ({attribute}) pour {entry.title} (score {score:.2f})")
+        return {
+            "answer": ANSWER_TEMPLATES[attribute].format(title=entry.title, value=value),
+            "attribute": attribute,
+            "value": value,
+            "event_id": event_id,
+            "title": entry.title,
+            "score": score,
+            "documents": documents,
+        }
@@ -0,0 +1,227 @@
+"""
+Requêtes LLM couvertes (hedging) et repli sur une liste ordonnée de modèles.
+
+Le premier modèle est interrogé seul. S'il n'a produit aucun token au bout de
+`hedge_after_ms`, le même prompt est envoyé au modèle suivant (plus rapide ou
+plus petit); la première réponse complète l'emporte et les autres flux sont
+annulés. Un modèle en erreur déclenche immédiatement le repli sur le suivant.
+
+Les couvertures en cours (jusqu'à l'arrêt effectif de leur flux, y compris
+perdantes) sont plafonnées à `llm_hedge_max_in_flight`: sous charge, le
+hedging ne peut pas doubler le nombre d'appels Mistral.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.logger import get_logger
+from src.profiling import RequestTimer
+
+logger = get_logger(__name__)
+
+# Intervalle de vérification de l'annulation externe (échéance de la requête)
+_POLL_INTERVAL_S = 0.05
+
+
+class _Attempt:
+    """Génération en streaming d'un modèle, exécutée dans son propre thread."""
+
+    def __init__(
+        self,
+        index: int,
+        name: str,
+        chain: Any,
+        events: "queue.Queue[Tuple[str, _Attempt]]",
+        slot: Optional[threading.BoundedSemaphore] = None,
+    ):
+        self.index = index
+        self.name = name
+        self.chain = chain
+        self.events = events
+        self.slot = slot  # place de couverture, libérée à la fin du flux
+        self.cancel = threading.Event()
+        self.parts: List[str] = []
+        self.error: Optional[Exception] = None
+        self.first_token_at: Optional[float] = None
+
+    def start(self, prompt_value: Any) -> None:
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run,
+            args=(self._run, prompt_value),
+            name=f"llm-hedge-{self.name}",
+            daemon=True,
+        )
+        thread.start()
+
+    def _run(self, prompt_value: Any) -> None:
+        stream: Any = None
+        try:
+            stream = self.chain.stream(prompt_value)
+            for chunk in stream:
+                if self.cancel.is_set():
+                    return
+                if chunk and self.first_token_at is None:
+                    self.first_token_at = time.perf_counter()
+                    self.events.put(("first_token", self))
+                self.parts.append(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            # Fermeture du flux: la connexion HTTP d'une génération annulée est libérée
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            if self.slot is not None:
+                self.slot.release()
+        self.events.put(("done", self))
+
+
+class HedgedGenerator:
+    """Génère une réponse avec hedging et repli sur une liste ordonnée de chaînes LLM."""
+
+    def __init__(
+        self,
+        chains: List[Any],
+        model_names: List[str],
+        hedge_after_ms: float,
+        max_in_flight: Optional[int] = None,
+    ):
+        """
+        Args:
+            chains: Chaînes prompt -> texte (`llm | StrOutputParser()`), par ordre de préférence
+            model_names: Nom de chaque modèle (journaux et compteurs)
+            hedge_after_ms: Délai sans premier token avant d'interroger le modèle suivant
+                (0 = repli sur erreur uniquement)
+            max_in_flight: Couvertures simultanées maximum, toutes requêtes confondues
+                (settings.llm_hedge_max_in_flight par défaut)
+        """
+        if not chains:
+            raise ValueError("Au moins un modèle est requis")
+        self.chains = chains
+        self.model_names = model_names
+        self.hedge_after_ms = hedge_after_ms
+        self.max_in_flight = max_in_flight if max_in_flight is not None else settings.llm_hedge_max_in_flight
+        self._hedge_slots = threading.BoundedSemaphore(max(self.max_in_flight, 1))
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_skipped": 0,
+            "hedge_won": 0,
+            "fallback_on_error": 0,
+            "failed": 0,
+            "wins_by_model": {name: 0 for name in model_names},
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Copie des compteurs (hedging déclenché, gagné, replis sur erreur)."""
+        with self._stats_lock:
+            return {**self._stats, "wins_by_model": dict(self._stats["wins_by_model"])}
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def generate(
+        self,
+        prompt_value: Any,
+        timer: Optional[RequestTimer] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> str:
+        """
+        Génère la réponse du premier modèle à terminer.
+
+        Args:
+            prompt_value: Prompt déjà formaté
+            timer: Timer recevant `llm_first_token` (modèle gagnant)
+            cancel: Annulation externe (échéance dépassée): toutes les générations sont arrêtées
+
+        Raises:
+            Exception: La dernière erreur si tous les modèles ont échoué
+        """
+        self._count("requests")
+        start = time.perf_counter()
+        events: "queue.Queue[Tuple[str, _Attempt]]" = queue.Queue()
+        active: List[_Attempt] = []
+        next_index = 0
+        first_token_seen = False
+        hedged = False
+        hedge_skipped = False
+        hedge_at: Optional[float] = None
+
+        def launch(slot: Optional[threading.BoundedSemaphore] = None) -> None:
+            nonlocal next_index, hedge_at
+            attempt = _Attempt(next_index, self.model_names[next_index], self.chains[next_index], events, slot)
+            next_index += 1
+            active.append(attempt)
+            attempt.start(prompt_value)
+            if self.hedge_after_ms > 0:
+                hedge_at = time.perf_counter() + self.hedge_after_ms / 1000
+
+        def cancel_all() -> None:
+            for attempt in active:
+                attempt.cancel.set()
+
+        launch()
+        while True:
+            if cancel is not None and cancel.is_set():
+                cancel_all()
+                return ""
+
+            can_hedge = not first_token_seen and hedge_at is not None and next_index < len(self.chains)
+            wait = _POLL_INTERVAL_S
+            if can_hedge:
+                wait = min(wait, max(0.0, hedge_at - time.perf_counter()))
+
+            try:
+                kind, attempt = events.get(timeout=wait)
+            except queue.Empty:
+                if can_hedge and time.perf_counter() >= hedge_at:
+                    if self.max_in_flight <= 0 or not self._hedge_slots.acquire(blocking=False):
+                        # Plafond de couvertures atteint: nouvel essai au prochain intervalle
+                        if not hedge_skipped:
+                            hedge_skipped = True
+                            self._count("hedge_skipped")
+                        hedge_at = time.perf_counter() + _POLL_INTERVAL_S
+                        continue
+                    hedged = True
+                    self._count("hedged")
+                    logger.info(
+                        f"Pas de premier token de {active[-1].name} après {self.hedge_after_ms:.0f} ms, "
+                        f"requête couverte par {self.model_names[next_index]}"
+                    )
+                    launch(self._hedge_slots)
+                continue
+
+            if kind == "first_token":
+                first_token_seen = True
+                continue
+
+            active.remove(attempt)
+            if attempt.cancel.is_set():
+                continue
+            if attempt.error is not None:
+                logger.warning(f"Échec du modèle {attempt.name}: {attempt.error}")
+                if not active:
+                    if next_index >= len(self.chains):
+                        self._count("failed")
+                        raise attempt.error
+                    self._count("fallback_on_error")
+                    launch()
+                continue
+
+            # Première réponse complète: les autres générations sont annulées
+            cancel_all()
+            with self._stats_lock:
+                self._stats["wins_by_model"][attempt.name] += 1
+                if hedged and attempt.index > 0:
+                    self._stats["hedge_won"] += 1
+            if timer is not None and attempt.first_token_at is not None:
+                timer.record("llm_first_token", (attempt.first_token_at - start) * 1000)
+            return "".join(attempt.parts)
@@ -0,0 +1,409 @@
+"""
+Versions d'index FAISS et rechargement à chaud (déploiement bleu/vert).
+
+Chaque construction est publiée dans son propre répertoire, jamais modifié
+ensuite:
+
+    <index_registry_path>/
+        versions/<version>/       index.faiss, index.pkl, events.*, manifest.json
+        CURRENT                   nom de la version active
+
+La publication écrit d'abord dans un répertoire temporaire puis le renomme;
+le pointeur CURRENT est remplacé atomiquement (os.replace). Un processus qui
+lit CURRENT voit donc soit l'ancienne version complète, soit la nouvelle.
+
+IndexReloader charge une version en arrière-plan, la préchauffe avec
+quelques requêtes puis la substitue dans le RAGSystem; les requêtes en
+cours terminent sur l'ancien index. Les anciennes versions sont ensuite
+supprimées (les `index_keep_versions` plus récentes sont conservées).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from src.config import settings
+from src.docstore import normalize_vectorstore
+from src.event_index import EventIndex
+from src.logger import get_logger
+from src.sharding import write_shards
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+_STAGING_PREFIX = ".staging-"
+# Répertoires temporaires plus anciens: publication interrompue
+_STAGING_MAX_AGE_S = 3600
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexRegistry:
+    """Répertoires d'index versionnés, avec manifeste et pointeur de version courante."""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Racine du registre (settings.index_registry_path par défaut)
+        """
+        self.root = Path(root or settings.index_registry_path)
+        self.versions_dir = self.root / "versions"
+        self._lock = threading.Lock()
+
+    def version_path(self, version: str) -> Path:
+        return self.versions_dir / version
+
+    def version_of(self, index_path: Path) -> Optional[str]:
+        """Version correspondant à un répertoire d'index (None hors du registre)."""
+        path = Path(index_path).resolve()
+        return path.name if path.parent == self.versions_dir.resolve() else None
+
+    def current_version(self) -> Optional[str]:
+        """Version désignée par le pointeur CURRENT (None si aucune)."""
+        try:
+            version = (self.root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def current_path(self) -> Optional[Path]:
+        version = self.current_version()
+        return self.version_path(version) if version else None
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        with open(self.version_path(version) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Manifestes des versions publiées, de la plus ancienne à la plus récente."""
+        if not self.versions_dir.exists():
+            return []
+        manifests = []
+        for path in self.versions_dir.iterdir():
+            if path.is_dir() and (path / MANIFEST_FILE).exists():
+                manifests.append(self.manifest(path.name))
+        return sorted(manifests, key=lambda manifest: manifest["created_at"])
+
+    def publish(self, vectorstore: Any, activate: bool = True, **metadata: Any) -> str:
+        """
+        Publie un vectorstore comme nouvelle version.
+
+        Args:
+            vectorstore: Vectorstore FAISS à sauvegarder
+            activate: Faire pointer CURRENT sur la nouvelle version
+            **metadata: Informations ajoutées au manifeste (source, nombre d'événements...)
+
+        Returns:
+            Nom de la version publiée
+        """
+        def write(staging: Path) -> None:
+            normalize_vectorstore(vectorstore).save_local(str(staging))
+            EventIndex.from_vectorstore(vectorstore).save(str(staging))
+            if settings.index_sharding_enabled:
+                write_shards(vectorstore, str(staging))
+
+        return self._publish(write, vectorstore.index, activate, metadata)
+
+    def import_directory(self, index_path: str, activate: bool = True) -> str:
+        """Publie une copie d'un répertoire d'index existant (hors registre) comme nouvelle version."""
+        source = Path(index_path)
+        index = faiss.read_index(str(source / "index.faiss"))
+
+        def write(staging: Path) -> None:
+            _copy_index_files(source, staging)
+
+        return self._publish(write, index, activate, {"source": f"import:{index_path}"})
+
+    def publish_shards(self, keys: Optional[List[str]] = None, activate: bool = True) -> str:
+        """
+        Publie une copie de la version courante dont les shards sont (re)construits.
+
+        Les versions publiées ne sont jamais modifiées: les shards sont écrits
+        dans la copie en préparation, qui devient une nouvelle version.
+
+        Args:
+            keys: Shards à reconstruire (tous par défaut); les autres sont conservés
+            activate: Faire pointer CURRENT sur la nouvelle version
+
+        Returns:
+            Nom de la version publiée
+
+        Raises:
+            ValueError: Si aucune version n'est publiée
+        """
+        current = self.current_version()
+        if current is None:
+            raise ValueError("Aucune version d'index publiée")
+        source = self.version_path(current)
+        index = faiss.read_index(str(source / "index.faiss"))
+
+        def write(staging: Path) -> None:
+            _copy_index_files(source, staging)
+            # Vecteurs relus depuis l'index: aucune fonction d'embedding n'est nécessaire
+            vectorstore = FAISS.load_local(str(staging), None, allow_dangerous_deserialization=True)
+            write_shards(vectorstore, str(staging), keys=keys)
+
+        return self._publish(write, index, activate, {"source": f"shards:{current}"})
+
+    def _publish(self, write: Callable[[Path], None], index: Any, activate: bool, metadata: Dict[str, Any]) -> str:
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at:%Y%m%dT%H%M%S%f}-{index.ntotal}"
+        staging = self.versions_dir / f"{_STAGING_PREFIX}{version}"
+        staging.mkdir(parents=True)
+        try:
+            write(staging)
+            manifest = {
+                "version": version,
+                "created_at": created_at.isoformat(),
+                "num_vectors": index.ntotal,
+                "dimension": index.d,
+                "index_type": type(index).__name__,
+                "embedding_model": settings.embedding_model_name,
+                **metadata,
+                "files": {
+                    file.name: {"bytes": file.stat().st_size, "sha256": _sha256(file)}
+                    for file in sorted(staging.iterdir())
+                    if file.is_file()
+                },
+            }
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            # Renommage atomique: la version n'est visible qu'une fois complète
+            os.replace(staging, self.version_path(version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Version d'index publiée: {version} ({index.ntotal} vecteurs)")
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """Fait pointer CURRENT sur une version publiée (remplacement atomique)."""
+        if not (self.version_path(version) / MANIFEST_FILE).exists():
+            raise ValueError(f"Version d'index inconnue: {version}")
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f"{CURRENT_FILE}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(version)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.root / CURRENT_FILE)
+        logger.info(f"Version d'index active: {version}")
+
+    def gc(self, keep: Optional[int] = None, protect: Optional[Set[str]] = None) -> List[str]:
+        """
+        Supprime les anciennes versions.
+
+        Sont conservées: la version courante, les versions de `protect`
+        (chargées en mémoire) et les `keep` versions les plus récentes.
+
+        Returns:
+            Versions supprimées
+        """
+        keep = keep if keep is not None else settings.index_keep_versions
+        kept = set(protect or ())
+        current = self.current_version()
+        if current:
+            kept.add(current)
+        versions = [manifest["version"] for manifest in self.list_versions()]
+        kept.update(versions[-keep:] if keep > 0 else [])
+
+        removed = []
+        for version in versions:
+            if version not in kept:
+                shutil.rmtree(self.version_path(version), ignore_errors=True)
+                removed.append(version)
+        for staging in self.versions_dir.glob(f"{_STAGING_PREFIX}*"):
+            if time.time() - staging.stat().st_mtime > _STAGING_MAX_AGE_S:
+                shutil.rmtree(staging, ignore_errors=True)
+        if removed:
+            logger.info(f"Versions d'index supprimées: {', '.join(removed)}")
+        return removed
+
+
+def _copy_index_files(source: Path, staging: Path) -> None:
+    for file in source.iterdir():
+        if file.name == MANIFEST_FILE:
+            continue
+        if file.is_file():
+            shutil.copy2(file, staging / file.name)
+        elif file.is_dir():
+            # Shards de l'index
+            shutil.copytree(file, staging / file.name)
+
+
+def resolve_index_path() -> Path:
+    """Répertoire d'index à charger: version courante du registre, sinon `faiss_index_path`."""
+    if settings.index_registry_enabled:
+        current = get_index_registry().current_path()
+        if current is not None and current.exists():
+            return current
+    return Path(settings.faiss_index_path)
+
+
+class IndexReloader:
+    """Chargement en arrière-plan, préchauffage et substitution de l'index d'un RAGSystem."""
+
+    def __init__(self, rag_system: Any, registry: IndexRegistry, warmup_queries: Optional[List[str]] = None):
+        """
+        Args:
+            rag_system: Système RAG dont l'index est remplacé (méthode `swap_index`)
+            registry: Registre des versions
+            warmup_queries: Requêtes de préchauffage (settings.warmup_queries par défaut)
+        """
+        self.rag_system = rag_system
+        self.registry = registry
+        self.warmup_queries = warmup_queries if warmup_queries is not None else settings.warmup_queries
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {
+            "state": "idle",
+            "target_version": None,
+            "last_swap": None,
+            "last_error": None,
+            "swaps": 0,
+            "failures": 0,
+        }
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Copie de l'état (version chargée, rechargement en cours, dernière erreur)."""
+        with self._lock:
+            return {**self._status, "loaded_version": self.loaded_version}
+
+    @property
+    def loaded_version(self) -> Optional[str]:
+        """Version en service (None si l'index chargé est hors registre)."""
+        if self.rag_system.vectorstore is None:
+            return None
+        return self.registry.version_of(self.rag_system.index_path)
+
+    def reload(self, version: Optional[str] = None, activate: bool = False) -> bool:
+        """
+        Lance le chargement d'une version (la version courante par défaut) en arrière-plan.
+
+        Args:
+            version: Version à charger
+            activate: Fait d'abord pointer CURRENT sur `version`, seulement si le rechargement est accepté
+
+        Returns:
+            False si un rechargement est déjà en cours (CURRENT inchangé)
+
+        Raises:
+            ValueError: Si `version` à activer n'est pas publiée
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if activate and version:
+                self.registry.activate(version)
+            self._status.update(state="loading", target_version=version or self.registry.current_version())
+            self._thread = threading.Thread(
+                target=self._run, args=(self._status["target_version"],), name="index-reload", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Attend la fin du rechargement en cours."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self, version: Optional[str]) -> None:
+        start = time.perf_counter()
+        try:
+            if version is None:
+                raise ValueError("Aucune version d'index publiée")
+            manifest = self.registry.manifest(version)
+            if manifest.get("embedding_model") not in (None, settings.embedding_model_name):
+                raise ValueError(
+                    f"Version {version} construite avec {manifest['embedding_model']}, "
+                    f"modèle d'embedding chargé: {settings.embedding_model_name} (redémarrage nécessaire)"
+                )
+            self.rag_system.swap_index(self.registry.version_path(version), self.warmup_queries)
+        except Exception as e:
+            logger.error(f"Échec du rechargement de l'index ({version}): {e}", exc_info=True)
+            with self._lock:
+                self._status.update(state="failed", last_error=str(e))
+                self._status["failures"] += 1
+            return
+
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        with self._lock:
+            self._status.update(
+                state="idle",
+                last_error=None,
+                last_swap={"version": version, "at": datetime.now(timezone.utc).isoformat(), "duration_ms": duration_ms},
+            )
+            self._status["swaps"] += 1
+        logger.info(f"Index remplacé à chaud par la version {version} ({duration_ms:.0f} ms)")
+        self.registry.gc(protect={version})
+
+    def check_for_update(self) -> bool:
+        """Recharge si le pointeur CURRENT désigne une autre version que celle chargée."""
+        current = self.registry.current_version()
+        status = self.status
+        if current is None or current == status["loaded_version"]:
+            return False
+        # Pas de nouvelle tentative en boucle sur une version en échec
+        if status["state"] == "failed" and status["target_version"] == current:
+            return False
+        return self.reload(current)
+
+    def start_watching(self, interval_s: Optional[float] = None) -> None:
+        """Surveille le pointeur CURRENT dans un thread dédié."""
+        interval_s = interval_s if interval_s is not None else settings.index_watch_interval_s
+        if interval_s <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch() -> None:
+            while not self._stop.wait(interval_s):
+                try:
+                    self.check_for_update()
+                except Exception as e:
+                    logger.error(f"Erreur de surveillance du registre d'index: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="index-watch", daemon=True)
+        self._watcher.start()
+        logger.info(f"Surveillance du registre d'index toutes les {interval_s:.0f} s")
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+
+# Instance singleton
+_index_registry: Optional[IndexRegistry] = None
+
+
+def get_index_registry() -> IndexRegistry:
+    """Récupère l'instance singleton du registre d'index."""
+    global _index_registry
+    if _index_registry is None:
+        _index_registry = IndexRegistry()
+    return _index_registry
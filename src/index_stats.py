@@ -0,0 +1,135 @@
+"""
+Statistiques de l'index et du processus pour l'endpoint /stats.
+
+Le contenu de l'index (événements distincts, types de chunks, période
+couverte) est compté une fois au chargement, puis mis à jour chunk par chunk:
+la consultation ne parcourt jamais le docstore. Les valeurs structurelles
+(nombre de vecteurs, dimension, taille mémoire estimée, taille sur disque,
+RSS) sont lues directement, sans calcul coûteux.
+"""
+
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import faiss
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+_FLOAT_BYTES = 4
+_ID_BYTES = 8
+
+
+class IndexStats:
+    """Contenu de l'index (événements, types de chunks, dates), tenu à jour par ajout."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.num_chunks = 0
+        self.chunk_types: Counter = Counter()
+        self._event_ids: set = set()
+        self.date_min: Optional[str] = None
+        self.date_max: Optional[str] = None
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: Any) -> "IndexStats":
+        """Compte le contenu d'un vectorstore (un seul passage sur le docstore)."""
+        stats = cls()
+        docstore = vectorstore.docstore
+        stats.add(docstore.search(docstore_id).metadata for docstore_id in vectorstore.index_to_docstore_id.values())
+        return stats
+
+    def add(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Ajoute des chunks (leurs métadonnées) aux compteurs."""
+        with self._lock:
+            for metadata in metadatas:
+                self.num_chunks += 1
+                self.chunk_types[metadata.get("chunk_type") or "unknown"] += 1
+                if metadata.get("event_id"):
+                    self._event_ids.add(metadata["event_id"])
+                begin = str(metadata.get("firstdate_begin") or "")[:10]
+                end = str(metadata.get("lastdate_end") or "")[:10] or begin
+                if begin and (self.date_min is None or begin < self.date_min):
+                    self.date_min = begin
+                if end and (self.date_max is None or end > self.date_max):
+                    self.date_max = end
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "num_chunks": self.num_chunks,
+                "num_events": len(self._event_ids),
+                "chunk_types": dict(self.chunk_types),
+                "date_min": self.date_min,
+                "date_max": self.date_max,
+            }
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """Estimation de la mémoire occupée par un index FAISS (vecteurs et structures)."""
+    try:
+        code_size = index.sa_code_size()
+    except RuntimeError:
+        code_size = index.d * _FLOAT_BYTES
+    size = index.ntotal * code_size
+
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is not None:
+        # Identifiants des listes inversées, centroïdes et table d'adressage directe
+        size += index.ntotal * _ID_BYTES + ivf.nlist * index.d * _FLOAT_BYTES
+        if ivf.direct_map.type != faiss.DirectMap.NoMap:
+            size += index.ntotal * _ID_BYTES
+    if isinstance(index, faiss.IndexHNSW):
+        size += index.hnsw.neighbors.size() * _FLOAT_BYTES
+    return size
+
+
+def faiss_index_info(index: faiss.Index) -> Dict[str, Any]:
+    """Type, taille et paramètres de recherche d'un index FAISS."""
+    info: Dict[str, Any] = {
+        "type": type(index).__name__,
+        "num_vectors": index.ntotal,
+        "dimension": index.d,
+        "memory_bytes": index_memory_bytes(index),
+    }
+    try:
+        ivf = faiss.extract_index_ivf(index)
+        info.update(nlist=ivf.nlist, nprobe=ivf.nprobe)
+    except RuntimeError:
+        pass
+    if isinstance(index, faiss.IndexHNSW):
+        info.update(ef_search=index.hnsw.efSearch)
+    return info
+
+
+def directory_size(path: Path) -> int:
+    """Taille totale des fichiers d'un répertoire (ou d'un fichier), en octets."""
+    if path.is_file():
+        return path.stat().st_size
+    if not path.is_dir():
+        return 0
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Mémoire résidente du processus (psutil, sinon /proc), ou None si indisponible."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
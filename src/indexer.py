@@ -11,18 +11,18 @@ import requests
 from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from pydantic import SecretStr
-
-# Import optionnel de Mistral
-try:
-    from langchain_mistralai import MistralAIEmbeddings
-    MISTRAL_AVAILABLE = True
-except ImportError:
-    MISTRAL_AVAILABLE = False
 
 from src.config import settings
 from src.logger import get_logger
+from src.mistral_client import MISTRAL_AVAILABLE, create_embeddings
 from src.chunking import EventChunker
+from src.dedup import deduplicate_events
+from src.docstore import new_docstore, normalize_vectorstore
+from src.event_index import EventIndex
+from src.faiss_index import convert_vectorstore, parse_index_type
+from src.index_registry import get_index_registry
+from src.sharding import write_shards
+from src.synthetic import iter_events
 
 logger = get_logger(__name__)
 
@@ -111,9 +111,17 @@ class OpenAgendaFetcher:
 class FAISSIndexBuilder:
     """Constructeur d'index FAISS."""
 
-    def __init__(self, use_mistral: Optional[bool] = None):
+    def __init__(self, use_mistral: Optional[bool] = None, embeddings: Optional[Any] = None):
         self.use_mistral = use_mistral if use_mistral is not None else settings.use_mistral_embeddings
-        
+        self.chunker = EventChunker(chunk_size=300, overlap=50)
+
+        if embeddings is not None:
+            # Embeddings fournis (stubs pour benchmarks et tests): pas de client externe
+            self.use_mistral = False
+            self.embeddings = embeddings
+            self.embedding_model_name = type(embeddings).__name__
+            return
+
         if self.use_mistral and not MISTRAL_AVAILABLE:
             logger.error("Mistral demandé mais langchain-mistralai n'est pas installé")
             logger.error("Installation requise: pip install langchain-mistralai")
@@ -126,10 +134,7 @@ class FAISSIndexBuilder:
             if not settings.mistral_api_key:
                 raise ValueError("MISTRAL_API_KEY manquante dans les variables d'environnement")
             
-            self.embeddings = MistralAIEmbeddings(
-                model=settings.mistral_embedding_model,
-                api_key=SecretStr(settings.mistral_api_key),
-            )
+            self.embeddings = create_embeddings()
             self.embedding_model_name = settings.mistral_embedding_model
         else:
             logger.info(f"Utilisation de HuggingFace: {settings.huggingface_embedding_model}")
@@ -142,8 +147,6 @@ class FAISSIndexBuilder:
             )
             self.embedding_model_name = settings.huggingface_embedding_model
 
-        self.chunker = EventChunker(chunk_size=300, overlap=50)
-
     def create_documents(self, events: List[dict]) -> List[Document]:
         return self.chunker.create_chunks(events)
 
@@ -156,7 +159,9 @@ class FAISSIndexBuilder:
             estimated_cost = (estimated_tokens / 1_000_000) * 0.01
             logger.warning(f"Coût estimé Mistral: environ {estimated_cost:.4f} EUR ({estimated_tokens:,} tokens)")
 
-        vectorstore = FAISS.from_documents(documents, self.embeddings)
+        vectorstore = FAISS.from_documents(documents, self.embeddings, docstore=new_docstore())
+        if parse_index_type(settings.faiss_index_type)[0] != "Flat":
+            vectorstore = convert_vectorstore(vectorstore, settings.faiss_index_type)
 
         logger.info(f"Index FAISS créé: {vectorstore.index.ntotal} vecteurs")
         return vectorstore
@@ -166,11 +171,15 @@ class FAISSIndexBuilder:
         save_path.parent.mkdir(parents=True, exist_ok=True)
 
         logger.info(f"Sauvegarde de l'index dans {save_path}")
-        vectorstore.save_local(str(save_path))
+        normalize_vectorstore(vectorstore).save_local(str(save_path))
+        # Index d'événements (recherche en deux étapes), dérivé des vecteurs des chunks
+        EventIndex.from_vectorstore(vectorstore).save(str(save_path))
+        if settings.index_sharding_enabled:
+            write_shards(vectorstore, str(save_path))
         logger.info("Index sauvegardé avec succès")
 
 
-def build_index_from_openagenda() -> None:
+def build_index_from_openagenda(events_path: Optional[Path] = None) -> None:
     logger.info("Démarrage du processus de construction de l'index...")
     
     logger.info(f"Config use_mistral_embeddings: {settings.use_mistral_embeddings}")
@@ -183,8 +192,14 @@ def build_index_from_openagenda() -> None:
         logger.info("Mode GRATUIT activé: HuggingFace")
 
     json_path = Path("data/raw/openagenda.json")
-    
-    if json_path.exists():
+    events = None
+
+    if events_path is not None:
+        # Fichier fourni explicitement (JSON ou JSONL, ex: corpus synthétique)
+        logger.info(f"Chargement des événements depuis {events_path}")
+        events = list(iter_events(Path(events_path)))
+        logger.info(f"{len(events)} événements chargés depuis le fichier")
+    elif json_path.exists():
         logger.info(f"Fichier JSON existant trouvé: {json_path}")
         logger.info("Chargement des événements depuis le fichier...")
         
@@ -198,7 +213,6 @@ def build_index_from_openagenda() -> None:
             events = None
     else:
         logger.info("Aucun fichier JSON trouvé, récupération depuis OpenAgenda...")
-        events = None
     
     if events is None:
         fetcher = OpenAgendaFetcher()
@@ -214,10 +228,28 @@ def build_index_from_openagenda() -> None:
 
         fetcher.save_raw_events(events, json_path)
 
+    dedup_metadata = {}
+    if settings.dedup_enabled:
+        # Événements récurrents ou republiés: un seul événement indexé, dates fusionnées
+        events, dedup_report = deduplicate_events(events)
+        dedup_metadata = {"dedup_ratio": dedup_report.dedup_ratio, "duplicates_removed": dedup_report.duplicates_removed}
+
     builder = FAISSIndexBuilder()
     documents = builder.create_documents(events)
     vectorstore = builder.build_index(documents)
-    builder.save_index(vectorstore, settings.faiss_index_path)
+    if settings.index_registry_enabled:
+        # Nouvelle version à côté de celle en service, puis bascule du pointeur "current"
+        registry = get_index_registry()
+        registry.publish(
+            vectorstore,
+            source=str(events_path or json_path),
+            num_events=len(events),
+            chunk_size=builder.chunker.chunk_size,
+            **dedup_metadata,
+        )
+        registry.gc()
+    else:
+        builder.save_index(vectorstore, settings.faiss_index_path)
 
     logger.info("Construction de l'index terminée")
 
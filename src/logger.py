@@ -1,55 +1,171 @@
 """
 Module de logging pour l'application.
+
+Les messages sont mis en file sur le thread appelant (QueueHandler) et écrits
+par un thread dédié (QueueListener): les écritures console et fichier
+n'apparaissent jamais dans la latence des requêtes.
 """
 
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import zlib
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List, Optional
 
 from src.config import settings
 
+# Identifiant de la requête en cours (positionné par le middleware de l'API)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Ajoute `request_id` à chaque message (\"-\" hors requête)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class InfoSamplingFilter(logging.Filter):
+    """
+    Échantillonne les messages INFO émis pendant une requête.
+
+    Une requête sur `sample_rate` conserve tous ses messages INFO (décision
+    déterministe sur l'identifiant, les traces restent complètes); les
+    messages hors requête et les niveaux WARNING et plus sont toujours conservés.
+    """
+
+    def __init__(self, sample_rate: int):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate <= 1 or record.levelno != logging.INFO:
+            return True
+        request_id = request_id_var.get()
+        if request_id is None:
+            return True
+        return zlib.crc32(request_id.encode()) % self.sample_rate == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(log_file: Path) -> logging.FileHandler:
+    if settings.log_rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file,
+            when=settings.log_rotate_when,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+        )
+    if settings.log_max_bytes > 0:
+        return logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=settings.log_max_bytes,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+        )
+    return logging.FileHandler(log_file, encoding="utf-8")
+
+
+def stop_logging() -> None:
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
 
 def setup_logging() -> None:
     """
     Configure le système de logging.
-    
+
     Crée un logger avec:
     - Handler console (stdout)
-    - Handler fichier (si spécifié)
-    - Format personnalisé
+    - Handler fichier avec rotation (si spécifié)
+    - Format personnalisé ou JSON
+    - File d'attente et thread d'écriture (si log_async)
     """
+    global _listener
+
     # Configuration du format
     log_format = settings.log_format
     date_format = "%Y-%m-%d %H:%M:%S"
-    
+
     # Formatter
-    formatter = logging.Formatter(log_format, datefmt=date_format)
-    
+    if settings.log_json:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(log_format, datefmt=date_format)
+
     # Root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(settings.log_level)
-    
-    # Supprimer les handlers existants
+
+    # Supprimer les handlers existants (et le thread d'écriture précédent)
+    stop_logging()
     root_logger.handlers.clear()
-    
+
+    handlers: List[logging.Handler] = []
+
     # Handler console
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(settings.log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
+    handlers.append(console_handler)
+
     # Handler fichier (si configuré)
     if settings.log_file:
         log_file = Path(settings.log_file)
-        
+
         # Créer le dossier logs si nécessaire
         log_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+
+        file_handler = _file_handler(log_file)
         file_handler.setLevel(settings.log_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    # Les filtres s'exécutent sur le thread appelant: l'identifiant de requête
+    # (variable de contexte) y est encore accessible
+    filters = [RequestIdFilter(), InfoSamplingFilter(settings.log_info_sample_rate)]
+    if settings.log_async:
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        for log_filter in filters:
+            queue_handler.addFilter(log_filter)
+        root_logger.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            for log_filter in filters:
+                handler.addFilter(log_filter)
+            root_logger.addHandler(handler)
+
     # Réduire le niveau de log pour les bibliothèques tierces
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("httpcore").setLevel(logging.WARNING)
@@ -61,10 +177,10 @@ def setup_logging() -> None:
 def get_logger(name: str) -> logging.Logger:
     """
     Récupère un logger avec le nom spécifié.
-    
+
     Args:
         name: Nom du logger (généralement __name__)
-    
+
     Returns:
         Logger configuré
     """
@@ -74,13 +190,13 @@ def get_logger(name: str) -> logging.Logger:
 class LoggerMixin:
     """
     Mixin pour ajouter un logger aux classes.
-    
+
     Usage:
         class MyClass(LoggerMixin):
             def my_method(self):
                 self.logger.info("Message")
     """
-    
+
     @property
     def logger(self) -> logging.Logger:
         """Retourne un logger pour la classe."""
@@ -90,3 +206,4 @@ class LoggerMixin:
 
 # Configuration automatique au chargement du module
 setup_logging()
+atexit.register(stop_logging)
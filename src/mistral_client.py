@@ -0,0 +1,311 @@
+"""
+Fabrique unique des clients Mistral (chat et embeddings).
+
+Tous les appels Mistral du processus passent par les mêmes clients HTTP:
+- pool de connexions keep-alive partagé (pas de handshake TLS par requête)
+- timeouts configurables (connexion et lecture)
+- retries avec backoff exponentiel et jitter sur 429/5xx et erreurs réseau,
+  en respectant l'en-tête Retry-After
+- token bucket commun dimensionné sur le quota Mistral, consulté avant chaque tentative
+
+Les connexions asynchrones sont liées à leur boucle d'événements: le client
+asynchrone partagé tient un pool par boucle (RAGAS exécute chaque évaluation
+dans un nouvel `asyncio.run`, dont la boucle est fermée ensuite).
+
+Les retries des classes LangChain sont désactivés pour ne pas les cumuler.
+"""
+
+import asyncio
+import itertools
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from pydantic import SecretStr
+from langchain_mistralai import ChatMistralAI
+
+# Import optionnel de Mistral embeddings
+try:
+    from langchain_mistralai import MistralAIEmbeddings
+    MISTRAL_AVAILABLE = True
+except ImportError:
+    MISTRAL_AVAILABLE = False
+
+from src.config import settings
+from src.logger import get_logger
+from src.rate_limit import TokenBucket, get_mistral_rate_limiter
+
+logger = get_logger(__name__)
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en secondes."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Politique de retry partagée par les transports synchrone et asynchrone."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        backoff_s: Optional[float] = None,
+        max_backoff_s: Optional[float] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        self.max_retries = max_retries if max_retries is not None else settings.mistral_max_retries
+        self.backoff_s = backoff_s if backoff_s is not None else settings.mistral_retry_backoff_s
+        self.max_backoff_s = max_backoff_s if max_backoff_s is not None else settings.mistral_retry_max_backoff_s
+        self.rate_limiter = rate_limiter or get_mistral_rate_limiter()
+        self.stats: Dict[str, int] = {"requests": 0, "retries": 0, "rate_limited": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Attente avant la tentative suivante (full jitter, ou Retry-After s'il est plus long)."""
+        jittered = random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt))
+        if retry_after is not None:
+            return max(retry_after, jittered)
+        return jittered
+
+    def should_retry(self, response: httpx.Response, attempt: int) -> bool:
+        if response.status_code == 429:
+            self.count("rate_limited")
+        return response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries
+
+    def log_retry(self, request: httpx.Request, attempt: int, delay: float, reason: str) -> None:
+        self.count("retries")
+        logger.warning(
+            f"Mistral {request.url.path}: {reason}, nouvelle tentative "
+            f"{attempt + 1}/{self.max_retries} dans {delay:.2f}s"
+        )
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Transport synchrone avec limitation de débit et retries."""
+
+    def __init__(self, transport: httpx.BaseTransport, policy: RetryPolicy, sleep: Callable[[float], None] = time.sleep):
+        self._transport = transport
+        self.policy = policy
+        self._sleep = sleep
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        for attempt in itertools.count():
+            self.policy.rate_limiter.acquire()
+            self.policy.count("requests")
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                if attempt >= self.policy.max_retries:
+                    self.policy.count("errors")
+                    raise
+                delay = self.policy.delay(attempt)
+                self.policy.log_retry(request, attempt, delay, type(e).__name__)
+            else:
+                if not self.policy.should_retry(response, attempt):
+                    return response
+                delay = self.policy.delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                response.close()
+                self.policy.log_retry(request, attempt, delay, f"HTTP {response.status_code}")
+            self._sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Transport asynchrone avec limitation de débit et retries."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: RetryPolicy):
+        self._transport = transport
+        self.policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        for attempt in itertools.count():
+            await self.policy.rate_limiter.acquire_async()
+            self.policy.count("requests")
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                if attempt >= self.policy.max_retries:
+                    self.policy.count("errors")
+                    raise
+                delay = self.policy.delay(attempt)
+                self.policy.log_retry(request, attempt, delay, type(e).__name__)
+            else:
+                if not self.policy.should_retry(response, attempt):
+                    return response
+                delay = self.policy.delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                await response.aclose()
+                self.policy.log_retry(request, attempt, delay, f"HTTP {response.status_code}")
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Transport asynchrone tenant un pool de connexions par boucle d'événements."""
+
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport]):
+        self._factory = factory
+        # Les pools des boucles fermées disparaissent avec elles
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = self._factory()
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # Seul le pool de la boucle courante peut être fermé proprement
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+            self._transports.clear()
+        if transport is not None:
+            await transport.aclose()
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "base_url": settings.mistral_base_url,
+        "headers": {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"Bearer {settings.mistral_api_key}",
+        },
+        "timeout": httpx.Timeout(settings.mistral_timeout_s, connect=settings.mistral_connect_timeout_s),
+    }
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.mistral_pool_max_connections,
+        max_keepalive_connections=settings.mistral_pool_max_keepalive,
+        keepalive_expiry=settings.mistral_keepalive_expiry_s,
+    )
+
+
+# Instances singleton
+_retry_policy: Optional[RetryPolicy] = None
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_clients_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Récupère la politique de retry partagée (et ses compteurs)."""
+    global _retry_policy
+    with _clients_lock:
+        if _retry_policy is None:
+            _retry_policy = RetryPolicy()
+        return _retry_policy
+
+
+def get_retry_stats() -> Optional[Dict[str, int]]:
+    """Copie des compteurs de retry, ou None si aucun client Mistral n'a encore été créé."""
+    policy = _retry_policy
+    if policy is None:
+        return None
+    with policy._stats_lock:
+        return dict(policy.stats)
+
+
+def get_mistral_http_client() -> httpx.Client:
+    """Récupère le client HTTP synchrone partagé par tous les appels Mistral."""
+    global _http_client
+    policy = get_retry_policy()
+    with _clients_lock:
+        if _http_client is None:
+            transport = RetryTransport(httpx.HTTPTransport(limits=_pool_limits()), policy)
+            _http_client = httpx.Client(transport=transport, **_client_options())
+        return _http_client
+
+
+def get_mistral_async_http_client() -> httpx.AsyncClient:
+    """Récupère le client HTTP asynchrone partagé par tous les appels Mistral (un pool par boucle)."""
+    global _async_http_client
+    policy = get_retry_policy()
+    with _clients_lock:
+        if _async_http_client is None:
+            pools = LoopLocalTransport(lambda: httpx.AsyncHTTPTransport(limits=_pool_limits()))
+            transport = AsyncRetryTransport(pools, policy)
+            _async_http_client = httpx.AsyncClient(transport=transport, **_client_options())
+        return _async_http_client
+
+
+async def close_mistral_clients() -> None:
+    """Ferme les clients partagés (arrêt de l'application)."""
+    global _http_client, _async_http_client
+    with _clients_lock:
+        client, async_client = _http_client, _async_http_client
+        _http_client = _async_http_client = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
+
+
+def create_chat_model(model_name: Optional[str] = None, **kwargs: Any) -> ChatMistralAI:
+    """
+    Crée un modèle de chat Mistral branché sur les clients partagés.
+
+    Args:
+        model_name: Modèle (settings.mistral_model_name par défaut)
+        **kwargs: Paramètres de génération (temperature, max_tokens, ...)
+    """
+    return ChatMistralAI(
+        model=model_name or settings.mistral_model_name,
+        api_key=SecretStr(settings.mistral_api_key),
+        client=get_mistral_http_client(),
+        async_client=get_mistral_async_http_client(),
+        max_retries=1,  # retries gérés par le transport partagé
+        **kwargs,
+    )
+
+
+def create_embeddings(model_name: Optional[str] = None) -> "MistralAIEmbeddings":
+    """Crée un client d'embeddings Mistral branché sur les clients partagés."""
+    if not MISTRAL_AVAILABLE:
+        logger.error("Mistral demandé mais langchain-mistralai n'est pas installé")
+        raise ImportError("langchain-mistralai n'est pas installé")
+
+    return MistralAIEmbeddings(
+        model=model_name or settings.mistral_embedding_model,
+        api_key=SecretStr(settings.mistral_api_key),
+        client=get_mistral_http_client(),
+        async_client=get_mistral_async_http_client(),
+        max_retries=None,  # retries gérés par le transport partagé
+        wait_time=None,
+    )
@@ -0,0 +1,194 @@
+"""
+Outils de profilage des requêtes: découpage temporel par étape et échantillonnage cProfile.
+
+cProfile ne suit que le thread qui l'active: les étapes exécutées dans les pools
+de `src.budget` sont profilées dans leur thread (`profile_worker`) et leurs
+profils fusionnés dans celui de la requête échantillonnée.
+"""
+
+import cProfile
+import contextvars
+import itertools
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional, TypeVar
+
+from src.config import settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Profils des threads de travail de la requête échantillonnée en cours (None hors échantillon)
+_worker_profiles: contextvars.ContextVar[Optional[list[cProfile.Profile]]] = contextvars.ContextVar(
+    "worker_profiles", default=None
+)
+
+
+class RequestTimer:
+    """Accumule la durée (en millisecondes) de chaque étape d'une requête."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mesure la durée du bloc et l'ajoute à l'étape `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Ajoute une durée à une étape (les appels successifs sont cumulés)."""
+        self.timings[name] = self.timings.get(name, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        """Durée écoulée depuis la création du timer."""
+        return (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self) -> dict[str, float]:
+        """Retourne le découpage arrondi, avec la durée totale."""
+        breakdown = {name: round(value, 2) for name, value in self.timings.items()}
+        breakdown["total"] = round(self.elapsed_ms(), 2)
+        return breakdown
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentile par interpolation linéaire (0 si la liste est vide)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize_latencies(values: list[float]) -> dict[str, float]:
+    """Résumé p50/p95/p99/moyenne/max d'une série de latences (ms)."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "mean": round(sum(values) / len(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+class ProfileSampler:
+    """
+    Capture un profil cProfile pour 1 requête sur N.
+
+    Les profils sont écrits au format `.prof` (lisible avec pstats ou snakeviz)
+    dans un répertoire tournant: seuls les `max_files` plus récents sont conservés.
+    """
+
+    def __init__(self, sample_rate: int = 0, output_dir: str = "logs/profiles", max_files: int = 50):
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir)
+        self.max_files = max_files
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def should_sample(self) -> bool:
+        """Indique si la requête courante doit être profilée."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            count = next(self._counter)
+        return count % self.sample_rate == 0
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        """Profile le bloc et sauvegarde le résultat dans le répertoire tournant."""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Un autre profiler est déjà actif (requêtes concurrentes): on n'échantillonne pas celle-ci
+            yield
+            return
+
+        workers: list[cProfile.Profile] = []
+        token = _worker_profiles.set(workers)
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _worker_profiles.reset(token)
+            # Copie: une étape abandonnée peut encore terminer pendant la sauvegarde
+            self._dump([profiler, *list(workers)], label)
+
+    def _dump(self, profilers: list[cProfile.Profile], label: str) -> Optional[Path]:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.prof"
+            stats = pstats.Stats(*profilers)
+            stats.dump_stats(str(path))
+            self._rotate()
+            logger.debug(f"Profil sauvegardé: {path}")
+            return path
+        except OSError as e:
+            logger.warning(f"Impossible de sauvegarder le profil: {e}")
+            return None
+
+    def _rotate(self) -> None:
+        profiles = sorted(self.output_dir.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+        for old_profile in profiles[:max(len(profiles) - self.max_files, 0)]:
+            old_profile.unlink(missing_ok=True)
+
+
+def profile_worker(func: Callable[[], T]) -> Callable[[], T]:
+    """
+    Enveloppe une étape exécutée dans un autre thread pour qu'elle soit profilée.
+
+    Sans effet hors d'une requête échantillonnée; doit être appelée dans le
+    contexte copié de la requête (`contextvars.copy_context().run`).
+    """
+
+    def run() -> T:
+        workers = _worker_profiles.get()
+        if workers is None:
+            return func()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return func()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+            workers.append(profiler)
+
+    return run
+
+
+# Instance singleton
+_profile_sampler: Optional[ProfileSampler] = None
+
+
+def get_profile_sampler() -> ProfileSampler:
+    """Récupère l'instance singleton de l'échantillonneur de profils."""
+    global _profile_sampler
+    if _profile_sampler is None:
+        _profile_sampler = ProfileSampler(
+            sample_rate=settings.profiling_sample_rate,
+            output_dir=settings.profiling_output_dir,
+            max_files=settings.profiling_max_files,
+        )
+    return _profile_sampler
@@ -2,26 +2,36 @@
 Système RAG pour la recherche d'événements culturels.
 """
 
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
-from pydantic import SecretStr
+import numpy as np
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_mistralai import ChatMistralAI
-
-# Import optionnel de Mistral embeddings
-try:
-    from langchain_mistralai import MistralAIEmbeddings
-    MISTRAL_AVAILABLE = True
-except ImportError:
-    MISTRAL_AVAILABLE = False
 
+from src.budget import BudgetExceeded, Deadline, run_with_budget
 from src.config import settings
+from src.context_packing import pack_context
+from src.event_index import EventIndex
+from src.fast_path import FastPath, TitleIndex
+from src.scope_guard import ScopeGuard
+from src.search import SearchFilters
+from src.sharding import ShardedIndex
+from src.hedging import HedgedGenerator
+from src.faiss_index import set_nprobe
+from src.index_registry import resolve_index_path
+from src.index_stats import IndexStats, directory_size, faiss_index_info
 from src.logger import get_logger
+from src.mistral_client import create_chat_model, create_embeddings
+from src.profiling import RequestTimer, get_profile_sampler
 from src.prompts import ANTI_HALLUCINATION_PROMPT
 
 # Import optionnel du reranker
@@ -33,6 +43,20 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+DEGRADED_ANSWER = (
+    "La génération de la réponse a dépassé le délai imparti. "
+    "Voici les événements les plus pertinents trouvés pour votre question."
+)
+
+
+def format_docs(docs: list) -> str:
+    """Construit le contexte du prompt (regroupé par événement sous budget de tokens, ou concaténé)."""
+    if settings.rag_context_packing:
+        return pack_context(docs)
+    return "\n\n".join(doc.page_content for doc in docs)
+
 
 class RAGSystem:
     """Système RAG pour la recherche d'événements culturels."""
@@ -51,69 +75,190 @@ class RAGSystem:
             model_name: Nom du modèle Mistral pour le LLM
             use_mistral_embeddings: Si True, utilise Mistral pour embeddings, sinon HuggingFace
         """
-        self.index_path = Path(index_path or settings.faiss_index_path)
+        # Par défaut: version courante du registre d'index, sinon faiss_index_path
+        self.index_path = Path(index_path) if index_path else resolve_index_path()
         self.model_name = model_name or settings.mistral_model_name
         self.use_mistral_embeddings = use_mistral_embeddings if use_mistral_embeddings is not None else settings.use_mistral_embeddings
 
         self.embeddings = None
         self.vectorstore = None
+        self.event_index: Optional[EventIndex] = None
+        self.shards: Optional[ShardedIndex] = None
+        self.fast_path: Optional[FastPath] = None
+        self.scope_guard: Optional[ScopeGuard] = None
         self.llm = None
+        self.fallback_llms: dict[str, Any] = {}
+        self.hedger: Optional[HedgedGenerator] = None
         self.qa_chain = None
+        self.prompt = None
+        self.generation_chain = None
         self.retriever = None
         self.reranker = None
+        self.index_stats: Optional[IndexStats] = None
+        # Durées de chargement (ms) des modèles et structures dérivées de l'index
+        self.load_times: dict[str, float] = {}
+        self._index_lock = threading.Lock()
 
         logger.info("Système RAG initialisé")
 
     def load_index(self) -> None:
         """Charge l'index FAISS depuis le disque."""
-        if not self.index_path.exists():
+        state = self._load_index_state(self.index_path)
+        self._apply_index_state(self.index_path, state)
+
+    def swap_index(self, index_path: Path, warmup_queries: Optional[list[str]] = None) -> None:
+        """
+        Remplace l'index chargé par celui de `index_path`, sans interrompre le service.
+
+        Le nouvel index et ses structures dérivées sont chargés à côté de
+        l'index courant, préchauffés, puis substitués en une fois; les requêtes
+        en cours gardent leur référence à l'ancien index jusqu'à leur fin.
+
+        Args:
+            index_path: Répertoire du nouvel index
+            warmup_queries: Requêtes exécutées sur le nouvel index avant la substitution
+        """
+        index_path = Path(index_path)
+        state = self._load_index_state(index_path)
+        if warmup_queries:
+            start = time.perf_counter()
+            self._warm_up(state["vectorstore"], warmup_queries)
+            state["load_times"]["warmup"] = round((time.perf_counter() - start) * 1000, 2)
+        self._apply_index_state(index_path, state)
+        logger.info(f"Index remplacé: {index_path} ({state['vectorstore'].index.ntotal} vecteurs)")
+
+    def _load_index_state(self, index_path: Path) -> dict[str, Any]:
+        """Charge un index et ses structures dérivées, sans modifier l'index en service."""
+        if not index_path.exists():
             raise FileNotFoundError(
-                f"Index FAISS introuvable: {self.index_path}. "
+                f"Index FAISS introuvable: {index_path}. "
                 "Veuillez construire l'index avec /rebuild ou scripts/build_index.py"
             )
 
-        logger.info(f"Chargement de l'index FAISS depuis {self.index_path}")
-
-        # Charger les embeddings selon la configuration
-        if self.use_mistral_embeddings:
-            if not MISTRAL_AVAILABLE:
-                logger.error("Mistral demandé mais langchain-mistralai n'est pas installé")
-                raise ImportError("langchain-mistralai n'est pas installé")
-            
-            logger.info(f"Utilisation de Mistral AI Embeddings: {settings.mistral_embedding_model}")
-            self.embeddings = MistralAIEmbeddings(
-                model=settings.mistral_embedding_model,
-                api_key=SecretStr(settings.mistral_api_key),
-            )
-        else:
-            logger.info(f"Utilisation de HuggingFace Embeddings: {settings.huggingface_embedding_model}")
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=settings.huggingface_embedding_model,
-                model_kwargs={"device": "cpu"},
-                encode_kwargs={"normalize_embeddings": True},
-            )
+        logger.info(f"Chargement de l'index FAISS depuis {index_path}")
+        timer = RequestTimer()
+
+        # Charger les embeddings selon la configuration (une seule fois: réutilisés au rechargement)
+        if self.embeddings is None:
+            with timer.stage("embeddings"):
+                if self.use_mistral_embeddings:
+                    logger.info(f"Utilisation de Mistral AI Embeddings: {settings.mistral_embedding_model}")
+                    self.embeddings = create_embeddings()
+                else:
+                    logger.info(f"Utilisation de HuggingFace Embeddings: {settings.huggingface_embedding_model}")
+                    self.embeddings = HuggingFaceEmbeddings(
+                        model_name=settings.huggingface_embedding_model,
+                        model_kwargs={"device": "cpu"},
+                        encode_kwargs={"normalize_embeddings": True},
+                    )
 
         # Charger le vectorstore
-        self.vectorstore = FAISS.load_local(
-            str(self.index_path),
-            self.embeddings,
-            allow_dangerous_deserialization=True,
-        )
+        with timer.stage("faiss_index"):
+            vectorstore = FAISS.load_local(
+                str(index_path),
+                self.embeddings,
+                allow_dangerous_deserialization=True,
+            )
+            set_nprobe(vectorstore.index, settings.faiss_nprobe)
+        logger.info(f"Index FAISS chargé: {vectorstore.index.ntotal} vecteurs")
 
-        logger.info(f"Index FAISS chargé: {self.vectorstore.index.ntotal} vecteurs")
+        state: dict[str, Any] = {
+            "vectorstore": vectorstore, "event_index": None, "shards": None, "fast_path": None, "scope_guard": None,
+        }
+        if settings.rag_two_stage_retrieval:
+            with timer.stage("event_index"):
+                state["event_index"] = self._load_event_index(index_path, vectorstore)
+        if settings.index_sharding_enabled:
+            with timer.stage("shards"):
+                state["shards"] = self._load_shards(index_path, vectorstore)
+        if settings.fast_path_enabled:
+            with timer.stage("fast_path"):
+                state["fast_path"] = FastPath(TitleIndex.from_vectorstore(vectorstore))
+        if settings.scope_guard_enabled:
+            with timer.stage("scope_guard"):
+                state["scope_guard"] = ScopeGuard.from_vectorstore(vectorstore)
+        with timer.stage("index_stats"):
+            state["index_stats"] = IndexStats.from_vectorstore(vectorstore)
+        state["load_times"] = {name: round(value, 2) for name, value in timer.timings.items()}
+        return state
+
+    def _apply_index_state(self, index_path: Path, state: dict[str, Any]) -> None:
+        # Les requêtes en cours gardent leurs références locales à l'ancien index
+        with self._index_lock:
+            self.index_path = index_path
+            self.vectorstore = state["vectorstore"]
+            self.event_index = state["event_index"]
+            self.shards = state["shards"]
+            self.fast_path = state["fast_path"]
+            self.scope_guard = state["scope_guard"]
+            self.index_stats = state["index_stats"]
+            self.load_times.update(state["load_times"])
+            if self.retriever is not None:
+                self.retriever = self.vectorstore.as_retriever(
+                    search_type="mmr",
+                    search_kwargs=self.retriever.search_kwargs,
+                )
+
+    def _warm_up(self, vectorstore: Any, queries: list[str]) -> None:
+        """Exécute quelques recherches sur un index pas encore en service (pages mémoire, docstore)."""
+        query_vectors = self.embed_questions(queries)
+        fetch_k = max(settings.rag_fetch_k, settings.rag_top_k)
+        _, indices = vectorstore.index.search(query_vectors, fetch_k)
+        for row in indices:
+            for position in row:
+                if position != -1:
+                    vectorstore.index.reconstruct(int(position))
+                    vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(position)])
+
+    def load_event_index(self) -> None:
+        """Charge l'index d'événements (reconstruit depuis les chunks s'il est absent ou obsolète)."""
+        self.event_index = self._load_event_index(self.index_path, self.vectorstore)
+
+    def _load_event_index(self, index_path: Path, vectorstore: Any) -> EventIndex:
+        event_index = EventIndex.load(str(index_path))
+        if event_index is None or event_index.is_stale(vectorstore):
+            logger.info("Index d'événements absent ou obsolète, reconstruction depuis les chunks")
+            event_index = EventIndex.from_vectorstore(vectorstore)
+        logger.info(f"Index d'événements chargé: {len(event_index.event_ids)} événements")
+        return event_index
+
+    def _load_shards(self, index_path: Path, vectorstore: Any) -> Optional[ShardedIndex]:
+        shards = ShardedIndex.load(str(index_path), self.embeddings)
+        if shards is None:
+            logger.warning(f"Partitionnement activé mais aucun shard dans {index_path}: recherche sur l'index complet")
+            return None
+        if shards.is_stale(vectorstore):
+            logger.warning("Shards obsolètes (reconstruire avec scripts/build_shards.py): recherche sur l'index complet")
+            return None
+        if settings.shard_preload:
+            shards.preload()
+        return shards
 
     def initialize_llm(self) -> None:
         """Initialise le modèle de langage Mistral."""
         logger.info(f"Initialisation du modèle {self.model_name}")
+        start = time.perf_counter()
 
-        self.llm = ChatMistralAI(
-            model=self.model_name,
-            api_key=SecretStr(settings.mistral_api_key),
+        self.llm = create_chat_model(
+            self.model_name,
             temperature=settings.mistral_temperature,
             max_tokens=settings.mistral_max_tokens,
         )
+        self.fallback_llms = {
+            name: create_chat_model(
+                name,
+                temperature=settings.mistral_temperature,
+                max_tokens=settings.mistral_max_tokens,
+            )
+            for name in settings.fallback_model_names
+            if name != self.model_name
+        }
+        self.load_times["llm"] = round((time.perf_counter() - start) * 1000, 2)
 
-        logger.info("LLM Mistral initialisé")
+        if self.fallback_llms:
+            logger.info(f"LLM Mistral initialisé (repli: {', '.join(self.fallback_llms)})")
+        else:
+            logger.info("LLM Mistral initialisé")
 
     def initialize_reranker(self) -> None:
         """Initialise le modèle de reranking si activé."""
@@ -126,29 +271,229 @@ class RAGSystem:
             return
 
         logger.info("Initialisation du cross-encoder pour le reranking")
+        start = time.perf_counter()
         # Modèle multilingue optimisé pour le français
-        self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+        self.reranker = CrossEncoder(RERANKER_MODEL)
+        self.load_times["reranker"] = round((time.perf_counter() - start) * 1000, 2)
         logger.info("Cross-encoder initialisé")
 
-    def rerank_documents(self, query: str, documents: list) -> list:
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Index, modèles chargés (avec leur durée de chargement) et compteurs des composants."""
+        vectorstore = self.vectorstore
+        index: dict[str, Any] = {"loaded": vectorstore is not None}
+        if vectorstore is not None:
+            index.update(faiss_index_info(vectorstore.index))
+            index["disk_bytes"] = directory_size(self.index_path)
+            if self.index_stats is not None:
+                index.update(self.index_stats.as_dict())
+            if self.event_index is not None:
+                index["event_index_events"] = len(self.event_index.event_ids)
+            if self.shards is not None:
+                index["shards"] = self.shards.stats
+            docstore_stats = getattr(vectorstore.docstore, "stats", None)
+            if docstore_stats is not None:
+                index["docstore"] = docstore_stats
+
+        models = {
+            "embeddings": (
+                settings.mistral_embedding_model if self.use_mistral_embeddings
+                else settings.huggingface_embedding_model
+            ) if self.embeddings is not None else None,
+            "llm": self.model_name if self.llm is not None else None,
+            "fallback_llms": list(self.fallback_llms),
+            "reranker": RERANKER_MODEL if self.reranker is not None else None,
+            "load_times_ms": dict(self.load_times),
+        }
+
+        components: dict[str, Any] = {}
+        for name, component in (("fast_path", self.fast_path), ("scope_guard", self.scope_guard), ("hedger", self.hedger)):
+            if component is not None:
+                components[name] = component.stats
+        return {"index": index, "models": models, "components": components}
+
+    def rerank_documents(
+        self, query: str, documents: list, timer: Optional[RequestTimer] = None
+    ) -> list:
         """Rerank les documents selon leur pertinence avec la requête."""
+        reranked_docs = self.rerank_batch([query], [documents], timer=timer)[0]
+        logger.debug(f"Documents reranked: {len(reranked_docs)} documents")
+        return reranked_docs
+
+    def rerank_batch(
+        self, queries: list[str], documents: list[list], timer: Optional[RequestTimer] = None
+    ) -> list[list]:
+        """Rerank les documents de plusieurs requêtes en un seul passage du cross-encoder."""
         if not self.reranker or not settings.rag_enable_reranking:
             return documents
 
-        # Créer les paires (query, doc) pour le reranking
-        pairs = [[query, doc.page_content] for doc in documents]
-        
-        # Calculer les scores
-        scores = self.reranker.predict(pairs)
-        
-        # Trier les documents par score décroissant
-        doc_score_pairs = list(zip(documents, scores))
-        doc_score_pairs.sort(key=lambda x: x[1], reverse=True)
-        
-        reranked_docs = [doc for doc, score in doc_score_pairs]
-        logger.info(f"Documents reranked: {len(reranked_docs)} documents")
-        
-        return reranked_docs
+        timer = timer or RequestTimer()
+        with timer.stage("rerank"):
+            # Créer les paires (query, doc) de tout le lot pour le reranking
+            pairs = [[query, doc.page_content] for query, docs in zip(queries, documents) for doc in docs]
+            if not pairs:
+                return documents
+
+            # Calculer les scores
+            scores = self.reranker.predict(pairs)
+
+            # Trier les documents de chaque requête par score décroissant
+            reranked = []
+            offset = 0
+            for docs in documents:
+                doc_score_pairs = list(zip(docs, scores[offset:offset + len(docs)]))
+                offset += len(docs)
+                doc_score_pairs.sort(key=lambda x: x[1], reverse=True)
+                reranked.append([doc for doc, score in doc_score_pairs])
+
+        return reranked
+
+    def embed_question(self, question: str) -> np.ndarray:
+        """Vecteur de la question, au format attendu par FAISS (1 x d)."""
+        return np.array([self.embeddings.embed_query(question)], dtype=np.float32)
+
+    def embed_questions(self, questions: list[str]) -> np.ndarray:
+        """Vecteurs de plusieurs questions en un seul appel d'embedding (n x d)."""
+        if len(questions) == 1:
+            return self.embed_question(questions[0])
+        return np.array(self.embeddings.embed_documents(questions), dtype=np.float32)
+
+    def retrieve(
+        self,
+        question: str,
+        timer: Optional[RequestTimer] = None,
+        query_vector: Optional[np.ndarray] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> list:
+        """
+        Récupère les documents pertinents (embedding, recherche FAISS puis MMR).
+
+        Équivalent au retriever MMR de LangChain, mais avec chaque étape
+        mesurée séparément dans `timer`. En recherche en deux étapes, les
+        `rag_event_top_k` événements les plus proches sont d'abord sélectionnés
+        dans l'index d'événements, puis seuls leurs chunks sont comparés à la requête.
+
+        Args:
+            question: Question de l'utilisateur
+            timer: Timer recevant les durées des étapes embed/event_search/search/mmr
+            query_vector: Vecteur de la question s'il est déjà calculé
+            filters: Filtres sur les métadonnées des documents retenus
+
+        Returns:
+            Liste de documents sélectionnés par MMR
+        """
+        return self.retrieve_batch([question], timer=timer, query_vectors=query_vector, filters=filters)[0]
+
+    def retrieve_batch(
+        self,
+        questions: list[str],
+        timer: Optional[RequestTimer] = None,
+        query_vectors: Optional[np.ndarray] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> list[list]:
+        """
+        Récupère les documents de plusieurs questions: un seul appel d'embedding
+        et une seule recherche FAISS pour tout le lot, puis MMR par question.
+
+        Si l'index est partitionné et la recherche filtrée, seuls les shards
+        compatibles avec les filtres sont interrogés (en parallèle) et leurs
+        résultats fusionnés; sans filtre, l'index complet est interrogé.
+
+        Args:
+            questions: Questions du lot
+            timer: Timer recevant les durées cumulées des étapes du lot
+            query_vectors: Vecteurs des questions s'ils sont déjà calculés (n x d)
+            filters: Filtres sur les métadonnées des documents retenus
+
+        Returns:
+            Documents sélectionnés par MMR, une liste par question
+        """
+        if not self.vectorstore:
+            raise ValueError("Le vectorstore doit être chargé avant la recherche")
+
+        timer = timer or RequestTimer()
+        # Référence locale: un rechargement concurrent de l'index n'affecte pas cette requête
+        vectorstore = self.vectorstore
+        event_index = self.event_index
+        shards = self.shards
+        top_k = settings.rag_top_k
+        fetch_k = max(settings.rag_fetch_k, top_k)
+        filters = filters if filters is not None and not filters.is_empty() else None
+
+        if query_vectors is None:
+            with timer.stage("embed"):
+                query_vectors = self.embed_questions(questions)
+
+        # Sans filtre, tous les shards seraient retenus: l'index complet (déjà en mémoire) suffit
+        if shards is not None and filters is not None and not shards.is_stale(vectorstore):
+            with timer.stage("search"):
+                hits = shards.search(query_vectors, fetch_k, filters)
+            results = []
+            with timer.stage("mmr"):
+                for query_vector, row in zip(query_vectors, hits):
+                    if not row:
+                        results.append([])
+                        continue
+                    selected = maximal_marginal_relevance(query_vector, [hit.vector for hit in row], k=top_k)
+                    results.append([row[j].document for j in selected])
+            return results
+
+        two_stage = (
+            settings.rag_two_stage_retrieval
+            and event_index is not None
+            and not event_index.is_stale(vectorstore)
+        )
+        candidates: list[list[int]] = []
+        vectors: list[Optional[list]] = []
+        if two_stage:
+            with timer.stage("event_search"):
+                event_ids = event_index.search_batch(query_vectors, settings.rag_event_top_k)
+            with timer.stage("search"):
+                for query_vector, selected_events in zip(query_vectors, event_ids):
+                    positions = event_index.candidate_positions(selected_events)
+                    if not positions:
+                        candidates.append([])
+                        vectors.append(None)
+                        continue
+                    chunk_vectors = np.stack([vectorstore.index.reconstruct(i) for i in positions])
+                    distances = ((chunk_vectors - query_vector) ** 2).sum(axis=1)
+                    nearest = np.argsort(distances)[:fetch_k]
+                    candidates.append([positions[i] for i in nearest])
+                    vectors.append([chunk_vectors[i] for i in nearest])
+        else:
+            with timer.stage("search"):
+                # Avec des filtres, une partie des voisins sera écartée: en chercher davantage
+                search_k = fetch_k * 4 if filters is not None else fetch_k
+                _, indices = vectorstore.index.search(query_vectors, min(search_k, vectorstore.index.ntotal))
+            for row in indices:
+                candidates.append([int(i) for i in row if i != -1])
+                vectors.append(None)
+
+        if filters is not None:
+            for row, positions in enumerate(candidates):
+                kept = [
+                    j for j, position in enumerate(positions)
+                    if filters.matches(vectorstore.docstore.search(vectorstore.index_to_docstore_id[position]).metadata)
+                ][:fetch_k]
+                candidates[row] = [positions[j] for j in kept]
+                if vectors[row] is not None:
+                    vectors[row] = [vectors[row][j] for j in kept]
+
+        results = []
+        with timer.stage("mmr"):
+            for query_vector, positions, candidate_vectors in zip(query_vectors, candidates, vectors):
+                if not positions:
+                    results.append([])
+                    continue
+                if candidate_vectors is None:
+                    candidate_vectors = [vectorstore.index.reconstruct(i) for i in positions]
+                selected = maximal_marginal_relevance(query_vector, candidate_vectors, k=top_k)
+                results.append([
+                    vectorstore.docstore.search(vectorstore.index_to_docstore_id[positions[j]])
+                    for j in selected
+                ])
+
+        return results
 
     def setup_qa_chain(self) -> None:
         """Configure la chaîne de Q&A avec prompt personnalisé."""
@@ -162,18 +507,27 @@ class RAGSystem:
             search_type="mmr",
             search_kwargs={
                 "k": settings.rag_top_k,
-                "fetch_k": settings.rag_top_k * 2
+                "fetch_k": max(settings.rag_fetch_k, settings.rag_top_k)
             }
         )
 
-        prompt = ChatPromptTemplate.from_template(ANTI_HALLUCINATION_PROMPT)
-
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        self.prompt = ChatPromptTemplate.from_template(ANTI_HALLUCINATION_PROMPT)
+        self.generation_chain = self.llm | StrOutputParser()
+        generation_chain = self.generation_chain
+        if self.fallback_llms:
+            fallback_chains = [llm | StrOutputParser() for llm in self.fallback_llms.values()]
+            generation_chain = self.generation_chain.with_fallbacks(fallback_chains)
+            self.hedger = HedgedGenerator(
+                chains=[self.generation_chain] + fallback_chains,
+                model_names=[self.model_name] + list(self.fallback_llms),
+                hedge_after_ms=settings.llm_hedge_after_ms,
+            )
+        else:
+            self.hedger = None
 
         # Si reranking activé, on récupère plus de documents puis on rerank
         def retrieve_and_rerank(question: str):
-            docs = self.retriever.invoke(question)
+            docs = self.retrieve(question)
             if settings.rag_enable_reranking and self.reranker:
                 docs = self.rerank_documents(question, docs)
             return format_docs(docs)
@@ -183,46 +537,276 @@ class RAGSystem:
                 "context": retrieve_and_rerank,
                 "question": RunnablePassthrough()
             }
-            | prompt
-            | self.llm
-            | StrOutputParser()
+            | self.prompt
+            | generation_chain
         )
 
         rerank_status = "avec reranking" if settings.rag_enable_reranking else "sans reranking"
         logger.info(f"Chaîne Q&A configurée avec MMR {rerank_status}")
 
+    def _generate(
+        self,
+        question: str,
+        context: str,
+        timer: RequestTimer,
+        cancel: Optional[threading.Event] = None,
+    ) -> str:
+        """
+        Génère la réponse en streaming pour mesurer le temps jusqu'au premier token.
+
+        Le streaming s'interrompt dès que `cancel` est positionné (échéance dépassée).
+        """
+        with timer.stage("prompt"):
+            prompt_value = self.prompt.invoke({"context": context, "question": question})
+
+        if self.hedger is not None:
+            with timer.stage("llm_total"):
+                return self.hedger.generate(prompt_value, timer=timer, cancel=cancel)
+
+        parts = []
+        first_token_received = False
+        with timer.stage("llm_total"):
+            start = time.perf_counter()
+            for chunk in self.generation_chain.stream(prompt_value):
+                if cancel is not None and cancel.is_set():
+                    break
+                if chunk and not first_token_received:
+                    timer.record("llm_first_token", (time.perf_counter() - start) * 1000)
+                    first_token_received = True
+                parts.append(chunk)
+
+        return "".join(parts)
+
     def query(
-        self, question: str, return_sources: bool = False
+        self,
+        question: str,
+        return_sources: bool = False,
+        timer: Optional[RequestTimer] = None,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
     ) -> dict[str, Any]:
         """
         Pose une question au système RAG.
 
+        La recherche et le reranking ont leurs propres sous-budgets; si le LLM
+        n'a pas répondu avant l'échéance, une réponse dégradée (événements
+        trouvés, sans génération) est renvoyée avec `degraded=True`.
+
         Args:
             question: Question à poser
             return_sources: Si True, retourne les sources utilisées
+            timer: Timer recevant le découpage par étape (créé si absent)
+            deadline: Échéance de la requête (settings.ask_deadline_ms si absente)
+            filters: Filtres sur les métadonnées des documents recherchés
 
         Returns:
-            Dictionnaire avec la réponse et éventuellement les sources
+            Dictionnaire avec la réponse, les durées par étape ("timings"),
+            l'indicateur "degraded" et éventuellement les sources
+
+        Raises:
+            BudgetExceeded: Si la recherche dépasse son budget
         """
         if not self.qa_chain:
             raise ValueError("La chaîne Q&A n'est pas configurée")
 
+        sampler = get_profile_sampler()
+        if sampler.should_sample():
+            with sampler.profile("query"):
+                return self._run_query(question, return_sources, timer, deadline, filters)
+        return self._run_query(question, return_sources, timer, deadline, filters)
+
+    def query_batch(
+        self,
+        questions: list[str],
+        return_sources: bool = False,
+        max_concurrency: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Répond à un lot de questions, résultat par résultat.
+
+        Les contrôles préalables (réponse directe, hors périmètre) sont faits
+        par question; l'embedding, la recherche FAISS et le reranking sont faits
+        une seule fois pour le lot; les générations sont concurrentes, chacune
+        avec sa propre échéance.
+
+        Args:
+            questions: Questions du lot
+            return_sources: Si True, retourne les sources utilisées
+            max_concurrency: Générations simultanées (settings.batch_llm_concurrency par défaut)
+
+        Yields:
+            Résultat de chaque question, avec son rang `index` dans le lot
+            (et `error` si elle a échoué), dans l'ordre d'achèvement
+        """
+        if not self.qa_chain:
+            raise ValueError("La chaîne Q&A n'est pas configurée")
+
+        logger.info(f"Lot de {len(questions)} questions reçu")
+        timers = [RequestTimer() for _ in questions]
+        pending: list[int] = []
+        for index, question in enumerate(questions):
+            try:
+                early, _ = self._precheck(question, return_sources, timers[index])
+            except Exception as e:
+                yield self._batch_error(index, question, e)
+                continue
+            if early is not None:
+                yield {"index": index, **early}
+            else:
+                pending.append(index)
+        if not pending:
+            return
+
+        pending_questions = [questions[index] for index in pending]
+        batch_timer = RequestTimer()
+        try:
+            docs_per_question = self.retrieve_batch(pending_questions, timer=batch_timer)
+            if settings.rag_enable_reranking and self.reranker:
+                docs_per_question = self.rerank_batch(pending_questions, docs_per_question, timer=batch_timer)
+        except Exception as e:
+            for index in pending:
+                yield self._batch_error(index, questions[index], e)
+            return
+
+        # Étapes communes au lot, reportées dans le découpage de chaque question
+        for index in pending:
+            for stage, duration in batch_timer.timings.items():
+                timers[index].record(stage, duration)
+
+        def answer(index: int, docs: list) -> dict[str, Any]:
+            # Échéance à partir du début de la génération (pas de l'attente dans la file)
+            return self._answer_from_docs(questions[index], docs, return_sources, timers[index], Deadline())
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_concurrency or settings.batch_llm_concurrency,
+            thread_name_prefix="rag-batch",
+        )
+        try:
+            futures = {
+                executor.submit(contextvars.copy_context().run, answer, index, docs): index
+                for index, docs in zip(pending, docs_per_question)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield {"index": index, **future.result()}
+                except Exception as e:
+                    yield self._batch_error(index, questions[index], e)
+        finally:
+            # Client parti: les générations non commencées sont abandonnées
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _batch_error(self, index: int, question: str, error: Exception) -> dict[str, Any]:
+        logger.error(f"Échec de la question {index} du lot: {error}")
+        return {"index": index, "question": question, "error": str(error)}
+
+    def _run_query(
+        self,
+        question: str,
+        return_sources: bool,
+        timer: Optional[RequestTimer],
+        deadline: Optional[Deadline],
+        filters: Optional[SearchFilters] = None,
+    ) -> dict[str, Any]:
+        timer = timer or RequestTimer()
+        deadline = deadline or Deadline()
         logger.info(f"Question reçue: {question}")
 
-        # Exécuter la requête
-        answer = self.qa_chain.invoke(question)
+        early, query_vector = self._precheck(question, return_sources, timer)
+        if early is not None:
+            return early
+
+        # Récupération (une seule fois, réutilisée pour les sources)
+        docs = run_with_budget(
+            lambda: self.retrieve(question, timer=timer, query_vector=query_vector, filters=filters),
+            deadline.budget_ms(settings.retrieval_budget_ms),
+            "retrieval",
+        )
+        if settings.rag_enable_reranking and self.reranker:
+            retrieved = docs
+            try:
+                docs = run_with_budget(
+                    lambda: self.rerank_documents(question, retrieved, timer=timer),
+                    deadline.budget_ms(settings.rerank_budget_ms),
+                    "rerank",
+                )
+            except BudgetExceeded as e:
+                # L'ordre MMR reste exploitable: on continue sans reranking
+                logger.warning(f"{e}, ordre MMR conservé")
+
+        return self._answer_from_docs(question, docs, return_sources, timer, deadline)
+
+    def _precheck(
+        self,
+        question: str,
+        return_sources: bool,
+        timer: RequestTimer,
+    ) -> tuple[Optional[dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Contrôles avant la recherche: réponse directe ou question hors périmètre.
+
+        Returns:
+            (réponse si la question est traitée sans recherche, vecteur de la question s'il a été calculé)
+        """
+        # Questions d'attribut ("adresse de X", "ville de Y"): réponse directe sans LLM
+        fast_path = self.fast_path
+        if fast_path is not None:
+            with timer.stage("fast_path"):
+                direct = fast_path.answer(question)
+            if direct is not None:
+                return self._fast_path_response(question, direct, return_sources, timer), None
+
+        # Questions hors périmètre: réponse type sans recherche ni génération
+        query_vector = None
+        scope_guard = self.scope_guard
+        if scope_guard is not None:
+            with timer.stage("scope_guard"):
+                verdict = scope_guard.check_location(question)
+            if verdict.in_scope and scope_guard.min_similarity > 0:
+                vectorstore = self.vectorstore
+                with timer.stage("embed"):
+                    query_vector = self.embed_question(question)
+                with timer.stage("scope_guard"):
+                    verdict = scope_guard.check_similarity(vectorstore, query_vector)
+            if not verdict.in_scope:
+                return self._out_of_scope_response(question, scope_guard.answer(verdict), return_sources, timer), None
+
+        return None, query_vector
+
+    def _answer_from_docs(
+        self,
+        question: str,
+        docs: list,
+        return_sources: bool,
+        timer: RequestTimer,
+        deadline: Deadline,
+    ) -> dict[str, Any]:
+        """Génère la réponse à partir des documents classés (réponse dégradée à l'échéance)."""
+        with timer.stage("prompt"):
+            context = format_docs(docs)
+
+        # Exécuter la requête, abandonnée à l'échéance
+        cancel = threading.Event()
+        try:
+            answer = run_with_budget(
+                lambda: self._generate(question, context, timer, cancel),
+                deadline.budget_ms(),
+                "llm",
+                pool="llm",
+            )
+        except BudgetExceeded as e:
+            cancel.set()
+            logger.warning(f"{e}, réponse dégradée sans génération")
+            return self._degraded_response(question, docs, return_sources, timer)
 
         response = {
             "question": question,
             "answer": answer,
+            "degraded": False,
         }
 
         # Ajouter les sources seulement si la réponse contient des informations (pas "non disponible" ou "n'ai pas trouvé")
         if return_sources and not any(phrase in answer.lower() for phrase in ["non disponible", "n'ai pas trouvé", "pas trouvé", "aucun événement"]):
-            docs = self.retriever.invoke(question)
-            # Appliquer le reranking si activé
-            if settings.rag_enable_reranking and self.reranker:
-                docs = self.rerank_documents(question, docs)
             sources = []
             for doc in docs[:settings.rag_rerank_top_n]:
                 source = {
@@ -239,10 +823,102 @@ class RAGSystem:
 
             response["sources"] = sources
 
+        response["timings"] = timer.as_dict()
         logger.info(f"Réponse générée avec {len(response.get('sources', []))} sources")
 
         return response
 
+    def _fast_path_response(
+        self,
+        question: str,
+        direct: dict[str, Any],
+        return_sources: bool,
+        timer: RequestTimer,
+    ) -> dict[str, Any]:
+        """Réponse lue dans les métadonnées de l'événement reconnu."""
+        response = {
+            "question": question,
+            "answer": direct["answer"],
+            "degraded": False,
+            "fast_path": True,
+        }
+        if return_sources:
+            response["sources"] = [
+                {
+                    "content": doc.page_content,
+                    "metadata": doc.metadata,
+                    "title": doc.metadata.get("title", ""),
+                    "location": doc.metadata.get("location_city", ""),
+                }
+                for doc in direct["documents"]
+            ]
+        response["timings"] = timer.as_dict()
+        return response
+
+    def _out_of_scope_response(
+        self,
+        question: str,
+        answer: str,
+        return_sources: bool,
+        timer: RequestTimer,
+    ) -> dict[str, Any]:
+        """Réponse type d'une question hors périmètre."""
+        response = {
+            "question": question,
+            "answer": answer,
+            "degraded": False,
+            "out_of_scope": True,
+        }
+        if return_sources:
+            response["sources"] = []
+        response["timings"] = timer.as_dict()
+        return response
+
+    def _degraded_response(
+        self,
+        question: str,
+        docs: list,
+        return_sources: bool,
+        timer: RequestTimer,
+    ) -> dict[str, Any]:
+        """Réponse sans génération: les meilleurs événements trouvés, un par événement."""
+        events = []
+        seen = set()
+        for doc in docs:
+            event_id = doc.metadata.get("event_id")
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+            events.append({
+                "event_id": event_id,
+                "title": doc.metadata.get("title", ""),
+                "city": doc.metadata.get("location_city", ""),
+                "date_begin": doc.metadata.get("firstdate_begin", ""),
+                "date_end": doc.metadata.get("lastdate_end", ""),
+                "url": doc.metadata.get("url", ""),
+            })
+            if len(events) >= settings.degraded_max_events:
+                break
+
+        response = {
+            "question": question,
+            "answer": DEGRADED_ANSWER,
+            "degraded": True,
+            "events": events,
+        }
+        if return_sources:
+            response["sources"] = [
+                {
+                    "content": doc.page_content,
+                    "metadata": doc.metadata,
+                    "title": doc.metadata.get("title", ""),
+                    "location": doc.metadata.get("location_city", ""),
+                }
+                for doc in docs[:settings.rag_rerank_top_n]
+            ]
+        response["timings"] = timer.as_dict()
+        return response
+
 
 # Instance singleton
 _rag_system: Optional[RAGSystem] = None
@@ -2,6 +2,9 @@
 Module d'évaluation RAGAS pour le système RAG.
 """
 
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Optional
 from datasets import Dataset
 from ragas import evaluate
@@ -11,18 +14,15 @@ from ragas.metrics import (
     context_precision,
     context_recall,
 )
-from langchain_mistralai import ChatMistralAI
 from langchain_community.embeddings import HuggingFaceEmbeddings
 
-try:
-    from langchain_mistralai import MistralAIEmbeddings
-    MISTRAL_AVAILABLE = True
-except ImportError:
-    MISTRAL_AVAILABLE = False
-
+from src.budget import Deadline
 from src.rag import get_rag_system
 from src.config import settings
+from src.context_packing import count_tokens
 from src.logger import get_logger
+from src.eval_cache import JUDGE_NAMESPACE, RAG_NAMESPACE, EvaluationCache, current_versions
+from src.mistral_client import create_chat_model, create_embeddings
 
 logger = get_logger(__name__)
 
@@ -30,32 +30,30 @@ logger = get_logger(__name__)
 class RAGASEvaluator:
     """Évalue la qualité du système RAG avec RAGAS."""
 
-    def __init__(self, use_mistral_embeddings: Optional[bool] = None):
+    def __init__(
+        self,
+        use_mistral_embeddings: Optional[bool] = None,
+        cache: Optional[EvaluationCache] = None,
+    ):
         """
         Initialise l'évaluateur RAGAS.
         
         Args:
             use_mistral_embeddings: Si True, utilise Mistral pour embeddings, sinon HuggingFace
+            cache: Cache des sorties RAG et des jugements (configuration par défaut si absent)
         """
         self.rag_system = get_rag_system()
+        self.cache = cache or EvaluationCache()
+        self.failed_questions: list[dict[str, str]] = []
+        # Scores, latence et tokens par question du dernier dataset évalué
+        self.per_question: list[dict[str, Any]] = []
         self.use_mistral_embeddings = use_mistral_embeddings if use_mistral_embeddings is not None else settings.use_mistral_embeddings
         
-        self.evaluator_llm = ChatMistralAI(
-            model=settings.mistral_evaluator_model,
-            api_key=settings.mistral_api_key,
-            temperature=0,
-        )
+        self.evaluator_llm = create_chat_model(settings.mistral_evaluator_model, temperature=0)
         
         if self.use_mistral_embeddings:
-            if not MISTRAL_AVAILABLE:
-                logger.error("Mistral demandé mais langchain-mistralai n'est pas installé")
-                raise ImportError("langchain-mistralai n'est pas installé")
-            
             logger.info(f"RAGAS: Utilisation de Mistral AI Embeddings: {settings.mistral_embedding_model}")
-            self.embeddings = MistralAIEmbeddings(
-                model=settings.mistral_embedding_model,
-                api_key=settings.mistral_api_key,
-            )
+            self.embeddings = create_embeddings()
         else:
             logger.info(f"RAGAS: Utilisation de HuggingFace Embeddings: {settings.huggingface_embedding_model}")
             self.embeddings = HuggingFaceEmbeddings(
@@ -73,19 +71,89 @@ class RAGASEvaluator:
         
         logger.info("Évaluateur RAGAS initialisé")
 
+    def _rag_cache_key(self, question: str) -> dict[str, Any]:
+        versions = current_versions(str(self.rag_system.index_path), self.rag_system.model_name)
+        return {
+            "question": question,
+            "index": versions["index"],
+            "prompt": versions["prompt"],
+            "model": versions["model"],
+            "retrieval": versions["retrieval"],
+        }
+
+    def _generate_answer(self, question: str) -> tuple[str, list[str], Optional[float]]:
+        """Génère la réponse, les contextes et la latence d'une question via le RAG (ou le cache)."""
+        cache_key = self._rag_cache_key(question)
+        cached = self.cache.get(RAG_NAMESPACE, cache_key)
+        if cached is not None:
+            return cached["answer"], cached["contexts"], cached.get("latency_ms")
+
+        start = time.perf_counter()
+        # Pas d'échéance de bout en bout: une réponse dégradée fausserait les scores
+        response = self.rag_system.query(
+            question=question, return_sources=True, deadline=Deadline(total_ms=0)
+        )
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        # Extraction des contextes depuis les sources
+        contexts = []
+        if "sources" in response:
+            for source in response["sources"]:
+                contexts.append(source.get('content', ''))
+
+        if response.get("degraded"):
+            logger.warning(f"Réponse dégradée non mise en cache: {question}")
+        else:
+            self.cache.set(
+                RAG_NAMESPACE,
+                cache_key,
+                {"answer": response["answer"], "contexts": contexts, "latency_ms": latency_ms},
+            )
+        return response["answer"], contexts, latency_ms
+
     def create_evaluation_dataset(
-        self, test_questions: list[dict[str, str]]
+        self,
+        test_questions: list[dict[str, str]],
+        max_workers: Optional[int] = None,
     ) -> Dataset:
         """
         Crée un dataset d'évaluation à partir de questions de test.
 
+        Les réponses sont générées en parallèle (`max_workers` threads, débit
+        limité par le token bucket Mistral partagé); l'ordre des questions est
+        conservé. Une question en échec est exclue du dataset et consignée dans
+        `self.failed_questions` sans interrompre l'évaluation.
+
         Args:
             test_questions: Liste de dicts avec 'question' et 'ground_truth'
+            max_workers: Nombre de générations simultanées (settings.ragas_max_workers par défaut)
 
         Returns:
             Dataset RAGAS
         """
-        logger.info(f"Création du dataset d'évaluation avec {len(test_questions)} questions")
+        workers = max_workers or settings.ragas_max_workers
+        logger.info(
+            f"Création du dataset d'évaluation avec {len(test_questions)} questions "
+            f"({workers} workers)"
+        )
+
+        results: list[Optional[tuple[str, list[str], Optional[float]]]] = [None] * len(test_questions)
+        self.failed_questions = []
+        self.per_question = []
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._generate_answer, item["question"]): position
+                for position, item in enumerate(test_questions)
+            }
+            for future in as_completed(futures):
+                position = futures[future]
+                try:
+                    results[position] = future.result()
+                except Exception as e:
+                    question = test_questions[position]["question"]
+                    logger.error(f"Échec de génération pour la question '{question}': {e}")
+                    self.failed_questions.append({"question": question, "error": str(e)})
 
         data = {
             "question": [],
@@ -94,54 +162,109 @@ class RAGASEvaluator:
             "ground_truth": [],
         }
 
-        for item in test_questions:
-            question = item["question"]
-            ground_truth = item.get("ground_truth", "")
-
-            # Génération de la réponse via le RAG
-            response = self.rag_system.query(question=question, return_sources=True)
-
-            # Extraction des contextes depuis les sources
-            contexts = []
-            if "sources" in response:
-                for source in response["sources"]:
-                    contexts.append(source.get('content', ''))
+        for item, result in zip(test_questions, results):
+            if result is None:
+                continue
+            answer, contexts, latency_ms = result
+            self.per_question.append({
+                "question": item["question"],
+                "latency_ms": latency_ms,
+                "answer_tokens": count_tokens(answer),
+                "context_tokens": sum(count_tokens(context) for context in contexts),
+            })
 
             # Ajout au dataset
-            data["question"].append(question)
-            data["answer"].append(response["answer"])
+            data["question"].append(item["question"])
+            data["answer"].append(answer)
             data["contexts"].append(contexts)
-            data["ground_truth"].append(ground_truth)
+            data["ground_truth"].append(item.get("ground_truth", ""))
+
+        if self.failed_questions:
+            logger.warning(
+                f"{len(self.failed_questions)}/{len(test_questions)} questions en échec, "
+                "exclues de l'évaluation"
+            )
 
         return Dataset.from_dict(data)
 
-    def evaluate(self, test_questions: list[dict[str, str]]) -> dict[str, Any]:
+    def evaluate(self, test_questions: list[dict[str, str]]) -> dict[str, float]:
         """
         Évalue le système RAG avec RAGAS.
 
+        Les réponses et les jugements déjà calculés pour les mêmes versions
+        (index, prompt, modèles) sont relus depuis le cache.
+
         Args:
             test_questions: Liste de questions de test avec réponses attendues
 
         Returns:
-            Résultats d'évaluation
+            Score moyen par métrique
         """
         logger.info("Démarrage de l'évaluation RAGAS...")
 
         dataset = self.create_evaluation_dataset(test_questions)
+        if len(dataset) == 0:
+            raise ValueError("Aucune réponse générée: toutes les questions sont en échec")
 
-        results = evaluate(
-            dataset, 
-            metrics=self.metrics,
-            llm=self.evaluator_llm,
-            embeddings=self.embeddings,
-        )
+        results = self._evaluate_with_cache(dataset)
 
         logger.info("Évaluation RAGAS terminée")
         logger.info(f"Résultats : {results}")
+        logger.info(f"Cache d'évaluation: {self.cache.stats()}")
+
+        return results
+
+    def _evaluate_with_cache(self, dataset: Dataset) -> dict[str, float]:
+        """
+        Calcule chaque métrique en ne jugeant que les lignes absentes du cache.
+
+        Les scores par ligne sont mis en cache par (métrique, entrées, modèle
+        évaluateur); la moyenne ignore les scores NaN, comme RAGAS.
+        """
+        rows = dataset.to_list()
+        results = {}
+
+        for metric in self.metrics:
+            keys = [
+                {
+                    "metric": metric.name,
+                    "question": row["question"],
+                    "answer": row["answer"],
+                    "contexts": row["contexts"],
+                    "ground_truth": row["ground_truth"],
+                    "evaluator_model": settings.mistral_evaluator_model,
+                }
+                for row in rows
+            ]
+            scores = [self.cache.get(JUDGE_NAMESPACE, key) for key in keys]
+            missing = [position for position, score in enumerate(scores) if score is None]
+
+            if missing:
+                logger.info(f"RAGAS {metric.name}: {len(missing)}/{len(rows)} lignes à juger")
+                subset = dataset.select(missing)
+                metric_result = evaluate(
+                    subset,
+                    metrics=[metric],
+                    llm=self.evaluator_llm,
+                    embeddings=self.embeddings,
+                )
+                new_scores = metric_result.to_pandas()[metric.name].tolist()
+                for position, score in zip(missing, new_scores):
+                    score = float(score)
+                    scores[position] = score
+                    if not math.isnan(score):
+                        self.cache.set(JUDGE_NAMESPACE, keys[position], score)
+
+            for row_stats, score in zip(self.per_question, scores):
+                if score is not None and not math.isnan(score):
+                    row_stats[metric.name] = score
+
+            valid_scores = [score for score in scores if score is not None and not math.isnan(score)]
+            results[metric.name] = sum(valid_scores) / len(valid_scores) if valid_scores else float("nan")
 
         return results
 
-    def evaluate_from_file(self, test_file_path: str) -> dict[str, Any]:
+    def evaluate_from_file(self, test_file_path: str) -> dict[str, float]:
         """
         Évalue à partir d'un fichier JSON de questions.
 
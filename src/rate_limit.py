@@ -0,0 +1,98 @@
+"""
+Limiteur de débit (token bucket) partagé entre threads.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from src.config import settings
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+
+    `rate` jetons sont ajoutés par seconde, jusqu'à `capacity` (rafale maximale).
+    Un débit nul ou négatif désactive la limitation.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Prend des jetons sans attendre; retourne False si indisponibles."""
+        if self.rate <= 0:
+            return True
+        return self._take_or_wait(tokens) == 0.0
+
+    def _take_or_wait(self, tokens: float) -> float:
+        """Consomme les jetons si disponibles (retourne 0), sinon retourne l'attente nécessaire."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Attend que des jetons soient disponibles puis les consomme.
+
+        Args:
+            tokens: Nombre de jetons à consommer
+            timeout: Attente maximale en secondes (illimitée si None)
+
+        Returns:
+            True si les jetons ont été obtenus, False si le délai est dépassé
+        """
+        if self.rate <= 0:
+            return True
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = self._take_or_wait(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Équivalent de `acquire` sans bloquer la boucle d'événements."""
+        if self.rate <= 0:
+            return True
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = self._take_or_wait(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+# Instance singleton
+_mistral_rate_limiter: Optional[TokenBucket] = None
+
+
+def get_mistral_rate_limiter() -> TokenBucket:
+    """Récupère le limiteur partagé par tous les appels Mistral du processus."""
+    global _mistral_rate_limiter
+    if _mistral_rate_limiter is None:
+        _mistral_rate_limiter = TokenBucket(
+            rate=settings.mistral_requests_per_second,
+            capacity=settings.mistral_rate_limit_burst,
+        )
+    return _mistral_rate_limiter
@@ -0,0 +1,53 @@
+"""
+Détection de régressions entre deux séries de métriques (plus haut = meilleur).
+
+Partagée par l'évaluation automatisée (scores RAGAS) et les benchmarks (débits).
+"""
+
+from typing import Any, Dict, List
+
+
+def detect_regressions(
+    current: Dict[str, float],
+    previous: Dict[str, float],
+    threshold: float,
+    relative: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Compare les métriques courantes aux précédentes.
+
+    Args:
+        current: Métriques de l'exécution courante
+        previous: Métriques de référence
+        threshold: Baisse tolérée (absolue, ou fraction de la référence si `relative`)
+        relative: Si True, `threshold` est une baisse relative (0.15 = -15%)
+
+    Returns:
+        Liste des régressions détectées
+    """
+    regressions = []
+
+    for metric_name, current_score in current.items():
+        if metric_name not in previous:
+            continue
+
+        previous_score = previous[metric_name]
+        change = current_score - previous_score
+        change_percent = (change / previous_score) * 100 if previous_score > 0 else 0
+
+        if relative:
+            regressed = change_percent < -threshold * 100
+        else:
+            regressed = change < -threshold
+
+        if regressed:
+            regressions.append({
+                "metric": metric_name,
+                "previous": previous_score,
+                "current": current_score,
+                "change": change,
+                "change_percent": change_percent,
+                "severity": "high" if abs(change_percent) > 10 else "medium"
+            })
+
+    return regressions
@@ -0,0 +1,171 @@
+"""
+Évaluation de la recherche sans LLM: recall@k, MRR, nDCG et latence par étape.
+
+Un chunk est pertinent si son `event_id` fait partie des événements attendus
+(`event_ids` de la question) ou, à défaut d'étiquettes, si son contenu contient
+la réponse attendue (`ground_truth`, comparée sans accents ni casse).
+Les métriques sont calculées sur les chunks récupérés (MMR) et, si le reranker
+est chargé, sur les chunks rerankés.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config import settings
+from src.fast_path import normalize_text
+from src.logger import get_logger
+from src.profiling import RequestTimer, summarize_latencies
+from src.rag import RAGSystem
+
+logger = get_logger(__name__)
+
+DEFAULT_KS = (1, 3, 5, 10)
+
+
+def relevance_labels(documents: Sequence[Any], item: Dict[str, Any]) -> List[Optional[str]]:
+    """
+    Identifie la cible pertinente de chaque document classé.
+
+    Returns:
+        Pour chaque rang, l'identifiant de la cible trouvée (event_id ou
+        "ground_truth"), ou None si le document n'est pas pertinent
+    """
+    event_ids = set(item.get("event_ids") or [])
+    ground_truth = normalize_text(str(item.get("ground_truth", "")))
+
+    labels: List[Optional[str]] = []
+    for doc in documents:
+        event_id = doc.metadata.get("event_id")
+        if event_ids:
+            labels.append(event_id if event_id in event_ids else None)
+        elif ground_truth and ground_truth in normalize_text(doc.page_content):
+            labels.append("ground_truth")
+        else:
+            labels.append(None)
+    return labels
+
+
+def ranking_metrics(labels: List[Optional[str]], num_relevant: int, ks: Sequence[int]) -> Dict[str, float]:
+    """
+    Calcule recall@k, MRR et nDCG@k (pertinence binaire) pour un classement.
+
+    Une cible trouvée plusieurs fois (plusieurs chunks du même événement)
+    n'est comptée qu'au premier rang où elle apparaît.
+    """
+    gains = []
+    seen = set()
+    for label in labels:
+        gains.append(1.0 if label is not None and label not in seen else 0.0)
+        if label is not None:
+            seen.add(label)
+
+    metrics: Dict[str, float] = {}
+    first_hit = next((rank for rank, gain in enumerate(gains, start=1) if gain), None)
+    metrics["mrr"] = 1.0 / first_hit if first_hit else 0.0
+
+    for k in ks:
+        top_gains = gains[:k]
+        metrics[f"recall@{k}"] = sum(top_gains) / num_relevant if num_relevant else 0.0
+        dcg = sum(gain / math.log2(rank + 1) for rank, gain in enumerate(top_gains, start=1))
+        ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(num_relevant, k) + 1))
+        metrics[f"ndcg@{k}"] = dcg / ideal if ideal else 0.0
+    return metrics
+
+
+class RetrievalEvaluator:
+    """Évaluateur de la recherche (embedding, FAISS, MMR, reranking) sans appel au LLM."""
+
+    def __init__(self, rag_system: Optional[RAGSystem] = None, ks: Sequence[int] = DEFAULT_KS):
+        """
+        Initialise l'évaluateur.
+
+        Args:
+            rag_system: Système RAG dont l'index est déjà chargé (chargé depuis
+                la configuration si absent, sans initialiser le LLM)
+            ks: Valeurs de k pour recall@k et nDCG@k
+        """
+        if rag_system is None:
+            rag_system = RAGSystem()
+            rag_system.load_index()
+            rag_system.initialize_reranker()
+        self.rag_system = rag_system
+        self.ks = tuple(ks)
+
+    def _stages(self) -> List[str]:
+        if settings.rag_enable_reranking and self.rag_system.reranker:
+            return ["retrieved", "reranked"]
+        return ["retrieved"]
+
+    def evaluate(self, test_questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Évalue la recherche sur un jeu de questions.
+
+        Args:
+            test_questions: Liste de dicts avec 'question', 'ground_truth'
+                et éventuellement 'event_ids'
+
+        Returns:
+            Dict avec les métriques moyennes ("metrics", préfixées par l'étape),
+            les latences par étape ("latency_ms") et le détail par question
+        """
+        if not test_questions:
+            raise ValueError("Aucune question à évaluer")
+
+        stages = self._stages()
+        totals: Dict[str, float] = {}
+        latencies: Dict[str, List[float]] = {}
+        per_question = []
+
+        for item in test_questions:
+            question = item["question"]
+            timer = RequestTimer()
+            ranked = {"retrieved": self.rag_system.retrieve(question, timer=timer)}
+            if "reranked" in stages:
+                ranked["reranked"] = self.rag_system.rerank_documents(
+                    question, ranked["retrieved"], timer=timer
+                )
+
+            num_relevant = len(set(item.get("event_ids") or [])) or 1
+            result = {"question": question}
+            for stage in stages:
+                metrics = ranking_metrics(relevance_labels(ranked[stage], item), num_relevant, self.ks)
+                for name, value in metrics.items():
+                    key = f"{stage}_{name}"
+                    result[key] = value
+                    totals[key] = totals.get(key, 0.0) + value
+            timings = timer.as_dict()
+            result["latency_ms"] = timings["total"]
+            per_question.append(result)
+
+            for stage_name, duration in timings.items():
+                latencies.setdefault(stage_name, []).append(duration)
+
+        count = len(test_questions)
+        metrics = {key: round(value / count, 4) for key, value in totals.items()}
+        logger.info(
+            f"Recherche évaluée sur {count} questions: "
+            + ", ".join(f"{key}={value:.3f}" for key, value in metrics.items() if "recall@" in key)
+        )
+        return {
+            "metrics": metrics,
+            "latency_ms": {stage: summarize_latencies(values) for stage, values in latencies.items()},
+            "config": {
+                "top_k": settings.rag_top_k,
+                "fetch_k": settings.rag_fetch_k,
+                "rerank": "reranked" in stages,
+                "rerank_top_n": settings.rag_rerank_top_n,
+                "faiss_index_type": settings.faiss_index_type,
+                "faiss_nprobe": settings.faiss_nprobe,
+                "two_stage": settings.rag_two_stage_retrieval,
+                "event_top_k": settings.rag_event_top_k,
+            },
+            "num_questions": count,
+            "per_question": per_question,
+        }
+
+    def evaluate_from_file(self, test_file_path: str) -> Dict[str, Any]:
+        """Évalue la recherche à partir d'un fichier JSON de questions."""
+        with open(test_file_path, "r", encoding="utf-8") as f:
+            test_questions = json.load(f)
+        return self.evaluate(test_questions)
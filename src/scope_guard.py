@@ -0,0 +1,164 @@
+"""
+Rejet rapide des questions hors périmètre, avant la recherche et la génération.
+
+Deux contrôles peu coûteux:
+- lieux: une question qui demande des événements dans une autre région ou
+  ville (liste statique, précédée d'une préposition de lieu: "à Lyon",
+  "en Bretagne", "près de Nice", "dans le Grand Est"), sans citer aucun lieu
+  présent dans l'index (gazetteer construit depuis les
+  métadonnées `location_city`, `location_region`, `location_department`),
+  reçoit directement une réponse type;
+- similarité: si le chunk le plus proche de la question est sous le seuil de
+  similarité cosinus, la question est jugée sans rapport avec les événements.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+
+from src.config import settings
+from src.fast_path import normalize_text
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Régions et villes hors Île-de-France (les homonymes de mots courants, ex. Tours, Orange,
+# Champagne ou La Réunion, sont exclus)
+OTHER_LOCATIONS = [
+    "Auvergne-Rhône-Alpes", "Bourgogne-Franche-Comté", "Bourgogne", "Bretagne", "Centre-Val de Loire",
+    "Corse", "Grand Est", "Alsace", "Hauts-de-France", "Normandie",
+    "Nouvelle-Aquitaine", "Aquitaine", "Occitanie", "Pays de la Loire", "Provence-Alpes-Côte d'Azur",
+    "PACA", "Provence", "Côte d'Azur", "Guadeloupe", "Martinique", "Guyane", "Mayotte",
+    "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Strasbourg", "Montpellier", "Bordeaux", "Lille",
+    "Rennes", "Reims", "Toulon", "Saint-Étienne", "Le Havre", "Grenoble", "Dijon", "Angers", "Nîmes",
+    "Clermont-Ferrand", "Aix-en-Provence", "Brest", "Limoges", "Amiens", "Perpignan", "Metz", "Besançon",
+    "Orléans", "Rouen", "Caen", "Avignon", "Poitiers", "La Rochelle", "Bayonne", "Biarritz", "Annecy",
+    "Chamonix", "Ajaccio", "Bastia", "Cannes", "Lourdes", "Carcassonne", "Arles", "Saint-Malo",
+    "Bruxelles", "Genève", "Lausanne", "Londres", "Berlin", "Madrid", "Barcelone", "Rome", "Montréal",
+]
+
+_MAX_NGRAM = 4
+
+# Prépositions de lieu (texte normalisé): "Orchestre National de Lyon", "films sur Berlin"
+# ou "Picasso et la Provence" citent un lieu sans le demander
+_LOCATION_PREFIX = r"(?:a|au|aux|en|vers|pres d|pres de|pres du|pres des|dans|dans le|dans la|dans les|dans l|region)"
+
+OUT_OF_SCOPE_LOCATION_ANSWER = (
+    "Je n'ai pas d'événements pour {location}. "
+    "Mes données concernent uniquement les événements culturels de la région {regions}."
+)
+OUT_OF_SCOPE_TOPIC_ANSWER = (
+    "Je ne peux répondre qu'aux questions sur les événements culturels de la région {regions}. "
+    "Pouvez-vous reformuler votre question ?"
+)
+
+
+@dataclass
+class ScopeVerdict:
+    """Décision du contrôle de périmètre."""
+
+    in_scope: bool
+    reason: Optional[str] = None  # "location" ou "similarity"
+    location: Optional[str] = None
+    similarity: Optional[float] = None
+
+
+def _ngrams(text: str) -> Set[str]:
+    words = text.split()
+    return {
+        " ".join(words[start:start + size])
+        for size in range(1, _MAX_NGRAM + 1)
+        for start in range(len(words) - size + 1)
+    }
+
+
+class ScopeGuard:
+    """Contrôle de périmètre: gazetteer des lieux indexés et seuil de similarité."""
+
+    def __init__(self, indexed_locations: Set[str], regions: Set[str], min_similarity: Optional[float] = None):
+        """
+        Args:
+            indexed_locations: Villes, départements et régions présents dans l'index
+            regions: Régions couvertes (reprises dans la réponse type)
+            min_similarity: Similarité cosinus minimale avec le chunk le plus proche
+                (settings.scope_min_similarity par défaut, 0 = contrôle désactivé)
+        """
+        self.in_scope = {normalize_text(name) for name in indexed_locations if name}
+        self.out_of_scope = {
+            key: name for name in OTHER_LOCATIONS
+            if (key := normalize_text(name)) not in self.in_scope
+        }
+        self.regions = ", ".join(sorted(regions)) or "Île-de-France"
+        self.min_similarity = min_similarity if min_similarity is not None else settings.scope_min_similarity
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, int] = {"checked": 0, "rejected_location": 0, "rejected_similarity": 0}
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: Any) -> "ScopeGuard":
+        """Construit le gazetteer à partir des métadonnées des chunks indexés."""
+        locations: Set[str] = set()
+        regions: Set[str] = set()
+        docstore = vectorstore.docstore
+        for docstore_id in vectorstore.index_to_docstore_id.values():
+            metadata = docstore.search(docstore_id).metadata
+            for key in ("location_city", "location_region", "location_department"):
+                if metadata.get(key):
+                    locations.add(metadata[key])
+            if metadata.get("location_region"):
+                regions.add(metadata["location_region"])
+        logger.info(f"Gazetteer construit: {len(locations)} lieux indexés, régions: {', '.join(sorted(regions))}")
+        return cls(locations, regions)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Copie des compteurs (questions contrôlées, rejets par motif)."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def check_location(self, question: str) -> ScopeVerdict:
+        """Rejette une question qui ne demande que des lieux absents de l'index."""
+        self._count("checked")
+        ngrams = _ngrams(normalize_text(question))
+        if ngrams & self.in_scope:
+            return ScopeVerdict(in_scope=True)
+        text = normalize_text(question)
+        outside = {
+            key for key in ngrams & self.out_of_scope.keys()
+            if re.search(rf"(?:^| ){_LOCATION_PREFIX} {re.escape(key)}(?: |$)", text)
+        }
+        if outside:
+            # Le nom le plus long ("Aix en Provence" plutôt que "Provence")
+            location = self.out_of_scope[max(outside, key=len)]
+            self._count("rejected_location")
+            logger.info(f"Question hors périmètre (lieu: {location}): {question}")
+            return ScopeVerdict(in_scope=False, reason="location", location=location)
+        return ScopeVerdict(in_scope=True)
+
+    def check_similarity(self, vectorstore: Any, query_vector: np.ndarray) -> ScopeVerdict:
+        """Rejette une question dont le chunk le plus proche est sous le seuil de similarité."""
+        if self.min_similarity <= 0 or vectorstore.index.ntotal == 0:
+            return ScopeVerdict(in_scope=True)
+        _, indices = vectorstore.index.search(query_vector, 1)
+        if indices[0][0] == -1:
+            return ScopeVerdict(in_scope=True)
+        nearest = vectorstore.index.reconstruct(int(indices[0][0]))
+        query = query_vector[0]
+        similarity = float(np.dot(query, nearest) / (np.linalg.norm(query) * np.linalg.norm(nearest) + 1e-12))
+        if similarity < self.min_similarity:
+            self._count("rejected_similarity")
+            logger.info(f"Question hors périmètre (similarité {similarity:.2f} < {self.min_similarity:.2f})")
+            return ScopeVerdict(in_scope=False, reason="similarity", similarity=similarity)
+        return ScopeVerdict(in_scope=True, similarity=similarity)
+
+    def answer(self, verdict: ScopeVerdict) -> str:
+        """Réponse type pour une question rejetée."""
+        if verdict.reason == "location":
+            return OUT_OF_SCOPE_LOCATION_ANSWER.format(location=verdict.location, regions=self.regions)
+        return OUT_OF_SCOPE_TOPIC_ANSWER.format(regions=self.regions)
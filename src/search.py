@@ -0,0 +1,323 @@
+"""
+Recherche d'événements sans génération (endpoint /search).
+
+La question est comparée aux chunks de l'index FAISS; les chunks sont
+regroupés par événement (meilleur score de l'événement), filtrés sur leurs
+métadonnées et, sur demande, réordonnés par le cross-encoder.
+
+Le classement complet (jusqu'à `search_max_results` événements) est conservé
+dans un cache à durée de vie limitée: les pages suivantes sont lues dans ce
+cache à partir du curseur, sans nouvelle recherche. Le curseur contient les
+paramètres de la recherche: s'il a expiré (ou s'il est présenté à un autre
+worker), la recherche est refaite et la pagination reprend au même rang.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.fast_path import normalize_text
+from src.logger import get_logger
+from src.profiling import RequestTimer
+
+logger = get_logger(__name__)
+
+SNIPPET_LENGTH = 300
+
+
+class InvalidCursor(ValueError):
+    """Curseur de pagination illisible."""
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value == ""
+
+
+@dataclass
+class SearchFilters:
+    """Filtres sur les métadonnées des événements (tous optionnels, combinés par ET)."""
+
+    city: Optional[str] = None
+    region: Optional[str] = None
+    department: Optional[str] = None
+    date_from: Optional[str] = None  # AAAA-MM-JJ: événements se terminant ce jour ou après
+    date_to: Optional[str] = None  # AAAA-MM-JJ: événements commençant ce jour ou avant
+    age: Optional[int] = None  # âge accepté (entre age_min et age_max)
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in asdict(self).values())
+
+    def matches(self, metadata: Dict[str, Any]) -> bool:
+        """Indique si un chunk (ses métadonnées) satisfait tous les filtres."""
+        for name, key in (("city", "location_city"), ("region", "location_region"), ("department", "location_department")):
+            expected = getattr(self, name)
+            if expected is not None and normalize_text(str(metadata.get(key) or "")) != normalize_text(expected):
+                return False
+
+        begin = str(metadata.get("firstdate_begin") or "")[:10]
+        end = str(metadata.get("lastdate_end") or "")[:10] or begin
+        if self.date_from is not None and (not end or end < self.date_from):
+            return False
+        if self.date_to is not None and (not begin or begin > self.date_to):
+            return False
+
+        if self.age is not None:
+            try:
+                if not _is_missing(metadata.get("age_min")) and self.age < int(metadata["age_min"]):
+                    return False
+                if not _is_missing(metadata.get("age_max")) and self.age > int(metadata["age_max"]):
+                    return False
+            except (TypeError, ValueError):
+                return False
+        return True
+
+
+@dataclass
+class SearchPage:
+    """Une page de résultats."""
+
+    results: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str] = None
+    cached: bool = False
+    reranked: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def encode_cursor(query: str, filters: SearchFilters, rerank: bool, offset: int) -> str:
+    payload = {"q": query, "f": {k: v for k, v in asdict(filters).items() if v is not None}, "r": rerank, "o": offset}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, SearchFilters, bool, int]:
+    """Paramètres de recherche et rang de départ contenus dans un curseur."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        offset = int(payload["o"])
+        if offset < 0:
+            raise ValueError("rang négatif")
+        return str(payload["q"]), SearchFilters(**payload.get("f", {})), bool(payload.get("r")), offset
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor(f"Curseur invalide: {e}") from e
+
+
+class EventSearch:
+    """Recherche d'événements paginée, avec cache des classements."""
+
+    def __init__(
+        self,
+        cache_ttl_s: Optional[float] = None,
+        cache_max_entries: Optional[int] = None,
+        max_results: Optional[int] = None,
+    ):
+        """
+        Args:
+            cache_ttl_s: Durée de vie d'un classement en cache (settings.search_cache_ttl_s par défaut)
+            cache_max_entries: Nombre de classements conservés (settings.search_cache_max_entries par défaut)
+            max_results: Événements classés par recherche (settings.search_max_results par défaut)
+        """
+        self.cache_ttl_s = cache_ttl_s if cache_ttl_s is not None else settings.search_cache_ttl_s
+        self.cache_max_entries = cache_max_entries or settings.search_cache_max_entries
+        self.max_results = max_results or settings.search_max_results
+        self._cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]], bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"searches": 0, "cache_hits": 0, "cache_misses": 0, "evictions": 0}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Copie des compteurs (recherches exécutées, pages servies depuis le cache)."""
+        with self._lock:
+            return {**self._stats, "cached_searches": len(self._cache)}
+
+    def search(
+        self,
+        rag_system: Any,
+        query: str,
+        filters: Optional[SearchFilters] = None,
+        rerank: bool = False,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> SearchPage:
+        """
+        Première page (ou page au rang `offset`) d'une recherche.
+
+        Args:
+            rag_system: Système RAG chargé (vectorstore, embeddings, reranker)
+            query: Texte recherché
+            filters: Filtres sur les métadonnées
+            rerank: Réordonner les événements avec le cross-encoder (s'il est chargé)
+            limit: Taille de la page
+            offset: Rang du premier résultat
+
+        Returns:
+            Page de résultats, avec le curseur de la page suivante
+        """
+        filters = filters or SearchFilters()
+        timer = RequestTimer()
+        key = self._cache_key(rag_system, query, filters, rerank)
+        entry = self._cache_get(key)
+        cached = entry is not None
+        if entry is None:
+            ranked, reranked = self._rank(rag_system, query, filters, rerank, timer)
+            self._cache_put(key, ranked, reranked)
+        else:
+            ranked, reranked = entry
+
+        results = ranked[offset:offset + limit]
+        next_offset = offset + limit
+        return SearchPage(
+            results=results,
+            total=len(ranked),
+            next_cursor=encode_cursor(query, filters, rerank, next_offset) if next_offset < len(ranked) else None,
+            cached=cached,
+            reranked=reranked,
+            timings=timer.as_dict(),
+        )
+
+    def page(self, rag_system: Any, cursor: str, limit: int = 10) -> SearchPage:
+        """Page suivante désignée par un curseur (lue dans le cache si possible)."""
+        query, filters, rerank, offset = decode_cursor(cursor)
+        return self.search(rag_system, query, filters, rerank=rerank, limit=limit, offset=offset)
+
+    def clear(self) -> None:
+        """Vide le cache des classements."""
+        with self._lock:
+            self._cache.clear()
+
+    def _cache_key(self, rag_system: Any, query: str, filters: SearchFilters, rerank: bool) -> str:
+        vectorstore = rag_system.vectorstore
+        # Un index remplacé ou enrichi (/rebuild) change la clé
+        index_version = (id(vectorstore), vectorstore.index.ntotal if vectorstore is not None else 0)
+        payload = json.dumps(
+            [" ".join(query.lower().split()), asdict(filters), rerank, index_version, self.max_results],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._cache[key]
+                self._stats["cache_misses"] += 1
+                return None
+            self._cache.move_to_end(key)
+            self._stats["cache_hits"] += 1
+            return entry[1], entry[2]
+
+    def _cache_put(self, key: str, ranked: List[Dict[str, Any]], reranked: bool) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl_s, ranked, reranked)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _rank(
+        self, rag_system: Any, query: str, filters: SearchFilters, rerank: bool, timer: RequestTimer
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Classement complet: meilleurs chunks regroupés par événement, filtrés, réordonnés."""
+        vectorstore = rag_system.vectorstore
+        if vectorstore is None:
+            raise ValueError("Le vectorstore doit être chargé avant la recherche")
+        with self._lock:
+            self._stats["searches"] += 1
+
+        with timer.stage("embed"):
+            query_vector = rag_system.embed_question(query)
+
+        # Index partitionné: seuls les shards compatibles avec les filtres sont interrogés;
+        # sans filtre, tous seraient retenus et l'index complet (déjà en mémoire) suffit
+        shards = getattr(rag_system, "shards", None)
+        if shards is not None and (filters.is_empty() or shards.is_stale(vectorstore)):
+            shards = None
+
+        ntotal = vectorstore.index.ntotal
+        k = min(max(settings.search_fetch_k, self.max_results), ntotal)
+        best: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        with timer.stage("search"):
+            while k > 0:
+                best.clear()
+                for distance, position, doc in self._nearest(vectorstore, shards, query_vector, k, filters):
+                    event_id = doc.metadata.get("event_id") or doc.metadata.get("chunk_id") or str(position)
+                    # Résultats triés par distance: le premier chunk d'un événement est son meilleur
+                    if event_id in best or not filters.matches(doc.metadata):
+                        continue
+                    best[event_id] = (float(distance), doc)
+                    if len(best) >= self.max_results:
+                        break
+                # Pas assez d'événements (filtres sélectifs, chunks d'un même événement): élargir
+                if len(best) >= self.max_results or k >= ntotal:
+                    break
+                k = min(k * 4, ntotal)
+
+        ranked = [self._result(event_id, distance, doc) for event_id, (distance, doc) in best.items()]
+
+        reranked = False
+        if rerank and ranked:
+            if rag_system.reranker is None:
+                logger.debug("Reranking demandé mais reranker non chargé: classement vectoriel conservé")
+            else:
+                with timer.stage("rerank"):
+                    scores = rag_system.reranker.predict([[query, doc.page_content] for _, doc in best.values()])
+                for result, score in zip(ranked, scores):
+                    result["rerank_score"] = round(float(score), 4)
+                ranked.sort(key=lambda result: result["rerank_score"], reverse=True)
+                reranked = True
+
+        logger.debug(f"Recherche '{query}': {len(ranked)} événements classés")
+        return ranked, reranked
+
+    @staticmethod
+    def _nearest(
+        vectorstore: Any, shards: Any, query_vector: Any, k: int, filters: SearchFilters
+    ) -> List[Tuple[float, int, Any]]:
+        """Les `k` chunks les plus proches (distance, position, document), par distance croissante."""
+        if shards is not None:
+            hits = shards.search(query_vector, k, filters)[0]
+            return [(hit.distance, rank, hit.document) for rank, hit in enumerate(hits)]
+        distances, indices = vectorstore.index.search(query_vector, k)
+        return [
+            (float(distance), int(position), vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(position)]))
+            for distance, position in zip(distances[0], indices[0])
+            if position != -1
+        ]
+
+    @staticmethod
+    def _result(event_id: str, distance: float, doc: Any) -> Dict[str, Any]:
+        metadata = doc.metadata
+        return {
+            "event_id": event_id,
+            "title": metadata.get("title", ""),
+            "city": metadata.get("location_city", ""),
+            "region": metadata.get("location_region", ""),
+            "date_begin": metadata.get("firstdate_begin", ""),
+            "date_end": metadata.get("lastdate_end", ""),
+            "url": metadata.get("url", ""),
+            # Distance L2 au carré entre vecteurs normés: similarité cosinus = 1 - d/2
+            "score": round(1.0 - distance / 2.0, 4),
+            "snippet": doc.page_content[:SNIPPET_LENGTH],
+        }
+
+
+# Instance singleton
+_event_search: Optional[EventSearch] = None
+
+
+def get_event_search() -> EventSearch:
+    """Récupère l'instance singleton de la recherche d'événements."""
+    global _event_search
+    if _event_search is None:
+        _event_search = EventSearch()
+    return _event_search
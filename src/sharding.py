@@ -0,0 +1,312 @@
+"""
+Index FAISS partitionné par région et par mois de début des événements.
+
+Les chunks sont répartis en shards `<région>/<AAAA-MM>` (mois de
+`firstdate_begin`), chacun étant un index FAISS autonome:
+
+    <index>/shards/catalog.json
+    <index>/shards/<région>/<AAAA-MM>/index.faiss, index.pkl
+
+Les shards sont construits à partir des vecteurs de l'index principal (sans
+ré-embedding) et peuvent être reconstruits indépendamment. Le catalogue
+décrit chaque shard (région, mois, nombre de chunks, dates couvertes): la
+recherche écarte les shards incompatibles avec les filtres, interroge les
+autres en parallèle et fusionne les k meilleurs résultats.
+
+Les shards sont toujours des index Flat (recherche exacte), quel que soit
+`faiss_index_type`: leurs distances sont directement comparables et la
+fusion des k meilleurs est exacte.
+
+Mémoire: l'index principal reste chargé (recherche sans filtre, MMR,
+compactage); chaque shard chargé en duplique les vecteurs. Les shards ne
+servent qu'aux recherches filtrées et sont chargés à leur première
+interrogation, sauf avec `shard_preload` (mémoire vectorielle doublée).
+"""
+
+import json
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from src.config import settings
+from src.docstore import new_docstore
+from src.faiss_index import build_faiss_index, set_nprobe
+from src.fast_path import normalize_text
+from src.logger import get_logger
+from src.search import SearchFilters
+
+logger = get_logger(__name__)
+
+SHARDS_DIR = "shards"
+CATALOG_FILE = "catalog.json"
+UNKNOWN = "unknown"
+
+_MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+
+def region_slug(region: Optional[str]) -> str:
+    """Nom de répertoire d'une région ("Île-de-France" -> "ile-de-france")."""
+    return normalize_text(region or "").replace(" ", "-") or UNKNOWN
+
+
+def shard_key(metadata: Dict[str, Any]) -> str:
+    """Shard d'un chunk: `<région>/<AAAA-MM>` (mois de début, "unknown" si absent)."""
+    month = str(metadata.get("firstdate_begin") or "")[:7]
+    return f"{region_slug(metadata.get('location_region'))}/{month if _MONTH_PATTERN.match(month) else UNKNOWN}"
+
+
+@dataclass
+class ShardInfo:
+    """Entrée du catalogue."""
+
+    key: str
+    region: str
+    month: str
+    num_chunks: int
+    num_events: int
+    date_max: Optional[str]  # fin la plus tardive des événements du shard (AAAA-MM-JJ)
+    built_at: str
+
+    def matches(self, filters: Optional[SearchFilters]) -> bool:
+        """Indique si le shard peut contenir des événements satisfaisant les filtres."""
+        if filters is None:
+            return True
+        if filters.region is not None and region_slug(filters.region) != region_slug(self.region):
+            return False
+        if self.month != UNKNOWN:
+            if filters.date_to is not None and self.month > filters.date_to[:7]:
+                return False
+            if filters.date_from is not None and self.date_max is not None and self.date_max < filters.date_from:
+                return False
+        return True
+
+
+class ShardCatalog:
+    """Catalogue des shards d'un index."""
+
+    def __init__(self, root: Path, shards: Optional[Dict[str, ShardInfo]] = None):
+        self.root = Path(root)
+        self.shards: Dict[str, ShardInfo] = shards or {}
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional["ShardCatalog"]:
+        """Charge le catalogue d'un index (None si l'index n'est pas partitionné)."""
+        root = Path(index_path) / SHARDS_DIR
+        if not (root / CATALOG_FILE).exists():
+            return None
+        with open(root / CATALOG_FILE, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(root, {key: ShardInfo(**info) for key, info in payload["shards"].items()})
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = {"shards": {key: asdict(info) for key, info in sorted(self.shards.items())}}
+        tmp = self.root / f"{CATALOG_FILE}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        tmp.replace(self.root / CATALOG_FILE)
+
+    @property
+    def num_chunks(self) -> int:
+        return sum(info.num_chunks for info in self.shards.values())
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def select(self, filters: Optional[SearchFilters] = None) -> List[ShardInfo]:
+        """Shards à interroger pour des filtres donnés."""
+        return [info for info in self.shards.values() if info.matches(filters)]
+
+
+def write_shards(vectorstore: Any, index_path: str, keys: Optional[List[str]] = None) -> ShardCatalog:
+    """
+    Écrit les shards d'un index à partir de ses vecteurs (sans ré-embedding).
+
+    Args:
+        vectorstore: Vectorstore FAISS principal
+        index_path: Répertoire de l'index (les shards sont écrits dans `shards/`)
+        keys: Shards à reconstruire (tous par défaut); les autres sont conservés
+
+    Returns:
+        Catalogue mis à jour
+    """
+    partitions: Dict[str, List[int]] = {}
+    documents: Dict[int, Any] = {}
+    for position, docstore_id in vectorstore.index_to_docstore_id.items():
+        doc = vectorstore.docstore.search(docstore_id)
+        key = shard_key(doc.metadata)
+        if keys is None or key in keys:
+            partitions.setdefault(key, []).append(position)
+            documents[position] = doc
+
+    catalog = ShardCatalog.load(index_path) or ShardCatalog(Path(index_path) / SHARDS_DIR)
+    if keys is None:
+        # Reconstruction complète: les shards disparus sont retirés
+        shutil.rmtree(catalog.root, ignore_errors=True)
+        catalog.shards = {}
+    for key in keys or []:
+        if key not in partitions and key in catalog.shards:
+            shutil.rmtree(catalog.path(key), ignore_errors=True)
+            del catalog.shards[key]
+
+    built_at = datetime.now(timezone.utc).isoformat()
+    for key, positions in sorted(partitions.items()):
+        docs = [documents[position] for position in positions]
+        vectors = np.stack([vectorstore.index.reconstruct(position) for position in positions])
+        docstore_ids = [str(i) for i in range(len(docs))]
+        shard = FAISS(
+            embedding_function=vectorstore.embedding_function,
+            index=build_faiss_index(vectors, "Flat"),
+            docstore=new_docstore(dict(zip(docstore_ids, docs))),
+            index_to_docstore_id=dict(enumerate(docstore_ids)),
+        )
+        shard.save_local(str(catalog.path(key)))
+
+        ends = [str(doc.metadata.get("lastdate_end") or doc.metadata.get("firstdate_begin") or "")[:10] for doc in docs]
+        region_dir, month = key.split("/")
+        catalog.shards[key] = ShardInfo(
+            key=key,
+            region=docs[0].metadata.get("location_region") or region_dir,
+            month=month,
+            num_chunks=len(docs),
+            num_events=len({doc.metadata.get("event_id") for doc in docs}),
+            date_max=max((end for end in ends if end), default=None),
+            built_at=built_at,
+        )
+
+    catalog.save()
+    logger.info(f"{len(partitions)} shards écrits ({len(catalog.shards)} au catalogue) dans {catalog.root}")
+    return catalog
+
+
+# Pool partagé par les index successifs (un index remplacé à chaud peut encore servir des requêtes)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.shard_search_workers, thread_name_prefix="shard-search")
+        return _executor
+
+
+@dataclass
+class ShardHit:
+    """Chunk trouvé dans un shard."""
+
+    distance: float
+    document: Any
+    vector: np.ndarray
+
+
+class ShardedIndex:
+    """Recherche parallèle sur les shards d'un index."""
+
+    def __init__(self, catalog: ShardCatalog, embeddings: Any = None):
+        """
+        Args:
+            catalog: Catalogue des shards
+            embeddings: Fonction d'embedding associée aux vectorstores des shards
+        """
+        self.catalog = catalog
+        self.embeddings = embeddings
+        self._shards: Dict[str, Any] = {}
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, index_path: str, embeddings: Any = None) -> Optional["ShardedIndex"]:
+        """Index partitionné d'un répertoire (None s'il n'a pas de shards)."""
+        catalog = ShardCatalog.load(index_path)
+        if catalog is None:
+            return None
+        logger.info(f"Index partitionné: {len(catalog.shards)} shards, {catalog.num_chunks} chunks")
+        return cls(catalog, embeddings)
+
+    def is_stale(self, vectorstore: Any) -> bool:
+        """Vrai si les shards ne couvrent plus les chunks de l'index principal."""
+        return self.catalog.num_chunks != vectorstore.index.ntotal
+
+    def preload(self) -> None:
+        """Charge tous les shards (sinon, chacun est chargé à sa première interrogation); double la mémoire des vecteurs."""
+        for key in self.catalog.shards:
+            self._shard(key)
+
+    def _shard(self, key: str) -> Any:
+        shard = self._shards.get(key)
+        if shard is None:
+            with self._load_lock:
+                shard = self._shards.get(key)
+                if shard is None:
+                    shard = FAISS.load_local(
+                        str(self.catalog.path(key)),
+                        self.embeddings,
+                        allow_dangerous_deserialization=True,
+                    )
+                    set_nprobe(shard.index, settings.faiss_nprobe)
+                    self._shards[key] = shard
+        return shard
+
+    def _search_shard(self, key: str, query_vectors: np.ndarray, k: int):
+        shard = self._shard(key)
+        distances, indices = shard.index.search(query_vectors, min(k, shard.index.ntotal))
+        return shard, distances, indices
+
+    def search(
+        self, query_vectors: np.ndarray, k: int, filters: Optional[SearchFilters] = None
+    ) -> List[List[ShardHit]]:
+        """
+        Les `k` chunks les plus proches de chaque requête, tous shards retenus confondus.
+
+        Args:
+            query_vectors: Vecteurs des requêtes (n x d)
+            k: Résultats par requête
+            filters: Filtres (shards écartés d'après le catalogue, puis chunks filtrés)
+
+        Returns:
+            Résultats par requête, du plus proche au plus éloigné
+        """
+        filters = filters if filters is not None and not filters.is_empty() else None
+        keys = [info.key for info in self.catalog.select(filters)]
+        if not keys:
+            return [[] for _ in query_vectors]
+
+        # Avec des filtres, certains résultats seront écartés: chaque shard en renvoie davantage
+        fetch_k = k * 4 if filters is not None else k
+        executor = _get_executor()
+        futures = [executor.submit(self._search_shard, key, query_vectors, fetch_k) for key in keys]
+        shard_results = [future.result() for future in futures]
+
+        hits: List[List[ShardHit]] = []
+        for row in range(len(query_vectors)):
+            candidates = []
+            for shard, distances, indices in shard_results:
+                for distance, position in zip(distances[row], indices[row]):
+                    if position != -1:
+                        candidates.append((float(distance), shard, int(position)))
+            candidates.sort(key=lambda candidate: candidate[0])
+
+            row_hits: List[ShardHit] = []
+            for distance, shard, position in candidates:
+                doc = shard.docstore.search(shard.index_to_docstore_id[position])
+                if filters is not None and not filters.matches(doc.metadata):
+                    continue
+                row_hits.append(ShardHit(distance, doc, shard.index.reconstruct(position)))
+                if len(row_hits) >= k:
+                    break
+            hits.append(row_hits)
+        return hits
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Shards au catalogue et shards chargés en mémoire."""
+        return {"shards": len(self.catalog.shards), "loaded_shards": len(self._shards), "chunks": self.catalog.num_chunks}
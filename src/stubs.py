@@ -0,0 +1,114 @@
+"""
+Remplaçants locaux et déterministes des clients Mistral (chat et embeddings).
+
+Utilisés par les tests de charge et les benchmarks pour exercer le pipeline RAG
+complet sans réseau ni coût, avec une latence simulée configurable.
+"""
+
+import hashlib
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class StubEmbeddings(Embeddings):
+    """
+    Embeddings déterministes par hachage de tokens (feature hashing).
+
+    Deux textes partageant des mots ont des vecteurs proches, ce qui donne une
+    recherche plausible sans modèle. La dimension par défaut est celle de
+    mistral-embed afin de pouvoir charger un index construit avec Mistral.
+    """
+
+    def __init__(self, size: int = 1024, latency_ms: float = 0.0):
+        self.size = size
+        self.latency_ms = latency_ms
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def _sleep(self) -> None:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._sleep()
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._sleep()
+        return self._embed(text)
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Modèle de chat déterministe avec latence simulée.
+
+    `first_token_ms` simule le délai avant le premier token en streaming,
+    `latency_ms` la durée totale de génération.
+    """
+
+    latency_ms: float = 0.0
+    first_token_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"Réponse simulée {digest} à partir du contexte fourni."
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        message = AIMessage(content=self._answer(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        words = self._answer(messages).split(" ")
+        first_token_ms = min(self.first_token_ms, self.latency_ms) if self.latency_ms else self.first_token_ms
+        remaining_ms = max(self.latency_ms - first_token_ms, 0.0)
+        per_word_s = remaining_ms / 1000 / max(len(words) - 1, 1)
+
+        if first_token_ms > 0:
+            time.sleep(first_token_ms / 1000)
+        for i, word in enumerate(words):
+            if i > 0 and per_word_s > 0:
+                time.sleep(per_word_s)
+            content = word if i == 0 else f" {word}"
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content))
+            if run_manager:
+                run_manager.on_llm_new_token(content, chunk=chunk)
+            yield chunk
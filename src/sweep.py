@@ -0,0 +1,211 @@
+"""
+Balayage des paramètres de recherche: qualité vs latence et frontière de Pareto.
+
+Chaque point de l'espace (top_k, fetch_k, reranking, rerank_top_n, type
+d'index FAISS, nprobe) est évalué avec `RetrievalEvaluator` sur un jeu de
+questions, sans LLM. La qualité retenue est le recall des `rerank_top_n`
+premiers documents du classement final (ceux renvoyés comme sources).
+"""
+
+import itertools
+import random
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from src.config import settings
+from src.faiss_index import convert_vectorstore, parse_index_type, set_nprobe
+from src.logger import get_logger
+from src.rag import RAGSystem
+from src.retrieval_eval import RetrievalEvaluator
+
+logger = get_logger(__name__)
+
+# Paramètre du point de balayage -> attribut de `Settings`
+SWEEP_SETTINGS = {
+    "top_k": "rag_top_k",
+    "fetch_k": "rag_fetch_k",
+    "rerank": "rag_enable_reranking",
+    "rerank_top_n": "rag_rerank_top_n",
+    "faiss_index_type": "faiss_index_type",
+    "faiss_nprobe": "faiss_nprobe",
+}
+
+
+@contextmanager
+def override_settings(**values: Any) -> Iterator[None]:
+    """Modifie temporairement des attributs de `settings` (usage hors API uniquement)."""
+    previous = {name: getattr(settings, name) for name in values}
+    try:
+        for name, value in values.items():
+            setattr(settings, name, value)
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def grid_points(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Produit cartésien de l'espace de recherche, sans les points invalides ou redondants.
+
+    Les points avec fetch_k < top_k sont écartés, et nprobe n'est décliné que
+    pour les index IVF (il est sans effet sur Flat et HNSW).
+    """
+    names = list(space)
+    points = []
+    seen = set()
+    for values in itertools.product(*(space[name] for name in names)):
+        point = dict(zip(names, values))
+        if point.get("fetch_k", 0) < point.get("top_k", 0):
+            continue
+        if "faiss_index_type" in point and parse_index_type(point["faiss_index_type"])[0] != "IVF":
+            point["faiss_nprobe"] = None
+        signature = tuple(sorted(point.items()))
+        if signature not in seen:
+            seen.add(signature)
+            points.append(point)
+    return points
+
+
+def random_points(space: Dict[str, Sequence[Any]], count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Échantillon aléatoire (sans remise) de la grille."""
+    points = grid_points(space)
+    return random.Random(seed).sample(points, k=min(count, len(points)))
+
+
+def pareto_frontier(results: List[Dict[str, Any]], quality_key: str = "quality", cost_key: str = "p95_ms") -> List[Dict[str, Any]]:
+    """Points non dominés (aucun autre point n'est à la fois meilleur et moins coûteux), par coût croissant."""
+    frontier = []
+    for candidate in results:
+        dominated = any(
+            other[quality_key] >= candidate[quality_key]
+            and other[cost_key] <= candidate[cost_key]
+            and (other[quality_key] > candidate[quality_key] or other[cost_key] < candidate[cost_key])
+            for other in results
+        )
+        if not dominated:
+            frontier.append(candidate)
+    return sorted(frontier, key=lambda row: row[cost_key])
+
+
+def recommend(frontier: List[Dict[str, Any]], tolerance: float = 0.01, quality_key: str = "quality") -> Optional[Dict[str, Any]]:
+    """
+    Point le plus rapide de la frontière dont la qualité est à moins de `tolerance` de la meilleure.
+
+    Chaque milliseconde au-delà de ce point n'apporte pas de gain de qualité mesurable.
+    """
+    if not frontier:
+        return None
+    best = max(row[quality_key] for row in frontier)
+    eligible = [row for row in frontier if row[quality_key] >= best - tolerance]
+    return min(eligible, key=lambda row: row["p95_ms"])
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Tableau texte des points (paramètres, qualité, latences)."""
+    columns = list(SWEEP_SETTINGS) + ["quality", "mrr", "p50_ms", "p95_ms"]
+    header = " | ".join(f"{name:>16}" for name in columns)
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        cells = []
+        for name in columns:
+            value = row.get(name)
+            cells.append(f"{value:>16.4f}" if isinstance(value, float) else f"{str(value):>16}")
+        lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+class RetrievalSweep:
+    """Évalue des configurations de recherche sur un même index et un même jeu de questions."""
+
+    def __init__(self, rag_system: RAGSystem, questions: List[Dict[str, Any]]):
+        """
+        Args:
+            rag_system: Système RAG avec index chargé (le LLM n'est pas utilisé)
+            questions: Questions avec 'ground_truth' et éventuellement 'event_ids'
+        """
+        if not questions:
+            raise ValueError("Aucune question pour le balayage")
+        self.rag_system = rag_system
+        self.questions = questions
+        self._base_vectorstore = rag_system.vectorstore
+        self._vectorstores: Dict[str, Any] = {}
+
+    def _vectorstore_for(self, index_type: Optional[str]) -> Any:
+        """Vectorstore du type demandé (construit une seule fois depuis l'index chargé)."""
+        if index_type is None:
+            return self._base_vectorstore
+        if index_type not in self._vectorstores:
+            self._vectorstores[index_type] = convert_vectorstore(self._base_vectorstore, index_type)
+        return self._vectorstores[index_type]
+
+    def _ensure_reranker(self) -> None:
+        if self.rag_system.reranker is None:
+            with override_settings(rag_enable_reranking=True):
+                self.rag_system.initialize_reranker()
+
+    def evaluate_point(self, point: Dict[str, Any]) -> Dict[str, Any]:
+        """Évalue une configuration et retourne ses paramètres, sa qualité et sa latence."""
+        overrides = {
+            SWEEP_SETTINGS[name]: value
+            for name, value in point.items()
+            if value is not None
+        }
+        if point.get("rerank"):
+            self._ensure_reranker()
+
+        vectorstore = self._vectorstore_for(point.get("faiss_index_type"))
+        if point.get("faiss_nprobe") is not None:
+            set_nprobe(vectorstore.index, point["faiss_nprobe"])
+
+        self.rag_system.vectorstore = vectorstore
+        try:
+            with override_settings(**overrides):
+                top_n = settings.rag_rerank_top_n
+                evaluator = RetrievalEvaluator(rag_system=self.rag_system, ks=sorted({top_n, settings.rag_top_k}))
+                # Échauffement: exclut le premier appel (caches, allocation) des latences
+                self.rag_system.retrieve(self.questions[0]["question"])
+                results = evaluator.evaluate(self.questions)
+        finally:
+            self.rag_system.vectorstore = self._base_vectorstore
+
+        metrics = results["metrics"]
+        final_stage = "reranked" if results["config"]["rerank"] else "retrieved"
+        row = {name: results["config"][name] for name in SWEEP_SETTINGS}
+        if point.get("faiss_index_type") is not None and parse_index_type(point["faiss_index_type"])[0] != "IVF":
+            row["faiss_nprobe"] = None
+        row.update({
+            "quality": metrics[f"{final_stage}_recall@{top_n}"],
+            "mrr": metrics[f"{final_stage}_mrr"],
+            "ndcg": metrics[f"{final_stage}_ndcg@{top_n}"],
+            "p50_ms": results["latency_ms"]["total"]["p50"],
+            "p95_ms": results["latency_ms"]["total"]["p95"],
+            "latency_ms": results["latency_ms"],
+        })
+        return row
+
+    def run(self, points: List[Dict[str, Any]], tolerance: float = 0.01) -> Dict[str, Any]:
+        """
+        Évalue tous les points et calcule la frontière de Pareto.
+
+        Returns:
+            Dict avec "results", "frontier" et "recommended"
+        """
+        results = []
+        for i, point in enumerate(points, start=1):
+            logger.info(f"Point {i}/{len(points)}: {point}")
+            results.append(self.evaluate_point(point))
+
+        frontier = pareto_frontier(results)
+        recommended = recommend(frontier, tolerance)
+        if recommended:
+            logger.info(
+                f"Configuration recommandée: qualité {recommended['quality']:.3f}, "
+                f"p95 {recommended['p95_ms']:.1f} ms"
+            )
+        return {
+            "num_questions": len(self.questions),
+            "results": results,
+            "frontier": frontier,
+            "recommended": recommended,
+        }
@@ -0,0 +1,247 @@
+"""
+Générateur de corpus synthétique au format OpenAgenda pour les tests à l'échelle.
+
+Chaque événement est dérivé de (graine, position): la génération est
+reproductible, se fait en flux (aucun corpus en mémoire) et permet de
+régénérer n'importe quel événement pour construire des questions de test.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Région -> [(ville, code postal, département, latitude, longitude)]
+REGIONS: Dict[str, List[Tuple[str, str, str, float, float]]] = {
+    "Île-de-France": [
+        ("Paris", "75001", "Paris", 48.8566, 2.3522),
+        ("Versailles", "78000", "Yvelines", 48.8049, 2.1204),
+        ("Saint-Denis", "93200", "Seine-Saint-Denis", 48.9362, 2.3574),
+        ("Montreuil", "93100", "Seine-Saint-Denis", 48.8638, 2.4485),
+        ("Nanterre", "92000", "Hauts-de-Seine", 48.8924, 2.2071),
+        ("Créteil", "94000", "Val-de-Marne", 48.7904, 2.4556),
+        ("Meaux", "77100", "Seine-et-Marne", 48.9601, 2.8788),
+        ("Cergy", "95000", "Val-d'Oise", 49.0364, 2.0761),
+        ("Évry-Courcouronnes", "91000", "Essonne", 48.6292, 2.4410),
+    ],
+    "Auvergne-Rhône-Alpes": [
+        ("Lyon", "69001", "Rhône", 45.7640, 4.8357),
+        ("Grenoble", "38000", "Isère", 45.1885, 5.7245),
+        ("Clermont-Ferrand", "63000", "Puy-de-Dôme", 45.7772, 3.0870),
+    ],
+    "Provence-Alpes-Côte d'Azur": [
+        ("Marseille", "13001", "Bouches-du-Rhône", 43.2965, 5.3698),
+        ("Nice", "06000", "Alpes-Maritimes", 43.7102, 7.2620),
+        ("Avignon", "84000", "Vaucluse", 43.9493, 4.8055),
+    ],
+    "Occitanie": [
+        ("Toulouse", "31000", "Haute-Garonne", 43.6047, 1.4442),
+        ("Montpellier", "34000", "Hérault", 43.6108, 3.8767),
+    ],
+    "Nouvelle-Aquitaine": [
+        ("Bordeaux", "33000", "Gironde", 44.8378, -0.5792),
+        ("Poitiers", "86000", "Vienne", 46.5802, 0.3404),
+    ],
+}
+
+_EVENT_KINDS = [
+    "Concert", "Exposition", "Atelier", "Spectacle", "Visite guidée", "Conférence",
+    "Festival", "Projection", "Lecture", "Balade", "Rencontre", "Stage", "Bal", "Marché",
+]
+_THEMES = [
+    "jazz", "musique baroque", "photographie", "art contemporain", "street art", "poésie",
+    "danse hip-hop", "théâtre d'objets", "astronomie", "patrimoine industriel", "cinéma muet",
+    "jardinage urbain", "bande dessinée", "archéologie", "musique électronique", "cirque",
+    "gastronomie", "sciences participatives", "marionnettes", "chanson française",
+]
+_VENUES = [
+    "Le Rocheton", "la Maison des Arts", "l'Atelier du Canal", "la Halle aux Grains",
+    "le Théâtre des Sources", "la Médiathèque Louise Michel", "le Moulin de la Tour",
+    "la Ferme du Buisson", "l'Espace Pierre Bayle", "la Cité des Vents", "le Kiosque",
+    "le Château de la Roche", "la Friche Lamartine", "le Musée des Horloges",
+    "la Grange aux Belles", "le Cloître Saint-Jean", "la Chapelle des Lumières",
+]
+_STREETS = [
+    "rue de la République", "avenue Jean Jaurès", "place de la Mairie", "rue Victor Hugo",
+    "boulevard Pasteur", "rue des Écoles", "quai de la Loire", "allée des Tilleuls",
+]
+_SENTENCES = [
+    "Une proposition originale ouverte à tous les publics.",
+    "Les artistes invités partageront leur démarche avec les visiteurs.",
+    "Réservation conseillée, le nombre de places est limité.",
+    "Le parcours est accessible aux personnes à mobilité réduite.",
+    "Une collation sera offerte à l'issue de la représentation.",
+    "Cette édition met à l'honneur la création locale et les jeunes talents.",
+    "Un moment convivial pour découvrir le lieu autrement.",
+    "Le programme détaillé est disponible sur le site de l'organisateur.",
+    "Les enfants doivent être accompagnés d'un adulte.",
+    "L'événement se tient en extérieur, prévoir une tenue adaptée.",
+    "Des ateliers pratiques complètent la présentation.",
+    "Entrée libre dans la limite des places disponibles.",
+]
+
+
+class CorpusDistribution(BaseModel):
+    """Distribution des caractéristiques du corpus généré."""
+
+    # Poids des régions (les clés doivent exister dans REGIONS)
+    regions: Dict[str, float] = Field(default_factory=lambda: {"Île-de-France": 1.0})
+    # (nombre de phrases de description, poids)
+    description_sentences: List[Tuple[int, float]] = Field(
+        default_factory=lambda: [(0, 0.05), (1, 0.25), (3, 0.35), (8, 0.25), (20, 0.10)]
+    )
+    start_date: str = "2025-01-01"
+    span_days: int = 365
+    max_duration_days: int = 30
+    free_ratio: float = 0.4
+    age_ratio: float = 0.3
+    keywords_max: int = 6
+    # Part d'événements republiés à l'identique sous un autre uid (récurrences)
+    republish_ratio: float = 0.05
+
+
+class SyntheticEventGenerator:
+    """Produit des événements réalistes au format OpenDataSoft OpenAgenda."""
+
+    def __init__(self, seed: int = 0, distribution: Optional[CorpusDistribution] = None):
+        self.seed = seed
+        self.distribution = distribution or CorpusDistribution()
+        self._regions = list(self.distribution.regions)
+        self._region_weights = [self.distribution.regions[r] for r in self._regions]
+        self._sentence_counts = [count for count, _ in self.distribution.description_sentences]
+        self._sentence_weights = [weight for _, weight in self.distribution.description_sentences]
+        self._start = datetime.fromisoformat(self.distribution.start_date)
+
+    def _rng(self, index: int, stream: str = "event") -> random.Random:
+        return random.Random(f"{self.seed}:{index}:{stream}")
+
+    def _source_index(self, index: int) -> int:
+        """Suit la chaîne de republications jusqu'à l'événement d'origine."""
+        while index > 0:
+            rng = self._rng(index, "republish")
+            if rng.random() >= self.distribution.republish_ratio:
+                break
+            index = rng.randrange(index)
+        return index
+
+    def event(self, index: int) -> Dict[str, Any]:
+        """Génère l'événement à la position `index` (déterministe)."""
+        rng = self._rng(index)
+        dist = self.distribution
+
+        # Republication: même contenu que l'événement d'origine, uid et dates différents
+        content_rng = self._rng(self._source_index(index), "content")
+
+        kind = content_rng.choice(_EVENT_KINDS)
+        theme = content_rng.choice(_THEMES)
+        venue = content_rng.choice(_VENUES)
+        region = content_rng.choices(self._regions, self._region_weights)[0]
+        city, postal_code, department, lat, lon = content_rng.choice(REGIONS[region])
+        num_sentences = content_rng.choices(self._sentence_counts, self._sentence_weights)[0]
+        description = " ".join(
+            [f"{kind} autour du thème {theme} à {venue}."] * bool(num_sentences)
+            + content_rng.choices(_SENTENCES, k=max(num_sentences - 1, 0))
+        )
+        keywords = content_rng.sample(_THEMES, k=content_rng.randint(1, dist.keywords_max))
+        street = f"{content_rng.randint(1, 150)} {content_rng.choice(_STREETS)}"
+        title = f"{kind} {theme} - {venue[0].upper()}{venue[1:]}"
+
+        begin = self._start + timedelta(
+            days=rng.randrange(max(dist.span_days, 1)),
+            hours=rng.choice([10, 14, 18, 20]),
+        )
+        end = begin + timedelta(days=rng.randrange(dist.max_duration_days + 1), hours=2)
+
+        event: Dict[str, Any] = {
+            "uid": f"synth_{self.seed}_{index}",
+            "title_fr": title,
+            "description_fr": description,
+            "keywords_fr": keywords,
+            "location_name": venue,
+            "location_address": f"{street}, {postal_code} {city}",
+            "location_city": city,
+            "location_postalcode": postal_code,
+            "location_department": department,
+            "location_region": region,
+            "location_lat": round(lat + rng.uniform(-0.05, 0.05), 6),
+            "location_lon": round(lon + rng.uniform(-0.05, 0.05), 6),
+            "firstdate_begin": begin.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "lastdate_end": end.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "free": rng.random() < dist.free_ratio,
+            "canonicalurl": f"https://openagenda.com/events/synth-{self.seed}-{index}",
+        }
+        event["location_coordinates"] = [event["location_lat"], event["location_lon"]]
+
+        if rng.random() < dist.age_ratio:
+            age_min = rng.choice([0, 3, 6, 12])
+            event["age_min"] = age_min
+            event["age_max"] = rng.choice([age_min + 5, age_min + 10, 99])
+
+        return event
+
+    def generate(self, count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Génère `count` événements en flux."""
+        for index in range(start, start + count):
+            yield self.event(index)
+
+    def generate_questions(self, count: int, corpus_size: int) -> List[Dict[str, Any]]:
+        """
+        Génère des questions/réponses attendues sur des événements du corpus.
+
+        Les questions suivent le format de data/test/ragas_questions.json,
+        avec en plus l'`event_id` attendu pour l'évaluation de la recherche.
+        """
+        rng = random.Random(f"{self.seed}:questions")
+        questions = []
+        for index in rng.sample(range(corpus_size), k=min(count, corpus_size)):
+            event = self.event(index)
+            title = event["title_fr"]
+            templates = [
+                (f"Quelle est l'adresse de l'événement {title} ?", event["location_address"]),
+                (f"Dans quelle ville a lieu {title} ?", event["location_city"]),
+                (f"Quel est le département de {title} ?", event["location_department"]),
+                (f"Quel est le code postal de {title} ?", event["location_postalcode"]),
+                (f"Quel est le site web de {title} ?", event["canonicalurl"]),
+            ]
+            if "age_max" in event:
+                templates.append((f"Quel est l'âge maximum pour {title} ?", str(event["age_max"])))
+            question, ground_truth = rng.choice(templates)
+            questions.append({
+                "question": question,
+                "ground_truth": ground_truth,
+                "event_ids": [event["uid"]],
+            })
+        return questions
+
+
+def write_jsonl(events: Iterator[Dict[str, Any]], output_path: Path) -> int:
+    """Écrit les événements en JSONL (une ligne par événement), retourne le nombre écrit."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    logger.info(f"{count} événements écrits dans {output_path}")
+    return count
+
+
+def iter_events(path: Path) -> Iterator[Dict[str, Any]]:
+    """Lit des événements depuis un fichier JSON (liste) ou JSONL (en flux)."""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
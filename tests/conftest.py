@@ -2,6 +2,7 @@
 Configuration pytest et fixtures communes pour tous les tests.
 """
 
+import os
 import pytest
 import sys
 from pathlib import Path
@@ -11,6 +12,9 @@ from unittest.mock import MagicMock
 root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
 
+# Les tests n'écrivent pas dans le fichier de log de l'application (logs/app.log)
+os.environ.setdefault("LOG_FILE", "")
+
 
 @pytest.fixture
 def sample_event():
@@ -58,3 +58,39 @@ def test_ask_endpoint_validation():
     # Question too short
     response = client.post("/ask", json={"question": "ab"})
     assert response.status_code == 422
+
+
+@patch("api.main.get_rag_system")
+def test_ask_endpoint_timings_opt_in(mock_get_rag):
+    """Timings are only returned when requested via header."""
+    mock_rag = MagicMock()
+    mock_rag.query.return_value = {
+        "question": "Test question",
+        "answer": "Test answer",
+        "sources": [],
+        "timings": {"embed": 1.0, "total": 2.0},
+    }
+    mock_get_rag.return_value = mock_rag
+
+    response = client.post("/ask", json={"question": "Test question"})
+    assert "timings" not in response.json()
+
+    response = client.post(
+        "/ask",
+        json={"question": "Test question"},
+        headers={"X-Debug-Timings": "1"},
+    )
+    assert response.json()["timings"]["embed"] == 1.0
+
+    # Paramètre admin refusé sans jeton configuré
+    response = client.post("/ask?debug=true", json={"question": "Test question"})
+    assert "timings" not in response.json()
+
+
+def test_request_id_header():
+    """X-Request-ID is echoed back, or generated when absent."""
+    response = client.get("/health", headers={"X-Request-ID": "abc123"})
+    assert response.headers["X-Request-ID"] == "abc123"
+
+    generated = client.get("/health").headers["X-Request-ID"]
+    assert generated and generated != "abc123"
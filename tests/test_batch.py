@@ -0,0 +1,95 @@
+"""
+Unit tests for batched questions (/ask/batch).
+"""
+
+import json
+
+import pytest
+
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+QUESTIONS = ["concert de jazz", "exposition de peinture", "spectacle pour enfants", "atelier de cuisine"]
+
+
+@pytest.fixture
+def rag():
+    from scripts.load_test import build_stub_rag_system
+
+    return build_stub_rag_system(events=list(SyntheticEventGenerator(seed=3).generate(40)))
+
+
+def _ids(docs):
+    return [doc.metadata.get("chunk_id") or doc.page_content for doc in docs]
+
+
+def test_retrieve_batch_matches_single_retrieval(rag):
+    batch = rag.retrieve_batch(QUESTIONS)
+
+    assert len(batch) == len(QUESTIONS)
+    for question, docs in zip(QUESTIONS, batch):
+        assert _ids(docs) == _ids(rag.retrieve(question))
+
+
+def test_rerank_batch_scores_all_pairs_in_one_call(rag, monkeypatch):
+    calls = []
+
+    class Reranker:
+        def predict(self, pairs):
+            calls.append(len(pairs))
+            return [len(text) for _, text in pairs]
+
+    monkeypatch.setattr("src.config.settings.rag_enable_reranking", True)
+    rag.reranker = Reranker()
+    docs = rag.retrieve_batch(QUESTIONS[:2])
+
+    reranked = rag.rerank_batch(QUESTIONS[:2], docs)
+
+    assert calls == [sum(len(d) for d in docs)]
+    for ranked in reranked:
+        lengths = [len(doc.page_content) for doc in ranked]
+        assert lengths == sorted(lengths, reverse=True)
+
+
+def test_query_batch_isolates_item_errors(rag):
+    generate = rag._answer_from_docs
+
+    def failing(question, *args, **kwargs):
+        if question == QUESTIONS[1]:
+            raise RuntimeError("LLM indisponible")
+        return generate(question, *args, **kwargs)
+
+    rag._answer_from_docs = failing
+
+    results = sorted(rag.query_batch(QUESTIONS, return_sources=True), key=lambda r: r["index"])
+
+    assert [r["index"] for r in results] == list(range(len(QUESTIONS)))
+    assert results[1]["error"] == "LLM indisponible"
+    assert all(r["answer"] and "error" not in r for i, r in enumerate(results) if i != 1)
+    assert all("embed" in r["timings"] and "llm_total" in r["timings"] for i, r in enumerate(results) if i != 1)
+
+
+def test_ask_batch_endpoint_json_and_ndjson(rag, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    monkeypatch.setattr("api.main.get_rag_system", lambda: rag)
+    client = TestClient(app)
+
+    response = client.post("/ask/batch", json={"questions": QUESTIONS})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["num_errors"] == 0
+    assert [item["index"] for item in data["results"]] == list(range(len(QUESTIONS)))
+    assert data["results"][0]["question"] == QUESTIONS[0]
+
+    response = client.post("/ask/batch?stream=true", json={"questions": QUESTIONS})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(len(QUESTIONS)))
+
+    assert client.post("/ask/batch", json={"questions": []}).status_code == 422
+    assert client.post("/ask/batch", json={"questions": ["ok?", "x"]}).status_code == 422
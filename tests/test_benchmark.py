@@ -0,0 +1,44 @@
+"""
+Unit tests for benchmark suite and regression detection.
+"""
+
+import pytest
+
+from src.benchmark import BenchmarkSuite, compare_to_baseline, load_baseline, save_baseline
+from src.regression import detect_regressions
+
+pytestmark = pytest.mark.unit
+
+
+def test_detect_regressions_absolute_threshold():
+    regressions = detect_regressions(
+        {"faithfulness": 0.70, "context_recall": 0.80},
+        {"faithfulness": 0.80, "context_recall": 0.82},
+        threshold=0.05,
+    )
+    assert [r["metric"] for r in regressions] == ["faithfulness"]
+
+
+def test_detect_regressions_relative_threshold():
+    regressions = detect_regressions(
+        {"rag.retrieve@1000": 80.0, "chunking.create_chunks@1000": 950.0},
+        {"rag.retrieve@1000": 100.0, "chunking.create_chunks@1000": 1000.0},
+        threshold=0.10,
+        relative=True,
+    )
+    assert [r["metric"] for r in regressions] == ["rag.retrieve@1000"]
+
+
+def test_benchmark_suite_and_baseline_roundtrip(tmp_path):
+    suite = BenchmarkSuite(sizes=[20], repeat=1, num_queries=3, embedding_size=32)
+    results = suite.run()
+
+    assert {"chunking.create_chunks@20", "indexer.build_index@20", "rag.retrieve@20"} <= set(results)
+
+    baseline_path = tmp_path / "baseline.json"
+    save_baseline(results, str(baseline_path))
+    baseline = load_baseline(str(baseline_path))
+    assert compare_to_baseline(results, baseline) == []
+
+    slower = {name: {**values, "ops_per_s": values["ops_per_s"] / 2} for name, values in results.items()}
+    assert compare_to_baseline(slower, baseline, tolerance=0.15)
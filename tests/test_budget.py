@@ -0,0 +1,102 @@
+"""
+Unit tests for per-request latency budgets and degraded answers.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.budget import BudgetExceeded, Deadline, run_with_budget
+from src.rag import DEGRADED_ANSWER
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+def _stub_rag_system(llm_latency_ms):
+    from scripts.load_test import build_stub_rag_system
+
+    events = list(SyntheticEventGenerator(seed=2).generate(30))
+    return build_stub_rag_system(events=events, llm_latency_ms=llm_latency_ms)
+
+
+def test_deadline_bounds_stage_budgets():
+    assert Deadline(total_ms=0).budget_ms(0) is None
+    assert Deadline(total_ms=0).budget_ms(200) == 200
+    deadline = Deadline(total_ms=1000)
+    assert deadline.budget_ms(200) == 200
+    assert 900 < deadline.budget_ms() <= 1000
+
+
+def test_run_with_budget_returns_or_raises():
+    assert run_with_budget(lambda: 42, 1000, "fast") == 42
+    assert run_with_budget(lambda: 7, None, "inline") == 7
+    with pytest.raises(BudgetExceeded) as excinfo:
+        run_with_budget(lambda: time.sleep(0.2), 20, "slow")
+    assert excinfo.value.stage == "slow"
+
+
+def test_abandoned_llm_calls_do_not_starve_retrieval(monkeypatch):
+    monkeypatch.setattr("src.budget._executors", {})
+    monkeypatch.setattr("src.config.settings.llm_executor_workers", 1)
+    release = threading.Event()
+    try:
+        with pytest.raises(BudgetExceeded):
+            run_with_budget(release.wait, 20, "llm", pool="llm")
+        # Le seul thread LLM est occupé: la recherche s'exécute dans son propre pool
+        assert run_with_budget(lambda: threading.current_thread().name, 1000, "retrieval").startswith(
+            "rag-budget-retrieval"
+        )
+        with pytest.raises(BudgetExceeded):
+            run_with_budget(lambda: None, 50, "llm", pool="llm")
+    finally:
+        release.set()
+
+
+def test_slow_llm_returns_degraded_retrieval_only_answer():
+    rag = _stub_rag_system(llm_latency_ms=2000)
+
+    start = time.perf_counter()
+    result = rag.query("concert de jazz", return_sources=True, deadline=Deadline(total_ms=300))
+
+    assert time.perf_counter() - start < 1.0
+    assert result["degraded"] is True
+    assert result["answer"] == DEGRADED_ANSWER
+    assert result["events"]
+    assert {"title", "city", "date_begin"} <= set(result["events"][0])
+    assert len({event["event_id"] for event in result["events"]}) == len(result["events"])
+    assert result["sources"] and "title" in result["sources"][0]
+
+
+def test_degraded_answer_honours_return_sources():
+    rag = _stub_rag_system(llm_latency_ms=2000)
+
+    result = rag.query("concert de jazz", return_sources=False, deadline=Deadline(total_ms=300))
+
+    assert result["degraded"] is True
+    assert result["events"]
+    assert "sources" not in result
+
+
+def test_fast_llm_is_not_degraded():
+    rag = _stub_rag_system(llm_latency_ms=0)
+    result = rag.query("concert de jazz", deadline=Deadline(total_ms=5000))
+    assert result["degraded"] is False
+    assert "events" not in result
+
+
+def test_ask_endpoint_exposes_degraded_flag(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    monkeypatch.setattr("api.main.get_rag_system", lambda: _stub_rag_system(llm_latency_ms=2000))
+    monkeypatch.setattr("src.config.settings.ask_deadline_ms", 300)
+
+    response = TestClient(app).post("/ask", json={"question": "concert de jazz"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["degraded"] is True
+    assert data["events"]
@@ -0,0 +1,124 @@
+"""
+Unit tests for expiry compaction of the index.
+"""
+
+from datetime import date
+
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.compaction import CompactionInProgress, IndexCompactor, expiry_cutoff, is_expired
+from src.faiss_index import convert_vectorstore
+from src.index_registry import IndexRegistry
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+TODAY = date(2025, 7, 1)
+
+
+@pytest.fixture
+def events():
+    return list(SyntheticEventGenerator(seed=11).generate(40))
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return IndexRegistry(str(tmp_path / "registry"))
+
+
+def _vectorstore(events):
+    return FAISS.from_documents(EventChunker().create_chunks(events), StubEmbeddings())
+
+
+def _expired_events(events, cutoff):
+    return {e["uid"] for e in events if (e.get("lastdate_end") or e["firstdate_begin"])[:10] < cutoff}
+
+
+def test_expiry_cutoff_and_grace():
+    assert expiry_cutoff(TODAY, grace_days=7) == "2025-06-24"
+    assert is_expired({"lastdate_end": "2025-06-23T22:00:00+02:00"}, "2025-06-24")
+    assert not is_expired({"firstdate_begin": "2025-05-01", "lastdate_end": "2025-06-24"}, "2025-06-24")
+    assert not is_expired({}, "2025-06-24")
+
+
+def test_compaction_removes_expired_chunks_in_place(events, registry):
+    vectorstore = _vectorstore(events)
+    registry.publish(vectorstore)
+    compactor = IndexCompactor(registry=registry)
+
+    dry = compactor.compact(today=TODAY, grace_days=0, rebuild_threshold=1.0, dry_run=True)
+    assert dry.removed_chunks > 0 and dry.version is None
+    assert dry.removed_events == len(_expired_events(events, "2025-07-01"))
+
+    report = compactor.compact(today=TODAY, grace_days=0, rebuild_threshold=1.0)
+
+    assert not report.rebuilt
+    assert report.removed_chunks == dry.removed_chunks
+    assert registry.current_version() == report.version
+    assert registry.manifest(report.version)["deleted_since_rebuild"] == report.removed_chunks
+    assert report.reclaimed_bytes > 0 and report.reclaimed_memory_bytes > 0
+    compacted = FAISS.load_local(str(registry.current_path()), StubEmbeddings(), allow_dangerous_deserialization=True)
+    assert compacted.index.ntotal == report.remaining_chunks
+    for docstore_id in compacted.index_to_docstore_id.values():
+        assert not is_expired(compacted.docstore.search(docstore_id).metadata, report.cutoff)
+
+    # Rien de plus à retirer au second passage
+    assert compactor.compact(today=TODAY, grace_days=0).removed_chunks == 0
+    assert compactor.status["runs"] == 3
+
+
+def test_compaction_rebuilds_above_threshold_or_without_removal(events, registry):
+    registry.publish(convert_vectorstore(_vectorstore(events), "HNSW16"))
+    report = IndexCompactor(registry=registry).compact(today=TODAY, grace_days=0, rebuild_threshold=1.0)
+
+    assert report.rebuilt
+    assert registry.manifest(report.version)["deleted_since_rebuild"] == 0
+
+    registry.publish(_vectorstore(events))
+    report = IndexCompactor(registry=registry).compact(today=TODAY, grace_days=0, rebuild_threshold=0.0)
+    assert report.rebuilt
+
+
+def test_compaction_swaps_served_index(events, registry, monkeypatch):
+    from scripts.load_test import build_stub_rag_system
+
+    monkeypatch.setattr("src.config.settings.rag_two_stage_retrieval", False)
+    version = registry.publish(_vectorstore(events))
+    rag = build_stub_rag_system(events=events)
+    rag.index_path = registry.version_path(version)
+    compactor = IndexCompactor(rag, registry)
+
+    report = compactor.compact(today=TODAY, grace_days=0)
+
+    assert rag.vectorstore.index.ntotal == report.remaining_chunks
+    assert rag.index_path == registry.version_path(report.version)
+    docs = rag.retrieve("concert")
+    assert docs and not any(is_expired(doc.metadata, report.cutoff) for doc in docs)
+
+    compactor._run_lock.acquire()
+    try:
+        with pytest.raises(CompactionInProgress):
+            compactor.compact(today=TODAY)
+    finally:
+        compactor._run_lock.release()
+
+
+def test_compact_endpoint_requires_token(events, registry, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main
+
+    registry.publish(_vectorstore(events))
+    monkeypatch.setattr(api.main, "get_index_compactor", lambda: IndexCompactor(registry=registry))
+    monkeypatch.setattr("src.config.settings.admin_token", "secret")
+    client = TestClient(api.main.app)
+
+    assert client.post("/admin/index/compact").status_code == 403
+    response = client.post("/admin/index/compact?dry_run=true&grace_days=0", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    assert response.json()["dry_run"] is True
+    assert "version" not in response.json()
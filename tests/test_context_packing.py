@@ -0,0 +1,79 @@
+"""
+Unit tests for token-budgeted context packing.
+"""
+
+import pytest
+
+from src.chunking import EventChunker
+from src.context_packing import build_event_block, count_tokens, pack_context
+
+pytestmark = pytest.mark.unit
+
+LONG_DESCRIPTION = " ".join(f"Phrase numéro {i} de la description détaillée." for i in range(40))
+
+
+def _event(uid, title, description=LONG_DESCRIPTION):
+    return {
+        "uid": uid,
+        "title_fr": title,
+        "description_fr": description,
+        "location_city": "Paris",
+        "location_region": "Île-de-France",
+        "location_address": "1 rue de Rivoli, 75001 Paris",
+        "firstdate_begin": "2025-06-01T20:00:00+00:00",
+        "lastdate_end": "2025-06-02T22:00:00+00:00",
+        "keywords_fr": ["jazz"],
+    }
+
+
+def test_event_block_keeps_headers_once_and_rebuilds_description():
+    chunks = EventChunker(chunk_size=300, overlap=50).create_chunks([_event("e1", "Concert de jazz")])
+    assert len(chunks) > 3
+
+    block = build_event_block(chunks)
+
+    assert block.count("Événement:") == 1
+    assert block.count("Description") == 1
+    assert "Dates: du" in block
+    assert "Phrase numéro 0 " in block and "Phrase numéro 39 " in block
+    assert block.count("Phrase numéro 20 ") == 1
+
+
+def test_event_block_keeps_short_description_without_first_part():
+    chunks = EventChunker(chunk_size=300, overlap=50).create_chunks([_event("e1", "Concert de jazz")])
+    main = next(doc for doc in chunks if doc.metadata["chunk_type"] == "main")
+    second_part = next(doc for doc in chunks if doc.metadata.get("part") == 1)
+
+    block = build_event_block([second_part, main])
+
+    short_description = next(line for line in main.page_content.splitlines() if line.startswith("Description:"))
+    assert short_description in block
+    assert "Phrase numéro 0 " in block and "Phrase numéro 10 " in block
+    assert block.index(short_description) < block.index("Suite de la description:")
+
+
+def test_pack_context_groups_by_event_in_rank_order():
+    chunker = EventChunker(chunk_size=300, overlap=50)
+    first = chunker.create_chunks([_event("e1", "Concert de jazz")])
+    second = chunker.create_chunks([_event("e2", "Exposition photo", description="Courte.")])
+    ranked = [first[1], second[0], first[0], second[1], first[2]]
+
+    context = pack_context(ranked, max_tokens=0)
+
+    blocks = context.split("\n\n")
+    assert len(blocks) == 2
+    assert blocks[0].startswith("Événement: Concert de jazz")
+    assert blocks[1].startswith("Événement: Exposition photo")
+    assert count_tokens(context) < count_tokens("\n\n".join(doc.page_content for doc in ranked))
+
+
+def test_pack_context_respects_token_budget():
+    chunker = EventChunker(chunk_size=300, overlap=50)
+    documents = []
+    for i in range(10):
+        documents.extend(chunker.create_chunks([_event(f"e{i}", f"Événement {i}")]))
+
+    context = pack_context(documents, max_tokens=300)
+
+    assert 0 < count_tokens(context) <= 300
+    assert context.startswith("Événement: Événement 0")
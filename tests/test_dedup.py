@@ -0,0 +1,90 @@
+"""
+Unit tests for near-duplicate event detection at ingestion.
+"""
+
+import pytest
+
+from src.chunking import EventChunker
+from src.dedup import MinHasher, deduplicate_events, estimated_jaccard, find_clusters, shingles
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def events():
+    return list(SyntheticEventGenerator(seed=29).generate(30))
+
+
+def _copy(event, uid, begin, end, **changes):
+    return {**event, "uid": uid, "firstdate_begin": begin, "lastdate_end": end, **changes}
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    first = shingles("Concert de jazz manouche au Sunset avec le trio Django et invités surprise ce soir")
+    second = shingles("Concert de jazz manouche au Sunset avec le trio Django et invités surprise demain")
+    exact = len(first & second) / len(first | second)
+
+    estimate = estimated_jaccard(hasher.signature(first), hasher.signature(second))
+
+    assert abs(estimate - exact) < 0.1
+    assert estimated_jaccard(hasher.signature(first), hasher.signature(shingles("Exposition de peinture"))) < 0.1
+
+
+def test_recurring_event_is_merged_with_its_dates(events):
+    original = events[0]
+    rerun = _copy(original, "rerun", "2025-09-12T20:00:00+02:00", "2025-09-12T22:00:00+02:00")
+    republished = _copy(
+        original, "republished", "2025-01-05T20:00:00+01:00", "2025-01-05T22:00:00+01:00",
+        description_fr=original["description_fr"] + " Réservation conseillée.",
+    )
+    touring = _copy(original, "touring", "2025-10-01T20:00:00+02:00", "2025-10-01T22:00:00+02:00",
+                    location_city="Ville-Lointaine")
+    batch = events + [rerun, republished, touring]
+
+    deduplicated, report = deduplicate_events(batch, threshold=0.8)
+
+    assert [sorted(batch[i]["uid"] for i in group) for group in find_clusters(batch, threshold=0.8)] == [
+        sorted([original["uid"], "rerun", "republished"])
+    ]
+    assert report.as_dict() == {
+        "input_events": 33, "output_events": 31, "clusters": 1, "duplicates_removed": 2, "dedup_ratio": 0.0606,
+    }
+    merged = deduplicated[0]
+    assert merged["description_fr"].endswith("Réservation conseillée.")
+    assert merged["firstdate_begin"] == "2025-01-05T20:00:00+01:00"
+    assert merged["lastdate_end"] == max(original["lastdate_end"], "2025-09-12T22:00:00+02:00")
+    assert [o["uid"] for o in merged["occurrences"]][0] == "republished"
+    assert any(event["uid"] == "touring" for event in deduplicated)
+
+
+def test_merged_event_chunks_list_occurrences(events):
+    original = events[0]
+    batch = [original, _copy(original, "rerun", "2025-09-12T20:00:00+02:00", "2025-09-12T22:00:00+02:00")]
+    deduplicated, _ = deduplicate_events(batch)
+
+    chunks = EventChunker().create_chunks(deduplicated)
+
+    assert len(chunks) == len(EventChunker().create_chunks([original]))
+    practical = next(doc for doc in chunks if doc.metadata["chunk_type"] == "practical")
+    assert "Représentations (2): " in practical.page_content
+    assert "12/09/2025" in practical.page_content
+    assert practical.metadata["num_occurrences"] == 2
+
+
+def test_distinct_corpus_is_unchanged(events):
+    deduplicated, report = deduplicate_events(events)
+
+    assert deduplicated == events
+    assert report.dedup_ratio == 0.0
+
+
+def test_synthetic_reruns_shrink_the_index():
+    # Le générateur produit des événements récurrents (mêmes titre, lieu et description)
+    events = list(SyntheticEventGenerator(seed=34).generate(30))
+    deduplicated, report = deduplicate_events(events)
+
+    assert report.clusters > 0 and report.output_events == len(deduplicated) < len(events)
+    assert report.dedup_ratio == round((len(events) - len(deduplicated)) / len(events), 4)
+    assert len(EventChunker().create_chunks(deduplicated)) < len(EventChunker().create_chunks(events))
@@ -0,0 +1,82 @@
+"""
+Unit tests for the normalized (event table + thin chunks) docstore.
+"""
+
+import pickle
+
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from src.chunking import EventChunker
+from src.docstore import EventDocstore, normalize_vectorstore
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def chunks():
+    return EventChunker().create_chunks(list(SyntheticEventGenerator(seed=5).generate(30)))
+
+
+def test_search_returns_joined_documents(chunks):
+    docstore = EventDocstore({str(i): doc for i, doc in enumerate(chunks)})
+
+    for i, doc in enumerate(chunks):
+        joined = docstore.search(str(i))
+        assert joined.page_content == doc.page_content
+        assert joined.metadata == doc.metadata
+    assert docstore.stats == {"events": 30, "chunks": len(chunks)}
+    assert docstore.search("absent") == "ID absent not found."
+    with pytest.raises(ValueError):
+        docstore.add({"0": chunks[0]})
+
+
+def test_event_metadata_stored_once(chunks):
+    documents = {str(i): doc for i, doc in enumerate(chunks)}
+    normalized = EventDocstore(documents)
+
+    for _, own in normalized.chunks.values():
+        assert set(own) <= {"event_id", "chunk_type", "part"}
+    assert len(pickle.dumps(normalized)) < len(pickle.dumps(InMemoryDocstore(documents)))
+
+
+def test_diverging_event_metadata_is_kept_per_chunk():
+    docstore = EventDocstore({
+        "a": Document(page_content="a", metadata={"event_id": "e1", "title": "Concert", "chunk_type": "main"}),
+        "b": Document(page_content="b", metadata={"event_id": "e1", "title": "Concert (reporté)"}),
+    })
+
+    assert docstore.search("a").metadata["title"] == "Concert"
+    assert docstore.search("b").metadata["title"] == "Concert (reporté)"
+
+    docstore.delete(["a"])
+    assert docstore.stats == {"events": 1, "chunks": 1}
+    docstore.delete(["b"])
+    assert docstore.stats == {"events": 0, "chunks": 0}
+
+
+def test_vectorstore_roundtrip_and_delete(chunks, tmp_path):
+    vectorstore = FAISS.from_documents(chunks, StubEmbeddings())
+    normalized = normalize_vectorstore(vectorstore)
+    assert isinstance(normalized.docstore, EventDocstore)
+    assert normalize_vectorstore(normalized) is normalized
+
+    normalized.save_local(str(tmp_path / "normalized"))
+    vectorstore.save_local(str(tmp_path / "legacy"))
+    assert (tmp_path / "normalized" / "index.pkl").stat().st_size < (tmp_path / "legacy" / "index.pkl").stat().st_size
+
+    loaded = FAISS.load_local(str(tmp_path / "normalized"), StubEmbeddings(), allow_dangerous_deserialization=True)
+    expected = vectorstore.similarity_search("concert de jazz", k=5)
+    assert [(d.page_content, d.metadata) for d in loaded.similarity_search("concert de jazz", k=5)] == [
+        (d.page_content, d.metadata) for d in expected
+    ]
+
+    event_id = chunks[0].metadata["event_id"]
+    ids = [i for i, (_, own) in loaded.docstore.chunks.items() if own["event_id"] == event_id]
+    loaded.delete(ids)
+    assert event_id not in loaded.docstore.events
+    assert loaded.index.ntotal == len(chunks) - len(ids)
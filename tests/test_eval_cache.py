@@ -0,0 +1,90 @@
+"""
+Unit tests for the versioned evaluation cache.
+"""
+
+import pytest
+
+from src.eval_cache import (
+    JUDGE_NAMESPACE,
+    RAG_NAMESPACE,
+    EvaluationCache,
+    current_versions,
+    index_fingerprint,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _rag_key(question, versions):
+    return {
+        "question": question,
+        "index": versions["index"],
+        "prompt": versions["prompt"],
+        "model": versions["model"],
+        "retrieval": versions["retrieval"],
+    }
+
+
+def test_cache_roundtrip_and_stats(tmp_path):
+    cache = EvaluationCache(cache_dir=str(tmp_path), enabled=True)
+    key = {"metric": "faithfulness", "question": "Q", "evaluator_model": "m"}
+
+    assert cache.get(JUDGE_NAMESPACE, key) is None
+    cache.set(JUDGE_NAMESPACE, key, 0.8)
+    assert cache.get(JUDGE_NAMESPACE, key) == 0.8
+
+    stats = cache.stats()[JUDGE_NAMESPACE]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_disabled_cache_never_stores(tmp_path):
+    cache = EvaluationCache(cache_dir=str(tmp_path), enabled=False)
+    cache.set(RAG_NAMESPACE, {"question": "Q"}, {"answer": "A"})
+    assert cache.get(RAG_NAMESPACE, {"question": "Q"}) is None
+
+
+def test_index_fingerprint_changes_with_content(tmp_path):
+    index_dir = tmp_path / "index"
+    index_dir.mkdir()
+    (index_dir / "index.faiss").write_bytes(b"v1")
+    first = index_fingerprint(str(index_dir))
+    (index_dir / "index.faiss").write_bytes(b"v2-longer")
+    assert index_fingerprint(str(index_dir)) != first
+    assert index_fingerprint(str(tmp_path / "missing")) == "missing"
+
+
+def test_invalidation_report_and_prune(tmp_path):
+    cache = EvaluationCache(cache_dir=str(tmp_path / "cache"), enabled=True)
+    old_versions = current_versions(index_path=str(tmp_path / "missing"), model_name="old-model")
+    new_versions = {**old_versions, "model": "new-model"}
+
+    cache.set(RAG_NAMESPACE, _rag_key("Q1", old_versions), {"answer": "A", "contexts": []})
+    cache.set(RAG_NAMESPACE, _rag_key("Q2", new_versions), {"answer": "B", "contexts": []})
+
+    report = cache.invalidation_report(new_versions)
+    assert report[RAG_NAMESPACE]["total"] == 2
+    assert report[RAG_NAMESPACE]["stale"] == 1
+    assert report[RAG_NAMESPACE]["stale_reasons"] == {"model": 1}
+
+    assert cache.prune(new_versions) == 1
+    assert cache.invalidation_report(new_versions)[RAG_NAMESPACE]["total"] == 1
+
+
+def test_default_index_fingerprint_follows_the_registry(tmp_path, monkeypatch):
+    from langchain_community.vectorstores import FAISS
+
+    from src.chunking import EventChunker
+    from src.index_registry import IndexRegistry
+    from src.stubs import StubEmbeddings
+    from src.synthetic import SyntheticEventGenerator
+
+    registry = IndexRegistry(str(tmp_path / "registry"))
+    chunks = EventChunker().create_chunks(list(SyntheticEventGenerator(seed=3).generate(5)))
+    version = registry.publish(FAISS.from_documents(chunks, StubEmbeddings()))
+    monkeypatch.setattr("src.index_registry._index_registry", registry)
+    monkeypatch.setattr("src.config.settings.index_registry_enabled", True)
+    monkeypatch.setattr("src.config.settings.faiss_index_path", str(tmp_path / "legacy"))
+
+    # Clé de l'évaluateur (index servi) et rapport d'invalidation (défaut) concordent
+    assert current_versions()["index"] == index_fingerprint(str(registry.version_path(version)))
+    assert current_versions()["index"] != index_fingerprint(str(tmp_path / "legacy"))
@@ -0,0 +1,80 @@
+"""
+Unit tests for the append-only evaluation history.
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.eval_history import EvaluationHistory
+
+pytestmark = pytest.mark.unit
+
+
+def _run(mode, faithfulness, timestamp="2026-01-01T00:00:00"):
+    return {
+        "timestamp": timestamp,
+        "mode": mode,
+        "metrics": {"faithfulness": faithfulness, "answer_relevancy": 0.8},
+        "summary": {"average": (faithfulness + 0.8) / 2},
+        "status": "success",
+        "latency_ms": {"total": {"p50": 120.0, "p95": 300.0}},
+        "per_question": [
+            {"question": "Q1", "faithfulness": faithfulness, "answer_tokens": 40, "latency_ms": 110.0},
+            {"question": "Q2", "faithfulness": 1.0, "answer_tokens": 60},
+        ],
+    }
+
+
+@pytest.fixture
+def history(tmp_path):
+    return EvaluationHistory(str(tmp_path / "history.db"))
+
+
+def test_append_and_query_by_mode(history):
+    history.append(_run("ragas", 0.7))
+    history.append(_run("retrieval", 0.1))
+    history.append(_run("ragas", 0.9))
+
+    assert len(history) == 3
+    last = history.last_run("ragas")
+    assert last["metrics"]["faithfulness"] == 0.9
+    assert last["stats"]["latency_ms.total.p95"] == 300.0
+    assert last["stats"]["answer_tokens.sum"] == 100
+    assert "per_question" not in last
+    assert [run["metrics"]["faithfulness"] for run in history.recent_runs("ragas", limit=5)] == [0.7, 0.9]
+    assert [point["value"] for point in history.metric_series("faithfulness", "ragas")] == [0.7, 0.9]
+    assert history.last_run("unknown") is None
+
+
+def test_question_history(history):
+    history.append(_run("ragas", 0.5))
+    history.append(_run("ragas", 0.6))
+
+    scores = history.question_history("Q1", "faithfulness")
+    assert [row["value"] for row in scores] == [0.5, 0.6]
+    assert {row["name"] for row in history.question_history("Q1")} == {"faithfulness", "answer_tokens", "latency_ms"}
+
+
+def test_export_csv(history, tmp_path):
+    history.append(_run("ragas", 0.5))
+    history.append({"mode": "retrieval", "metrics": {"retrieved_mrr": 0.4}})
+
+    output = tmp_path / "metrics.csv"
+    assert history.export_csv(str(output)) == 2
+    with open(output, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["faithfulness"] == "0.5"
+    assert rows[1]["retrieved_mrr"] == "0.4"
+    assert rows[1]["faithfulness"] == ""
+
+
+def test_migrates_json_history_once(tmp_path):
+    legacy = tmp_path / "evaluation_history.json"
+    legacy.write_text(json.dumps([_run("ragas", 0.5), {"metrics": {"faithfulness": 0.6}}]), encoding="utf-8")
+    history = EvaluationHistory(str(tmp_path / "history.db"))
+
+    assert history.migrate_json(str(legacy)) == 2
+    assert history.migrate_json(str(legacy)) == 0
+    assert history.last_run("ragas")["metrics"]["faithfulness"] == 0.6
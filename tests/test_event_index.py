@@ -0,0 +1,82 @@
+"""
+Unit tests for the event-level index and two-stage retrieval.
+"""
+
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.config import settings
+from src.event_index import EventIndex
+from src.profiling import RequestTimer
+from src.rag import RAGSystem
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def vectorstore():
+    events = list(SyntheticEventGenerator(seed=5).generate(30))
+    return FAISS.from_documents(EventChunker().create_chunks(events), StubEmbeddings(size=64))
+
+
+def _event_ids(vectorstore):
+    return {doc.metadata["event_id"] for doc in vectorstore.docstore._dict.values()}
+
+
+def test_one_vector_per_event(vectorstore):
+    event_index = EventIndex.from_vectorstore(vectorstore, vector="main")
+
+    assert set(event_index.event_ids) == _event_ids(vectorstore)
+    assert event_index.index.ntotal == len(event_index.event_ids)
+    assert sum(len(p) for p in event_index.chunk_positions.values()) == vectorstore.index.ntotal
+
+
+def test_centroid_is_mean_of_event_chunks(vectorstore):
+    event_index = EventIndex.from_vectorstore(vectorstore, vector="centroid")
+    event_id = event_index.event_ids[0]
+    positions = event_index.chunk_positions[event_id]
+
+    expected = np.mean([vectorstore.index.reconstruct(i) for i in positions], axis=0)
+    np.testing.assert_allclose(event_index.index.reconstruct(0), expected, rtol=1e-5)
+
+
+def test_save_and_load_round_trip(vectorstore, tmp_path):
+    assert EventIndex.load(str(tmp_path)) is None
+
+    event_index = EventIndex.from_vectorstore(vectorstore)
+    event_index.save(str(tmp_path))
+    loaded = EventIndex.load(str(tmp_path))
+
+    assert loaded.event_ids == event_index.event_ids
+    assert loaded.chunk_positions == event_index.chunk_positions
+    assert not loaded.is_stale(vectorstore)
+
+
+def test_stale_when_chunk_index_changes(vectorstore):
+    event_index = EventIndex.from_vectorstore(vectorstore)
+    vectorstore.add_texts(["Nouvel événement"], metadatas=[{"event_id": "new"}])
+
+    assert event_index.is_stale(vectorstore)
+
+
+def test_two_stage_retrieve_only_returns_selected_events(vectorstore, monkeypatch):
+    monkeypatch.setattr(settings, "rag_two_stage_retrieval", True)
+    monkeypatch.setattr(settings, "rag_event_top_k", 2)
+    rag = RAGSystem(index_path="unused")
+    rag.embeddings = StubEmbeddings(size=64)
+    rag.vectorstore = vectorstore
+    rag.event_index = EventIndex.from_vectorstore(vectorstore)
+    question = "Concert de jazz à Lyon"
+
+    query_vector = np.array([rag.embeddings.embed_query(question)], dtype=np.float32)
+    selected = set(rag.event_index.search(query_vector, 2))
+    timer = RequestTimer()
+    docs = rag.retrieve(question, timer=timer)
+
+    assert docs
+    assert {doc.metadata["event_id"] for doc in docs} <= selected
+    assert "event_search" in timer.as_dict()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the metadata fast path.
+"""
+
+import pytest
+from langchain_core.documents import Document
+
+from src.chunking import EventChunker
+from src.fast_path import FastPath, TitleIndex, classify_question, extract_attribute
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+EVENT = {
+    "uid": "fiap",
+    "title_fr": "FIAP Jean Monnet",
+    "description_fr": "Centre international de séjour.",
+    "location_city": "Paris",
+    "location_region": "Île-de-France",
+    "location_address": "30 rue Cabanis, 75014 Paris",
+    "location_postalcode": "75014",
+    "location_department": "Paris",
+    "firstdate_begin": "2026-03-01T10:00:00",
+    "lastdate_end": "2026-03-05T18:00:00",
+    "age_min": 0,
+    "age_max": 15,
+    "canonicalurl": "https://www.fiap.paris",
+}
+
+
+@pytest.fixture
+def fast_path():
+    return FastPath(TitleIndex.from_documents(EventChunker().create_chunks([EVENT])))
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("Quelle est l'adresse du FIAP Jean Monnet ?", ("address", "fiap jean monnet")),
+        ("Dans quelle ville se trouve DISNEY'S HOTEL CHEYENNE ?", ("city", "disney s hotel cheyenne")),
+        ("Quel est l'âge maximum accepté au Gîte aux Écuries ?", ("age_max", "gite aux ecuries")),
+        ("Quel est le département de Le Rocheton YMCA ?", ("department", "rocheton ymca")),
+        ("Quel est le code postal de l'événement Jazz à Lyon ?", ("postalcode", "jazz a lyon")),
+        ("Quels concerts gratuits ce week-end ?", None),
+    ],
+)
+def test_classify_question(question, expected):
+    assert classify_question(question) == expected
+
+
+def test_answers_from_metadata(fast_path):
+    result = fast_path.answer("Quelle est l'adresse du FIAP Jean Monnet ?")
+
+    assert result["value"] == "30 rue Cabanis, 75014 Paris"
+    assert "30 rue Cabanis" in result["answer"]
+    assert result["event_id"] == "fiap"
+    assert fast_path.answer("Quel est l'âge minimum pour FIAP Jean Monnet ?")["value"] == "0"
+    assert fast_path.answer("Quel est le site web officiel du FIAP Jean Monnet ?")["value"] == "https://www.fiap.paris"
+    assert fast_path.stats["answered"] == 3
+
+
+def test_falls_through_on_unknown_entity_or_question(fast_path):
+    assert fast_path.answer("Quelle est l'adresse du Musée du Louvre ?") is None
+    assert fast_path.answer("Quels événements à Paris ?") is None
+    assert fast_path.stats["low_confidence"] == 1
+    assert fast_path.stats["not_attribute"] == 1
+
+
+def test_fuzzy_title_match_needs_margin():
+    events = [{**EVENT, "uid": "a", "title_fr": "Festival Jazz 2026"}, {**EVENT, "uid": "b", "title_fr": "Festival Jazz 2025"}]
+    fast_path = FastPath(TitleIndex.from_documents(EventChunker().create_chunks(events)), min_score=0.8)
+
+    assert fast_path.answer("Quelle est l'adresse du Festival Jazz 2024 ?") is None
+    assert fast_path.stats["ambiguous"] == 1
+
+
+def test_extracts_from_practical_chunk_without_metadata():
+    practical = Document(
+        page_content="Événement: X à Paris\nAdresse: 30 rue Cabanis, 75014 Paris\nÂge: ?-15 ans",
+        metadata={"chunk_type": "practical", "location_city": "Paris"},
+    )
+
+    assert extract_attribute("address", [practical]) == "30 rue Cabanis, 75014 Paris"
+    assert extract_attribute("postalcode", [practical]) == "75014"
+    assert extract_attribute("age_max", [practical]) == "15"
+    assert extract_attribute("age_min", [practical]) is None
+
+
+def test_synthetic_attribute_questions_are_answered():
+    generator = SyntheticEventGenerator(seed=11)
+    events = list(generator.generate(50))
+    fast_path = FastPath(TitleIndex.from_documents(EventChunker().create_chunks(events)))
+
+    for item in generator.generate_questions(20, corpus_size=50):
+        result = fast_path.answer(item["question"])
+        if result is not None:
+            assert item["ground_truth"].lower() in result["answer"].lower()
+    assert fast_path.stats["answered"] > 0
+
+
+def test_rag_query_skips_llm_on_fast_path():
+    from scripts.load_test import build_stub_rag_system
+
+    rag = build_stub_rag_system(events=[EVENT])
+    rag.fast_path = FastPath(TitleIndex.from_vectorstore(rag.vectorstore))
+    rag._generate = lambda *args, **kwargs: pytest.fail("le LLM ne doit pas être appelé")
+
+    result = rag.query("Dans quelle ville se trouve le FIAP Jean Monnet ?", return_sources=True)
+
+    assert result["fast_path"] is True
+    assert "Paris" in result["answer"]
+    assert result["sources"][0]["metadata"]["event_id"] == "fiap"
+    assert "fast_path" in result["timings"]
+
+
+def test_title_index_keeps_docstore_ids_only():
+    from langchain_community.vectorstores import FAISS
+
+    from src.docstore import normalize_vectorstore
+    from src.stubs import StubEmbeddings
+
+    vectorstore = normalize_vectorstore(FAISS.from_documents(EventChunker().create_chunks([EVENT]), StubEmbeddings()))
+    index = TitleIndex.from_vectorstore(vectorstore)
+
+    [entry] = index.entries.values()
+    assert set(entry.chunk_ids["fiap"]) == set(vectorstore.index_to_docstore_id.values())
+    assert all(isinstance(docstore_id, str) for docstore_id in entry.chunk_ids["fiap"])
+    assert FastPath(index).answer("Quel est le code postal du FIAP Jean Monnet ?")["value"] == "75014"
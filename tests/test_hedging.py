@@ -0,0 +1,121 @@
+"""
+Unit tests for hedged and fallback LLM generation.
+"""
+
+import threading
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+
+from src.hedging import HedgedGenerator
+from src.profiling import RequestTimer
+from src.stubs import StubChatModel
+
+pytestmark = pytest.mark.unit
+
+
+class FailingChatModel(FakeListChatModel):
+    def _stream(self, *args, **kwargs):
+        raise RuntimeError("HTTP 503")
+
+
+def _chain(model):
+    return model | StrOutputParser()
+
+
+def test_slow_primary_is_hedged_and_fallback_wins():
+    generator = HedgedGenerator(
+        chains=[
+            _chain(StubChatModel(first_token_ms=1000, latency_ms=1200)),
+            _chain(StubChatModel(first_token_ms=10, latency_ms=20)),
+        ],
+        model_names=["large", "small"],
+        hedge_after_ms=50,
+    )
+    timer = RequestTimer()
+
+    start = time.perf_counter()
+    answer = generator.generate("Bonjour", timer=timer)
+
+    assert answer.startswith("Réponse simulée")
+    assert time.perf_counter() - start < 0.5
+    assert generator.stats["hedged"] == 1
+    assert generator.stats["hedge_won"] == 1
+    assert generator.stats["wins_by_model"] == {"large": 0, "small": 1}
+    assert 50 <= timer.timings["llm_first_token"] < 500
+
+
+def test_fast_primary_is_not_hedged():
+    generator = HedgedGenerator(
+        chains=[_chain(StubChatModel(first_token_ms=5)), _chain(StubChatModel())],
+        model_names=["large", "small"],
+        hedge_after_ms=200,
+    )
+    generator.generate("Bonjour")
+    assert generator.stats["hedged"] == 0
+    assert generator.stats["wins_by_model"]["large"] == 1
+
+
+def test_error_falls_back_to_next_model():
+    generator = HedgedGenerator(
+        chains=[_chain(FailingChatModel(responses=["x"])), _chain(FakeListChatModel(responses=["ok"]))],
+        model_names=["primary", "backup"],
+        hedge_after_ms=0,
+    )
+    assert generator.generate("Bonjour") == "ok"
+    assert generator.stats["fallback_on_error"] == 1
+
+
+def test_all_models_failing_raises_last_error():
+    generator = HedgedGenerator(
+        chains=[_chain(FailingChatModel(responses=["x"]))],
+        model_names=["primary"],
+        hedge_after_ms=0,
+    )
+    with pytest.raises(RuntimeError):
+        generator.generate("Bonjour")
+    assert generator.stats["failed"] == 1
+
+
+def test_external_cancel_stops_generation():
+    generator = HedgedGenerator(
+        chains=[_chain(StubChatModel(first_token_ms=2000, latency_ms=2000))],
+        model_names=["slow"],
+        hedge_after_ms=0,
+    )
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+
+    start = time.perf_counter()
+    assert generator.generate("Bonjour", cancel=cancel) == ""
+    assert time.perf_counter() - start < 0.5
+
+
+def test_concurrent_hedges_are_capped():
+    generator = HedgedGenerator(
+        chains=[
+            _chain(StubChatModel(first_token_ms=200, latency_ms=250)),
+            _chain(StubChatModel(first_token_ms=600, latency_ms=650)),
+        ],
+        model_names=["large", "small"],
+        hedge_after_ms=20,
+        max_in_flight=1,
+    )
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(generator.generate("Bonjour"))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(answers) == 2 and all(answers)
+    assert generator.stats["hedged"] == 1
+    assert generator.stats["hedge_skipped"] == 1
+
+    # La place est rendue une fois le flux couvrant arrêté (gagnant ou annulé)
+    deadline = time.perf_counter() + 2
+    while not generator._hedge_slots.acquire(blocking=False):
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
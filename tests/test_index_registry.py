@@ -0,0 +1,182 @@
+"""
+Unit tests for versioned indexes and hot index swaps.
+"""
+
+import threading
+
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.index_registry import IndexRegistry, IndexReloader
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+def _vectorstore(seed, count):
+    events = list(SyntheticEventGenerator(seed=seed).generate(count))
+    return FAISS.from_documents(EventChunker().create_chunks(events), StubEmbeddings())
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return IndexRegistry(str(tmp_path / "registry"))
+
+
+def test_publish_writes_manifest_and_moves_current(registry):
+    first = registry.publish(_vectorstore(1, 10), source="test")
+    second = registry.publish(_vectorstore(2, 12), activate=False)
+
+    assert registry.current_version() == first
+    manifest = registry.manifest(first)
+    assert manifest["source"] == "test"
+    assert {"index.faiss", "index.pkl"} <= set(manifest["files"])
+    assert [m["version"] for m in registry.list_versions()] == [first, second]
+    assert not list(registry.versions_dir.glob(".staging-*"))
+
+    registry.activate(second)
+    assert registry.current_version() == second
+    with pytest.raises(ValueError):
+        registry.activate("inconnue")
+
+
+def test_gc_keeps_current_protected_and_recent(registry):
+    versions = [registry.publish(_vectorstore(i, 5)) for i in range(5)]
+    registry.activate(versions[1])
+
+    removed = registry.gc(keep=1, protect={versions[2]})
+
+    assert removed == [versions[0], versions[3]]
+    assert [m["version"] for m in registry.list_versions()] == [versions[1], versions[2], versions[4]]
+
+
+def test_import_directory_copies_legacy_index(registry, tmp_path):
+    legacy = tmp_path / "faiss_index"
+    _vectorstore(3, 8).save_local(str(legacy))
+
+    version = registry.import_directory(str(legacy))
+
+    assert registry.current_version() == version
+    assert (registry.version_path(version) / "index.faiss").exists()
+
+
+def test_reloader_swaps_index_without_dropping_requests(registry, monkeypatch):
+    from scripts.load_test import build_stub_rag_system
+
+    monkeypatch.setattr("src.config.settings.rag_two_stage_retrieval", False)
+    old = registry.publish(_vectorstore(4, 20))
+    rag = build_stub_rag_system(events=list(SyntheticEventGenerator(seed=4).generate(20)))
+    rag.index_path = registry.version_path(old)
+    reloader = IndexReloader(rag, registry, warmup_queries=["concert"])
+    assert reloader.loaded_version == old
+
+    new = registry.publish(_vectorstore(5, 30))
+    errors = []
+    stop = threading.Event()
+
+    def traffic():
+        while not stop.is_set():
+            try:
+                rag.query("concert de jazz")
+            except Exception as e:  # pragma: no cover - échec du test
+                errors.append(e)
+
+    thread = threading.Thread(target=traffic)
+    thread.start()
+    try:
+        assert reloader.check_for_update()
+        reloader.wait(timeout=30)
+    finally:
+        stop.set()
+        thread.join()
+
+    status = reloader.status
+    assert errors == []
+    assert status["state"] == "idle" and status["loaded_version"] == new
+    assert status["swaps"] == 1 and status["last_swap"]["version"] == new
+    assert rag.vectorstore.index.ntotal == registry.manifest(new)["num_vectors"]
+    assert "warmup" in rag.load_times
+    assert not reloader.check_for_update()
+
+
+def test_reloader_reports_failure(registry):
+    from scripts.load_test import build_stub_rag_system
+
+    rag = build_stub_rag_system(events=list(SyntheticEventGenerator(seed=6).generate(5)))
+    reloader = IndexReloader(rag, registry, warmup_queries=[])
+    reloader.reload("absente")
+    reloader.wait(timeout=10)
+
+    assert reloader.status["state"] == "failed"
+    assert reloader.status["failures"] == 1
+
+
+def test_admin_reload_endpoint_requires_token(registry, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main
+    from scripts.load_test import build_stub_rag_system
+
+    version = registry.publish(_vectorstore(7, 10))
+    rag = build_stub_rag_system(events=list(SyntheticEventGenerator(seed=7).generate(10)))
+    reloader = IndexReloader(rag, registry, warmup_queries=[])
+    monkeypatch.setattr(api.main, "get_index_reloader", lambda: reloader)
+    monkeypatch.setattr("src.config.settings.admin_token", "secret")
+    client = TestClient(api.main.app)
+
+    assert client.post("/admin/index/reload").status_code == 403
+    response = client.post("/admin/index/reload", json={"version": version}, headers={"X-Admin-Token": "secret"})
+    reloader.wait(timeout=30)
+
+    assert response.status_code == 202
+    assert response.json()["current_version"] == version
+    assert client.get("/admin/index", headers={"X-Admin-Token": "secret"}).json()["reload"]["loaded_version"] == version
+    missing = client.post("/admin/index/reload", json={"version": "absente"}, headers={"X-Admin-Token": "secret"})
+    assert missing.status_code == 404
+
+
+def test_rejected_reload_does_not_move_current(registry, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main
+    from scripts.load_test import build_stub_rag_system
+
+    old = registry.publish(_vectorstore(7, 10))
+    new = registry.publish(_vectorstore(8, 10))
+    rag = build_stub_rag_system(events=list(SyntheticEventGenerator(seed=7).generate(10)))
+    reloader = IndexReloader(rag, registry, warmup_queries=[])
+    monkeypatch.setattr(api.main, "get_index_reloader", lambda: reloader)
+    monkeypatch.setattr("src.config.settings.admin_token", "secret")
+
+    # Rechargement en cours: la demande est refusée sans toucher au pointeur CURRENT
+    release = threading.Event()
+    reloader._thread = threading.Thread(target=release.wait)
+    reloader._thread.start()
+    try:
+        response = TestClient(api.main.app).post(
+            "/admin/index/reload", json={"version": old}, headers={"X-Admin-Token": "secret"}
+        )
+    finally:
+        release.set()
+        reloader._thread.join()
+
+    assert response.status_code == 409
+    assert registry.current_version() == new
+
+
+def test_publish_shards_leaves_published_versions_untouched(registry):
+    from src.sharding import ShardCatalog
+
+    old = registry.publish(_vectorstore(7, 10))
+    manifest = registry.manifest(old)
+    files = sorted(path.name for path in registry.version_path(old).iterdir())
+
+    new = registry.publish_shards()
+
+    assert registry.current_version() == new != old
+    assert registry.manifest(old) == manifest
+    assert sorted(path.name for path in registry.version_path(old).iterdir()) == files
+    assert ShardCatalog.load(str(registry.version_path(new))).num_chunks == manifest["num_vectors"]
+    assert registry.manifest(new)["source"] == f"shards:{old}"
@@ -0,0 +1,73 @@
+"""
+Unit tests for index introspection and the /stats endpoint.
+"""
+
+import numpy as np
+import pytest
+
+from src.faiss_index import build_faiss_index
+from src.index_stats import IndexStats, faiss_index_info
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def events():
+    return list(SyntheticEventGenerator(seed=9).generate(25))
+
+
+def test_counts_index_content_incrementally(events):
+    from scripts.load_test import build_stub_rag_system
+
+    rag = build_stub_rag_system(events=events)
+    stats = IndexStats.from_vectorstore(rag.vectorstore).as_dict()
+
+    assert stats["num_chunks"] == rag.vectorstore.index.ntotal
+    assert stats["num_events"] == len(events)
+    assert sum(stats["chunk_types"].values()) == stats["num_chunks"]
+    assert stats["date_min"] == min(e["firstdate_begin"][:10] for e in events)
+
+    incremental = IndexStats()
+    incremental.add([{"event_id": "a", "chunk_type": "main", "firstdate_begin": "2026-05-01"}])
+    incremental.add([{"event_id": "a", "chunk_type": "practical", "lastdate_end": "2026-06-30"}])
+    assert incremental.as_dict() == {
+        "num_chunks": 2,
+        "num_events": 1,
+        "chunk_types": {"main": 1, "practical": 1},
+        "date_min": "2026-05-01",
+        "date_max": "2026-06-30",
+    }
+
+
+@pytest.mark.parametrize("index_type", ["Flat", "IVF", "HNSW"])
+def test_faiss_index_info(index_type):
+    vectors = np.random.default_rng(0).random((200, 8), dtype=np.float32)
+    info = faiss_index_info(build_faiss_index(vectors, index_type))
+
+    assert info["num_vectors"] == 200
+    assert info["dimension"] == 8
+    assert info["memory_bytes"] >= 200 * 8 * 4
+    assert ("nprobe" in info) == (index_type == "IVF")
+
+
+def test_stats_endpoint(events, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+    from scripts.load_test import build_stub_rag_system
+
+    rag = build_stub_rag_system(events=events)
+    rag.index_stats = IndexStats.from_vectorstore(rag.vectorstore)
+    rag.load_times = {"faiss_index": 12.5}
+    monkeypatch.setattr("api.main.get_rag_system", lambda: rag)
+
+    response = TestClient(app).get("/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["index"]["num_vectors"] == rag.vectorstore.index.ntotal
+    assert data["index"]["num_events"] == len(events)
+    assert data["models"]["load_times_ms"] == {"faiss_index": 12.5}
+    assert "search" in data["caches"]
+    assert data["process"]["rss_bytes"] > 0
@@ -0,0 +1,53 @@
+"""
+Unit tests for the offline load-testing harness and LLM stand-ins.
+"""
+
+import asyncio
+
+import pytest
+
+from src.profiling import percentile, summarize_latencies
+from src.stubs import StubChatModel, StubEmbeddings
+
+pytestmark = pytest.mark.unit
+
+
+def test_stub_embeddings_are_deterministic_and_normalized():
+    embeddings = StubEmbeddings(size=64)
+    first = embeddings.embed_query("Concert de jazz à Paris")
+    second = embeddings.embed_documents(["Concert de jazz à Paris"])[0]
+    assert first == second
+    assert abs(sum(v * v for v in first) - 1.0) < 1e-5
+
+
+def test_stub_chat_model_streams_deterministic_answer():
+    model = StubChatModel(latency_ms=5, first_token_ms=2)
+    streamed = "".join(chunk.content for chunk in model.stream("Bonjour"))
+    assert streamed == model.invoke("Bonjour").content
+
+
+def test_percentiles():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert summarize_latencies(values)["max"] == 100.0
+    assert summarize_latencies([])["p99"] == 0.0
+
+
+def test_run_load_test_reports_per_endpoint(sample_events_list, monkeypatch):
+    from api.main import app
+    from scripts.load_test import build_stub_rag_system, parse_mix, run_load_test
+
+    monkeypatch.setattr("src.rag._rag_system", build_stub_rag_system(events=sample_events_list))
+
+    report = asyncio.run(run_load_test(
+        app,
+        mix=parse_mix("ask:3,health:1"),
+        questions=["Quels événements à Paris ?"],
+        concurrency=2,
+        total_requests=12,
+    ))
+
+    assert report["total_requests"] == 12
+    assert report["error_rate"] == 0.0
+    assert "/ask" in report["endpoints"]
+    assert set(report["endpoints"]["/ask"]["latency_ms"]) == {"p50", "p95", "p99", "mean", "max"}
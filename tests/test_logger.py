@@ -2,21 +2,32 @@
 Unit tests for logger setup.
 """
 
+import json
 import logging
+import logging.handlers
 
 import pytest
 
+import src.logger as logger_module
 from src.config import settings
-from src.logger import setup_logging
+from src.logger import InfoSamplingFilter, request_id_var, setup_logging, stop_logging
 
 pytestmark = pytest.mark.unit
 
 
-def test_setup_logging_writes_file_handler(tmp_path, monkeypatch):
-    log_path = tmp_path / "app.log"
-
-    monkeypatch.setattr(settings, "log_file", str(log_path), raising=False)
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    monkeypatch.setattr(settings, "log_file", str(path), raising=False)
     monkeypatch.setattr(settings, "log_level", "INFO", raising=False)
+    yield path
+    # Configuration par défaut pour les tests suivants, sans écrire dans le vrai fichier de log
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "log_file", "", raising=False)
+    setup_logging()
+
+
+def test_setup_logging_writes_file_handler(log_path, monkeypatch):
     monkeypatch.setattr(
         settings,
         "log_format",
@@ -26,9 +37,47 @@ def test_setup_logging_writes_file_handler(tmp_path, monkeypatch):
 
     setup_logging()
 
+    # Les handlers d'écriture sont derrière la file d'attente
     root_logger = logging.getLogger()
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in root_logger.handlers)
     file_handlers = [
-        h for h in root_logger.handlers if isinstance(h, logging.FileHandler)
+        h for h in logger_module._listener.handlers if isinstance(h, logging.FileHandler)
     ]
     assert file_handlers
+    assert isinstance(file_handlers[0], logging.handlers.RotatingFileHandler)
     assert log_path.exists()
+
+
+def test_json_lines_carry_request_id(log_path, monkeypatch):
+    monkeypatch.setattr(settings, "log_json", True, raising=False)
+    setup_logging()
+
+    token = request_id_var.set("req-42")
+    try:
+        logging.getLogger("tests.logger").warning("Message de test")
+    finally:
+        request_id_var.reset(token)
+    stop_logging()
+
+    entry = json.loads(log_path.read_text(encoding="utf-8").strip().splitlines()[-1])
+    assert entry["message"] == "Message de test"
+    assert entry["request_id"] == "req-42"
+    assert entry["level"] == "WARNING"
+
+
+def test_info_sampling_keeps_whole_requests_and_warnings():
+    sampling = InfoSamplingFilter(sample_rate=4)
+
+    def kept(level, request_id):
+        record = logging.LogRecord("x", level, __file__, 1, "msg", None, None)
+        token = request_id_var.set(request_id)
+        try:
+            return sampling.filter(record)
+        finally:
+            request_id_var.reset(token)
+
+    decisions = [kept(logging.INFO, f"req-{i}") for i in range(200)]
+    assert 0 < sum(decisions) < 200
+    assert all(kept(logging.INFO, f"req-{i}") == decisions[i] for i in range(200))
+    assert all(kept(logging.WARNING, f"req-{i}") for i in range(200))
+    assert kept(logging.INFO, None)
@@ -0,0 +1,126 @@
+"""
+Unit tests for the shared Mistral HTTP client (retries, rate limiting, factory).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.mistral_client import (
+    AsyncRetryTransport,
+    LoopLocalTransport,
+    RetryPolicy,
+    RetryTransport,
+    create_chat_model,
+    get_mistral_http_client,
+    parse_retry_after,
+)
+from src.rate_limit import TokenBucket
+
+pytestmark = pytest.mark.unit
+
+
+def _scripted_handler(statuses, headers=None):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        status = statuses[min(len(calls) - 1, len(statuses) - 1)]
+        return httpx.Response(status, headers=headers or {}, json={"ok": status == 200})
+
+    return handler, calls
+
+
+def _policy(max_retries=3):
+    return RetryPolicy(max_retries=max_retries, backoff_s=0.001, max_backoff_s=0.002, rate_limiter=TokenBucket(rate=0))
+
+
+def test_retries_on_429_and_5xx_honouring_retry_after():
+    handler, calls = _scripted_handler([429, 503, 200], headers={"Retry-After": "0.5"})
+    sleeps = []
+    policy = _policy()
+    transport = RetryTransport(httpx.MockTransport(handler), policy, sleep=sleeps.append)
+
+    with httpx.Client(transport=transport, base_url="https://mistral.test") as client:
+        response = client.post("/chat/completions", json={"model": "m"})
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert calls[-1].content == calls[0].content
+    assert sleeps == [0.5, 0.5]
+    assert policy.stats["retries"] == 2 and policy.stats["rate_limited"] == 1
+
+
+def test_gives_up_after_max_retries_and_skips_client_errors():
+    handler, calls = _scripted_handler([500])
+    transport = RetryTransport(httpx.MockTransport(handler), _policy(max_retries=2), sleep=lambda _: None)
+    with httpx.Client(transport=transport, base_url="https://mistral.test") as client:
+        assert client.post("/embeddings", json={}).status_code == 500
+    assert len(calls) == 3
+
+    handler, calls = _scripted_handler([400])
+    transport = RetryTransport(httpx.MockTransport(handler), _policy(), sleep=lambda _: None)
+    with httpx.Client(transport=transport, base_url="https://mistral.test") as client:
+        assert client.post("/embeddings", json={}).status_code == 400
+    assert len(calls) == 1
+
+
+def test_async_transport_retries():
+    handler, calls = _scripted_handler([502, 200])
+    transport = AsyncRetryTransport(httpx.MockTransport(handler), _policy())
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url="https://mistral.test") as client:
+            return await client.post("/chat/completions", json={})
+
+    assert asyncio.run(run()).status_code == 200
+    assert len(calls) == 2
+
+
+def test_shared_async_client_survives_successive_event_loops():
+    handler, calls = _scripted_handler([200])
+    pools = []
+
+    def new_pool():
+        pools.append(httpx.MockTransport(handler))
+        return pools[-1]
+
+    client = httpx.AsyncClient(
+        transport=AsyncRetryTransport(LoopLocalTransport(new_pool), _policy()), base_url="https://mistral.test"
+    )
+
+    async def run():
+        first = await client.post("/embeddings", json={})
+        second = await client.post("/embeddings", json={})
+        return first.status_code, second.status_code
+
+    # Une boucle par appel, comme chaque evaluate() de RAGAS: un pool par boucle
+    assert asyncio.run(run()) == (200, 200)
+    assert asyncio.run(run()) == (200, 200)
+    assert len(calls) == 4 and len(pools) == 2
+
+
+def test_every_attempt_consumes_a_rate_limit_token():
+    handler, _ = _scripted_handler([503, 200])
+    bucket = TokenBucket(rate=1000, capacity=5)
+    policy = RetryPolicy(max_retries=3, backoff_s=0.001, max_backoff_s=0.002, rate_limiter=bucket)
+    transport = RetryTransport(httpx.MockTransport(handler), policy, sleep=lambda _: None)
+    with httpx.Client(transport=transport, base_url="https://mistral.test") as client:
+        client.post("/chat/completions", json={})
+    assert bucket._tokens < 4
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_factory_shares_one_pooled_client():
+    llm = create_chat_model(temperature=0)
+    evaluator = create_chat_model("other-model", temperature=0)
+    assert llm.client is evaluator.client is get_mistral_http_client()
+    assert llm.async_client is evaluator.async_client
+    assert llm.max_retries == 1
@@ -0,0 +1,61 @@
+"""
+Unit tests for request timing and profile sampling.
+"""
+
+import pstats
+import time
+
+import pytest
+
+from src.budget import run_with_budget
+from src.profiling import ProfileSampler, RequestTimer
+
+pytestmark = pytest.mark.unit
+
+
+def test_request_timer_accumulates_stages():
+    timer = RequestTimer()
+    with timer.stage("search"):
+        time.sleep(0.001)
+    timer.record("search", 5.0)
+    timer.record("llm_total", 10.0)
+
+    timings = timer.as_dict()
+    assert timings["search"] >= 5.0
+    assert timings["llm_total"] == 10.0
+    assert "total" in timings
+
+
+def test_profile_sampler_disabled_by_default(tmp_path):
+    sampler = ProfileSampler(sample_rate=0, output_dir=str(tmp_path))
+    assert not any(sampler.should_sample() for _ in range(10))
+
+
+def test_profile_sampler_one_in_n_and_rotation(tmp_path):
+    sampler = ProfileSampler(sample_rate=3, output_dir=str(tmp_path), max_files=2)
+    sampled = [sampler.should_sample() for _ in range(9)]
+    assert sampled.count(True) == 3
+
+    for _ in range(4):
+        with sampler.profile("query"):
+            sum(range(1000))
+
+    assert len(list(tmp_path.glob("query_*.prof"))) == 2
+
+
+def _stage_in_worker():
+    return sum(range(1000))
+
+
+def test_profile_includes_budgeted_stages_run_in_workers(tmp_path):
+    sampler = ProfileSampler(sample_rate=1, output_dir=str(tmp_path))
+
+    with sampler.profile("query"):
+        run_with_budget(_stage_in_worker, 1000, "retrieval")
+        run_with_budget(_stage_in_worker, 1000, "llm", pool="llm")
+    # Hors échantillon: rien n'est collecté
+    run_with_budget(_stage_in_worker, 1000, "retrieval")
+
+    [path] = tmp_path.glob("query_*.prof")
+    functions = {name: stat for (_, _, name), stat in pstats.Stats(str(path)).stats.items()}
+    assert functions["_stage_in_worker"][1] == 2
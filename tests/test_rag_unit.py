@@ -25,3 +25,23 @@ def test_setup_qa_chain_without_vectorstore_raises(tmp_path):
     rag = RAGSystem(index_path=str(tmp_path / "missing"))
     with pytest.raises(ValueError):
         rag.setup_qa_chain()
+
+
+def test_retrieve_records_stage_timings():
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    from src.profiling import RequestTimer
+
+    embeddings = DeterministicFakeEmbedding(size=16)
+    texts = [f"Concert numéro {i} à Paris" for i in range(30)]
+    rag = RAGSystem(index_path="unused")
+    rag.embeddings = embeddings
+    rag.vectorstore = FAISS.from_texts(texts, embeddings)
+
+    timer = RequestTimer()
+    docs = rag.retrieve("Concert numéro 3 à Paris", timer=timer)
+
+    assert docs
+    assert docs[0].page_content == "Concert numéro 3 à Paris"
+    assert {"embed", "search", "mmr"} <= set(timer.timings)
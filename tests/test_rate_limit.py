@@ -0,0 +1,49 @@
+"""
+Unit tests for the shared token bucket rate limiter.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.rate_limit import TokenBucket
+
+pytestmark = pytest.mark.unit
+
+
+def test_token_bucket_allows_burst_then_limits():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_acquire_waits_for_refill():
+    bucket = TokenBucket(rate=50, capacity=1)
+    bucket.acquire()
+    start = time.monotonic()
+    assert bucket.acquire()
+    assert time.monotonic() - start >= 0.01
+
+
+def test_token_bucket_timeout_and_unlimited():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    bucket.acquire()
+    assert not bucket.acquire(timeout=0.01)
+    assert TokenBucket(rate=0).acquire()
+
+
+def test_token_bucket_is_shared_between_threads():
+    bucket = TokenBucket(rate=1, capacity=5)
+    granted = []
+
+    def worker():
+        granted.append(bucket.try_acquire())
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert granted.count(True) == 5
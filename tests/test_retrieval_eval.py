@@ -0,0 +1,85 @@
+"""
+Unit tests for the LLM-free retrieval evaluation.
+"""
+
+import json
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from src.chunking import EventChunker
+from src.rag import RAGSystem
+from src.retrieval_eval import (
+    RetrievalEvaluator,
+    normalize_text,
+    ranking_metrics,
+    relevance_labels,
+)
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+def _stub_rag_system(events):
+    embeddings = StubEmbeddings(size=128)
+    rag = RAGSystem(index_path="unused")
+    rag.embeddings = embeddings
+    rag.vectorstore = FAISS.from_documents(EventChunker().create_chunks(events), embeddings)
+    return rag
+
+
+def test_normalize_text_strips_accents_and_punctuation():
+    assert normalize_text("Seine-et-Marne, Île-de-France !") == "seine et marne ile de france"
+
+
+def test_relevance_prefers_event_ids_over_ground_truth():
+    docs = [
+        Document(page_content="Adresse: 1 rue X", metadata={"event_id": "a"}),
+        Document(page_content="Adresse: 2 rue Y", metadata={"event_id": "b"}),
+    ]
+    assert relevance_labels(docs, {"ground_truth": "1 rue X", "event_ids": ["b"]}) == [None, "b"]
+    assert relevance_labels(docs, {"ground_truth": "1 rue x"}) == ["ground_truth", None]
+
+
+def test_ranking_metrics_counts_each_target_once():
+    metrics = ranking_metrics([None, "a", "a", "b"], num_relevant=2, ks=(1, 2, 4))
+    assert metrics["mrr"] == 0.5
+    assert metrics["recall@1"] == 0.0
+    assert metrics["recall@2"] == 0.5
+    assert metrics["recall@4"] == 1.0
+    assert 0.0 < metrics["ndcg@4"] < 1.0
+
+
+def test_evaluator_reports_metrics_and_stage_latency():
+    generator = SyntheticEventGenerator(seed=3)
+    events = list(generator.generate(40))
+    questions = generator.generate_questions(10, corpus_size=40)
+
+    results = RetrievalEvaluator(rag_system=_stub_rag_system(events)).evaluate(questions)
+
+    assert results["num_questions"] == 10
+    assert 0.0 <= results["metrics"]["retrieved_recall@10"] <= 1.0
+    assert {"embed", "search", "mmr", "total"} <= set(results["latency_ms"])
+    assert len(results["per_question"]) == 10
+
+
+def test_retrieval_mode_compares_only_with_same_mode(tmp_path):
+    from scripts.run_automated_evaluation import EvaluationAutomation
+
+    generator = SyntheticEventGenerator(seed=5)
+    events = list(generator.generate(30))
+    test_file = tmp_path / "questions.json"
+    test_file.write_text(json.dumps(generator.generate_questions(5, corpus_size=30)), encoding="utf-8")
+
+    automation = EvaluationAutomation(output_dir=str(tmp_path / "evaluations"))
+    automation.history.append({"mode": "ragas", "metrics": {"retrieved_mrr": 2.0}})
+
+    first = automation.run_retrieval_evaluation(str(test_file), rag_system=_stub_rag_system(events))
+    assert first["mode"] == "retrieval"
+    assert first["regressions"] == []
+
+    automation.history.append({"mode": "retrieval", "metrics": {name: 1.0 for name in first["metrics"]}})
+    second = automation.run_retrieval_evaluation(str(test_file), rag_system=_stub_rag_system(events))
+    assert second["regressions"]
@@ -0,0 +1,106 @@
+"""
+Unit tests for the out-of-scope guard.
+"""
+
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.scope_guard import ScopeGuard
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def vectorstore():
+    events = list(SyntheticEventGenerator(seed=2).generate(20))
+    return FAISS.from_documents(EventChunker().create_chunks(events), StubEmbeddings(size=64))
+
+
+def test_gazetteer_built_from_index(vectorstore):
+    guard = ScopeGuard.from_vectorstore(vectorstore)
+    city = next(iter(vectorstore.docstore._dict.values())).metadata["location_city"]
+
+    assert guard.check_location(f"Quels concerts à {city} ce week-end ?").in_scope
+    assert "Île-de-France" in guard.regions
+
+
+def test_rejects_other_regions_and_cities():
+    guard = ScopeGuard({"Paris", "Île-de-France"}, {"Île-de-France"})
+
+    verdict = guard.check_location("Quels spectacles à Aix-en-Provence en juillet ?")
+    assert not verdict.in_scope
+    assert verdict.location == "Aix-en-Provence"
+    assert "Aix-en-Provence" in guard.answer(verdict)
+    assert not guard.check_location("Des expositions en Bretagne ?").in_scope
+    assert guard.stats == {"checked": 2, "rejected_location": 2, "rejected_similarity": 0}
+
+
+def test_indexed_location_wins_over_other_location():
+    guard = ScopeGuard({"Paris", "Île-de-France"}, {"Île-de-France"})
+
+    assert guard.check_location("Un concert à Paris ou à Lyon ?").in_scope
+    assert guard.check_location("Que faire ce soir ?").in_scope
+
+
+@pytest.mark.parametrize("question", [
+    "Quels films sur Berlin sont projetés ?",
+    "Y a-t-il une exposition sur Rome antique ?",
+    "Un concert de l'Orchestre National de Lyon ?",
+    "Exposition Picasso et la Provence ?",
+])
+def test_location_cited_as_topic_is_not_rejected(question):
+    guard = ScopeGuard({"Paris", "Île-de-France"}, {"Île-de-France"})
+
+    assert guard.check_location(question).in_scope
+
+
+@pytest.mark.parametrize("question", [
+    "Que faire à Lyon ce week-end ?",
+    "Des festivals près de Nice ?",
+    "Quels concerts dans le Grand Est ?",
+    "Une sortie à La Rochelle ?",
+])
+def test_location_asked_with_preposition_is_rejected(question):
+    guard = ScopeGuard({"Paris", "Île-de-France"}, {"Île-de-France"})
+
+    assert not guard.check_location(question).in_scope
+
+
+def test_other_location_present_in_index_is_not_rejected():
+    guard = ScopeGuard({"Lyon"}, {"Auvergne-Rhône-Alpes"})
+
+    assert guard.check_location("Quels concerts à Lyon ?").in_scope
+
+
+def test_similarity_threshold(vectorstore):
+    embeddings = StubEmbeddings(size=64)
+    guard = ScopeGuard.from_vectorstore(vectorstore)
+    indexed = np.array([vectorstore.index.reconstruct(0)], dtype=np.float32)
+    unrelated = -indexed
+
+    guard.min_similarity = 0.0
+    assert guard.check_similarity(vectorstore, np.array([embeddings.embed_query("x")], dtype=np.float32)).in_scope
+    guard.min_similarity = 0.99
+    assert guard.check_similarity(vectorstore, indexed).in_scope
+    verdict = guard.check_similarity(vectorstore, unrelated)
+    assert not verdict.in_scope
+    assert verdict.reason == "similarity"
+    assert guard.stats["rejected_similarity"] == 1
+
+
+def test_rag_query_rejects_before_retrieval():
+    from scripts.load_test import build_stub_rag_system
+
+    rag = build_stub_rag_system(events=list(SyntheticEventGenerator(seed=2).generate(5)))
+    rag.scope_guard = ScopeGuard.from_vectorstore(rag.vectorstore)
+    rag.retrieve = lambda *args, **kwargs: pytest.fail("la recherche ne doit pas être lancée")
+
+    result = rag.query("Quels festivals à Marseille cet été ?", return_sources=True)
+
+    assert result["out_of_scope"] is True
+    assert result["sources"] == []
+    assert "Marseille" in result["answer"]
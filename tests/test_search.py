@@ -0,0 +1,143 @@
+"""
+Unit tests for the retrieval-only event search (/search).
+"""
+
+import pytest
+
+from src.search import EventSearch, InvalidCursor, SearchFilters, decode_cursor, encode_cursor
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(scope="module")
+def events():
+    return list(SyntheticEventGenerator(seed=5).generate(60))
+
+
+@pytest.fixture
+def rag(events):
+    from scripts.load_test import build_stub_rag_system
+
+    return build_stub_rag_system(events=events)
+
+
+def test_filters_match_metadata():
+    metadata = {
+        "location_city": "Saint-Denis",
+        "location_region": "Île-de-France",
+        "firstdate_begin": "2026-03-01T10:00:00",
+        "lastdate_end": "2026-03-05T18:00:00",
+        "age_min": 6,
+        "age_max": "",
+    }
+
+    assert SearchFilters().matches(metadata)
+    assert SearchFilters(city="saint denis", region="Ile-de-France").matches(metadata)
+    assert not SearchFilters(city="Paris").matches(metadata)
+    assert SearchFilters(date_from="2026-03-05", date_to="2026-03-10").matches(metadata)
+    assert not SearchFilters(date_from="2026-03-06").matches(metadata)
+    assert not SearchFilters(date_to="2026-02-28").matches(metadata)
+    assert SearchFilters(age=40).matches(metadata)
+    assert not SearchFilters(age=4).matches(metadata)
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    filters = SearchFilters(city="Paris", age=8)
+    assert decode_cursor(encode_cursor("concert", filters, True, 20)) == ("concert", filters, True, 20)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("pas-un-curseur")
+
+
+def test_pages_come_from_cache_without_new_search(rag):
+    search = EventSearch(max_results=25)
+    first = search.search(rag, "concert de jazz", limit=10)
+
+    assert first.total == 25
+    assert len({r["event_id"] for r in first.results}) == 10
+    assert [r["score"] for r in first.results] == sorted((r["score"] for r in first.results), reverse=True)
+
+    rag.embed_question = lambda question: pytest.fail("la page suivante ne doit pas refaire la recherche")
+    second = search.page(rag, first.next_cursor, limit=10)
+    third = search.page(rag, second.next_cursor, limit=10)
+
+    assert second.cached and third.cached
+    assert third.next_cursor is None
+    seen = [r["event_id"] for page in (first, second, third) for r in page.results]
+    assert len(seen) == len(set(seen)) == 25
+    assert search.stats["searches"] == 1
+    assert search.stats["cache_hits"] == 2
+
+
+def test_expired_cursor_reruns_search_at_same_offset(rag):
+    search = EventSearch(max_results=20)
+    first = search.search(rag, "exposition", limit=5)
+    search.clear()
+
+    second = search.page(rag, first.next_cursor, limit=5)
+
+    assert not second.cached
+    assert second.results == search.search(rag, "exposition", limit=5, offset=5).results
+
+
+def test_filters_widen_search_until_enough_events(rag, events):
+    city = events[0]["location_city"]
+    expected = {e["uid"] for e in events if e["location_city"] == city}
+
+    page = EventSearch().search(rag, "concert", SearchFilters(city=city), limit=50)
+
+    assert {r["event_id"] for r in page.results} == expected
+    assert all(r["city"] == city for r in page.results)
+
+
+def test_shards_serve_filtered_searches_only(rag, events, tmp_path):
+    from src.sharding import ShardedIndex, write_shards
+
+    write_shards(rag.vectorstore, str(tmp_path))
+    rag.shards = ShardedIndex.load(str(tmp_path), rag.embeddings)
+    search = EventSearch()
+
+    search.search(rag, "concert", limit=10)
+    # Sans filtre, l'index complet répond: aucun shard n'est chargé
+    assert rag.shards.stats["loaded_shards"] == 0
+
+    region = events[0]["location_region"]
+    page = search.search(rag, "concert", SearchFilters(region=region), limit=10)
+    assert page.results and all(r["region"] == region for r in page.results)
+    assert 0 < rag.shards.stats["loaded_shards"] == len(rag.shards.catalog.select(SearchFilters(region=region)))
+
+
+def test_rerank_reorders_events(rag):
+    class Reranker:
+        def predict(self, pairs):
+            return [len(text) for _, text in pairs]
+
+    rag.reranker = Reranker()
+    page = EventSearch(max_results=10).search(rag, "atelier", rerank=True, limit=10)
+
+    assert page.reranked
+    scores = [r["rerank_score"] for r in page.results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_search_endpoint_paginates(rag, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    monkeypatch.setattr("api.main.get_rag_system", lambda: rag)
+    monkeypatch.setattr("api.main.get_event_search", lambda: EventSearch(max_results=8))
+    client = TestClient(app)
+
+    response = client.post("/search", json={"query": "concert de jazz", "limit": 5})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 8 and len(data["results"]) == 5
+
+    response = client.post("/search", json={"cursor": data["next_cursor"], "limit": 5})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 3
+    assert "next_cursor" not in response.json()
+
+    assert client.post("/search", json={"limit": 5}).status_code == 422
+    assert client.post("/search", json={"cursor": "%%%"}).status_code == 400
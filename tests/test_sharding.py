@@ -0,0 +1,115 @@
+"""
+Unit tests for the region/month sharded index.
+"""
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.search import SearchFilters
+from src.sharding import ShardCatalog, ShardedIndex, shard_key, write_shards
+from src.stubs import StubEmbeddings
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def events():
+    events = list(SyntheticEventGenerator(seed=3).generate(60))
+    for event in events[::3]:
+        event["location_region"] = "Normandie"
+    return events
+
+
+@pytest.fixture
+def vectorstore(events):
+    return FAISS.from_documents(EventChunker().create_chunks(events), StubEmbeddings())
+
+
+def test_shard_key():
+    assert shard_key({"location_region": "Île-de-France", "firstdate_begin": "2026-05-14T20:00:00+02:00"}) == (
+        "ile-de-france/2026-05"
+    )
+    assert shard_key({}) == "unknown/unknown"
+
+
+def test_write_shards_and_prune_by_filters(vectorstore, tmp_path):
+    catalog = write_shards(vectorstore, str(tmp_path))
+
+    assert ShardCatalog.load(str(tmp_path)).shards.keys() == catalog.shards.keys()
+    assert catalog.num_chunks == vectorstore.index.ntotal
+    assert {info.region for info in catalog.shards.values()} == {"Île-de-France", "Normandie"}
+
+    selected = catalog.select(SearchFilters(region="normandie", date_to="2025-06-30"))
+    assert selected
+    assert all(info.region == "Normandie" and info.month <= "2025-06" for info in selected)
+    assert len(catalog.select(SearchFilters(date_from="2099-01-01"))) == 0
+
+
+def test_sharded_search_matches_monolithic_search(vectorstore, tmp_path):
+    write_shards(vectorstore, str(tmp_path))
+    shards = ShardedIndex.load(str(tmp_path), StubEmbeddings())
+    query_vectors = np.array(StubEmbeddings().embed_documents(["concert de jazz", "exposition de peinture"]), dtype=np.float32)
+    distances, indices = vectorstore.index.search(query_vectors, 10)
+    hits = shards.search(query_vectors, 10)
+
+    for row, row_hits in enumerate(hits):
+        expected = [
+            vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(i)]).page_content for i in indices[row]
+        ]
+        # Chunks à égale distance: l'ordre entre eux peut différer
+        assert sorted(hit.document.page_content for hit in row_hits) == sorted(expected)
+        assert [hit.distance for hit in row_hits] == pytest.approx(list(distances[row]), rel=1e-4)
+
+    # Seuls les shards de la région filtrée sont chargés et interrogés
+    shards = ShardedIndex.load(str(tmp_path), StubEmbeddings())
+    filters = SearchFilters(region="Normandie")
+    filtered = shards.search(query_vectors, 5, filters)[0]
+    assert filtered and all(hit.document.metadata["location_region"] == "Normandie" for hit in filtered)
+    assert shards.stats["loaded_shards"] == len(shards.catalog.select(filters)) < shards.stats["shards"]
+
+
+def test_shards_are_flat_whatever_the_index_type(vectorstore, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.config.settings.faiss_index_type", "HNSW16")
+    catalog = write_shards(vectorstore, str(tmp_path))
+    shards = ShardedIndex.load(str(tmp_path), StubEmbeddings())
+    shards.preload()
+
+    assert all(isinstance(shards._shard(key).index, faiss.IndexFlatL2) for key in catalog.shards)
+
+
+def test_partial_rebuild_keeps_other_shards(vectorstore, tmp_path):
+    catalog = write_shards(vectorstore, str(tmp_path))
+    keys = sorted(catalog.shards)
+    kept = catalog.shards[keys[1]]
+
+    rebuilt = write_shards(vectorstore, str(tmp_path), keys=[keys[0]])
+
+    assert rebuilt.shards.keys() == catalog.shards.keys()
+    assert rebuilt.shards[keys[1]].built_at == kept.built_at
+    assert rebuilt.shards[keys[0]].built_at >= kept.built_at
+
+
+def test_rag_retrieve_uses_shards(events, tmp_path, monkeypatch):
+    from scripts.load_test import build_stub_rag_system
+
+    monkeypatch.setattr("src.config.settings.rag_two_stage_retrieval", False)
+    rag = build_stub_rag_system(events=events)
+    question = "concert de jazz en plein air"
+    expected = rag.retrieve(question)
+    filters = SearchFilters(region="Normandie")
+    expected_filtered = rag.retrieve(question, filters=filters)
+
+    write_shards(rag.vectorstore, str(tmp_path))
+    rag.shards = ShardedIndex.load(str(tmp_path), rag.embeddings)
+
+    assert [doc.page_content for doc in rag.retrieve(question)] == [doc.page_content for doc in expected]
+    # Sans filtre, l'index complet répond: aucun shard n'est chargé
+    assert rag.shards.stats["loaded_shards"] == 0
+    sharded = rag.retrieve(question, filters=filters)
+    assert [doc.page_content for doc in sharded] == [doc.page_content for doc in expected_filtered]
+    assert all(doc.metadata["location_region"] == "Normandie" for doc in sharded)
+    assert rag.stats["index"]["shards"]["shards"] == len(rag.shards.catalog.shards)
@@ -0,0 +1,91 @@
+"""
+Unit tests for FAISS index types and the retrieval parameter sweep.
+"""
+
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from src.chunking import EventChunker
+from src.config import settings
+from src.faiss_index import build_faiss_index, parse_index_type
+from src.rag import RAGSystem
+from src.stubs import StubEmbeddings
+from src.sweep import RetrievalSweep, grid_points, override_settings, pareto_frontier, recommend
+from src.synthetic import SyntheticEventGenerator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("index_type", ["Flat", "IVF8", "HNSW16"])
+def test_build_faiss_index_supports_search_and_reconstruct(index_type):
+    vectors = np.random.default_rng(0).random((200, 16), dtype=np.float32)
+    index = build_faiss_index(vectors, index_type, nprobe=8)
+
+    assert index.ntotal == 200
+    assert np.allclose(index.reconstruct(7), vectors[7])
+    assert index.search(vectors[7:8], 1)[1][0][0] == 7
+
+
+def test_parse_index_type_rejects_unknown_types():
+    assert parse_index_type("ivf256") == ("IVF", 256)
+    with pytest.raises(ValueError):
+        parse_index_type("PQ16")
+
+
+def test_grid_points_skips_invalid_and_redundant_points():
+    points = grid_points({
+        "top_k": [5, 30],
+        "fetch_k": [20],
+        "faiss_index_type": ["Flat", "IVF"],
+        "faiss_nprobe": [1, 8],
+    })
+    assert all(point["fetch_k"] >= point["top_k"] for point in points)
+    assert [p["faiss_nprobe"] for p in points if p["faiss_index_type"] == "Flat"] == [None]
+    assert len(points) == 3
+
+
+def test_pareto_frontier_and_recommendation():
+    rows = [
+        {"quality": 0.9, "p95_ms": 10.0},
+        {"quality": 0.895, "p95_ms": 4.0},
+        {"quality": 0.5, "p95_ms": 1.0},
+        {"quality": 0.4, "p95_ms": 5.0},
+    ]
+    frontier = pareto_frontier(rows)
+    assert [row["p95_ms"] for row in frontier] == [1.0, 4.0, 10.0]
+    assert recommend(frontier, tolerance=0.01)["p95_ms"] == 4.0
+
+
+def test_sweep_restores_settings_and_vectorstore():
+    generator = SyntheticEventGenerator(seed=1)
+    events = list(generator.generate(60))
+    embeddings = StubEmbeddings(size=64)
+    rag = RAGSystem(index_path="unused")
+    rag.embeddings = embeddings
+    rag.vectorstore = FAISS.from_documents(EventChunker().create_chunks(events), embeddings)
+    base_vectorstore = rag.vectorstore
+    top_k = settings.rag_top_k
+
+    sweep = RetrievalSweep(rag, generator.generate_questions(8, corpus_size=60))
+    report = sweep.run(grid_points({
+        "top_k": [3, 6],
+        "fetch_k": [12],
+        "rerank": [False],
+        "faiss_index_type": ["Flat", "HNSW"],
+    }))
+
+    assert len(report["results"]) == 4
+    assert report["recommended"] in report["frontier"]
+    assert {"quality", "p50_ms", "p95_ms"} <= set(report["results"][0])
+    assert rag.vectorstore is base_vectorstore
+    assert settings.rag_top_k == top_k
+
+
+def test_override_settings_restores_on_error():
+    previous = settings.rag_fetch_k
+    with pytest.raises(RuntimeError):
+        with override_settings(rag_fetch_k=previous + 1):
+            assert settings.rag_fetch_k == previous + 1
+            raise RuntimeError
+    assert settings.rag_fetch_k == previous
@@ -0,0 +1,53 @@
+"""
+Unit tests for the synthetic OpenAgenda corpus generator.
+"""
+
+import pytest
+
+from src.chunking import EventChunker
+from src.synthetic import CorpusDistribution, SyntheticEventGenerator, iter_events, write_jsonl
+
+pytestmark = pytest.mark.unit
+
+
+def test_generation_is_deterministic_by_seed():
+    first = list(SyntheticEventGenerator(seed=3).generate(20))
+    second = list(SyntheticEventGenerator(seed=3).generate(20))
+    other = list(SyntheticEventGenerator(seed=4).generate(20))
+
+    assert first == second
+    assert first != other
+    assert len({event["uid"] for event in first}) == 20
+
+
+def test_events_have_chunker_fields():
+    event = SyntheticEventGenerator(seed=1).event(0)
+    for field in ("uid", "title_fr", "description_fr", "location_city", "location_region",
+                  "firstdate_begin", "lastdate_end", "keywords_fr", "free", "location_lat"):
+        assert field in event
+
+    docs = EventChunker().create_chunks([event])
+    assert docs[0].metadata["event_id"] == event["uid"]
+
+
+def test_distribution_controls_regions_and_republications():
+    distribution = CorpusDistribution(regions={"Occitanie": 1.0}, republish_ratio=1.0)
+    events = list(SyntheticEventGenerator(seed=0, distribution=distribution).generate(10))
+
+    assert {event["location_region"] for event in events} == {"Occitanie"}
+    # Tous les événements republient l'événement d'origine
+    assert len({event["description_fr"] for event in events}) == 1
+
+
+def test_jsonl_roundtrip_and_questions(tmp_path):
+    generator = SyntheticEventGenerator(seed=2)
+    path = tmp_path / "corpus.jsonl"
+    assert write_jsonl(generator.generate(15), path) == 15
+
+    events = list(iter_events(path))
+    assert len(events) == 15
+
+    questions = generator.generate_questions(5, corpus_size=15)
+    uids = {event["uid"] for event in events}
+    assert len(questions) == 5
+    assert all(q["event_ids"][0] in uids and q["ground_truth"] for q in questions)